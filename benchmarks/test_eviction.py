@@ -0,0 +1,53 @@
+import os
+import random
+
+import pytest
+
+from zoocache._zoocache import Core
+
+POLICIES = ["lru", "tinylfu"]
+CAPACITY = 1000
+TRACE_LEN = 50_000
+
+
+def zipf_with_scans(seed=7):
+    """Zipf-distributed reads over 20k keys, interrupted by one-off scans."""
+    rng = random.Random(seed)
+    weights = [1 / (rank + 1) for rank in range(20_000)]
+    hot = rng.choices(range(20_000), weights=weights, k=TRACE_LEN)
+    trace = []
+    for i, key in enumerate(hot):
+        trace.append(f"item:{key}")
+        if i % 5000 == 0:
+            trace.extend(f"scan:{i}:{n}" for n in range(2 * CAPACITY))
+    return trace
+
+
+def load_trace():
+    """A recorded trace (one key per line) from ZOOCACHE_TRACE, else a synthetic one."""
+    path = os.environ.get("ZOOCACHE_TRACE")
+    if not path:
+        return zipf_with_scans()
+    with open(path) as f:
+        return [line.strip() for line in f if line.strip()]
+
+
+TRACE = load_trace()
+
+
+def replay(policy, trace):
+    core = Core(max_entries=CAPACITY, eviction_policy=policy, read_extend_ttl=False)
+    hits = 0
+    for key in trace:
+        if core.get(key) is None:
+            core.set(key, 1, [])
+        else:
+            hits += 1
+    return hits / len(trace)
+
+
+@pytest.mark.parametrize("policy", POLICIES)
+def test_eviction_hit_ratio(benchmark, policy):
+    """Replays a key trace and records the hit ratio of each eviction policy."""
+    ratio = benchmark.pedantic(replay, args=(policy, TRACE), rounds=1, iterations=1)
+    benchmark.extra_info["hit_ratio"] = round(ratio, 4)
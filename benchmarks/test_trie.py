@@ -0,0 +1,46 @@
+import psutil
+import pytest
+
+from zoocache._zoocache import Core
+
+LAYOUTS = ["sharded", "compact"]
+TENANTS = 200
+USERS_PER_TENANT = 100
+
+
+def populate(core):
+    for t in range(TENANTS):
+        for u in range(USERS_PER_TENANT):
+            core.invalidate(f"tenant:{t}:user:{u}")
+
+
+@pytest.mark.parametrize("layout", LAYOUTS)
+def test_trie_resident_memory(benchmark, layout):
+    """Resident memory and build time for a high-cardinality tag space."""
+    process = psutil.Process()
+    cores = []
+
+    def build():
+        core = Core(trie_layout=layout)
+        before = process.memory_info().rss
+        populate(core)
+        cores.append(core)
+        return process.memory_info().rss - before
+
+    growth = benchmark.pedantic(build, rounds=3, iterations=1)
+    benchmark.extra_info["rss_growth_mb"] = round(growth / (1024**2), 2)
+
+
+@pytest.mark.parametrize("layout", LAYOUTS)
+def test_trie_validation_hit(benchmark, layout):
+    """Hit latency when every read falls off the global-version fast path."""
+    core = Core(trie_layout=layout)
+    populate(core)
+    deps = [f"tenant:{t}:user:{t % USERS_PER_TENANT}" for t in range(TENANTS)]
+    core.set("bench:trie", "data", deps)
+
+    def read():
+        core.invalidate("unrelated")
+        return core.get("bench:trie")
+
+    assert benchmark(read) == "data"
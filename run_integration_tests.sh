@@ -10,6 +10,7 @@ sleep 5
 
 echo "Running Integration Tests..."
 uv run pytest tests/integration/test_telemetry_comparison.py -s
+uv run pytest tests/integration/test_redis_cluster.py
 
 echo "Cleaning up Docker..."
 docker compose down
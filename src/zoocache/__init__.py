@@ -2,26 +2,36 @@ from zoocache._zoocache import InvalidTag, StorageIsFull
 from zoocache.context import add_deps
 from zoocache.core import (
     cacheable,
+    cacheable_many,
     clear,
     clear_async,
     configure,
     get_cache as get,
     get_cache_async as get_async,
+    get_cache_many as get_many,
+    get_cache_many_async as get_many_async,
     get_tag_version,
     invalidate,
     invalidate_async,
+    invalidate_many,
+    invalidate_many_async,
     prune,
     reset,
     set_cache as set,
     set_cache_async as set_async,
+    set_cache_many as set_many,
+    set_cache_many_async as set_many_async,
     version,
 )
 
 __all__ = [
     "configure",
     "cacheable",
+    "cacheable_many",
     "invalidate",
     "invalidate_async",
+    "invalidate_many",
+    "invalidate_many_async",
     "prune",
     "clear",
     "clear_async",
@@ -30,8 +40,12 @@ __all__ = [
     "add_deps",
     "get",
     "get_async",
+    "get_many",
+    "get_many_async",
     "set",
     "set_async",
+    "set_many",
+    "set_many_async",
     "get_tag_version",
     "InvalidTag",
     "StorageIsFull",
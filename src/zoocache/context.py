@@ -24,3 +24,19 @@ class DepsTracker:
 
     def __exit__(self, exc_type, exc_val, exc_tb):
         _DEPS_CONTEXT.reset(self.token)
+
+
+class _BatchDeps(set):
+    def update(self, *others) -> None:
+        raise RuntimeError(
+            "add_deps() cannot be used inside a cacheable_many function: "
+            "it cannot tell which item the dependencies belong to; use deps= instead"
+        )
+
+
+class BatchDepsTracker(DepsTracker):
+    """Dependency context for `cacheable_many` functions, which reject `add_deps`."""
+
+    def __init__(self):
+        super().__init__()
+        self.deps = _BatchDeps()
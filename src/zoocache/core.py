@@ -5,13 +5,17 @@ import threading
 import time
 import uuid
 from collections.abc import Callable, Iterable
+from concurrent.futures import ThreadPoolExecutor
 from contextlib import nullcontext
 from typing import Any
 
 from zoocache._zoocache import Core, hash_key
-from zoocache.context import DepsTracker, get_current_deps
+from zoocache.context import BatchDepsTracker, DepsTracker, get_current_deps
 from zoocache.telemetry import TelemetryManager
 
+# Threads running background refreshes for sync @cacheable functions.
+REFRESH_WORKERS = 4
+
 
 class CacheManager:
     def __init__(self):
@@ -24,6 +28,8 @@ class CacheManager:
         self._last_silent_errors: int = 0
         self._last_telemetry_check: float = 0
         self._lock = threading.Lock()
+        self._background: set[asyncio.Task] = set()
+        self._refresh_pool: ThreadPoolExecutor | None = None
 
     @property
     def telemetry(self) -> TelemetryManager:
@@ -49,6 +55,20 @@ class CacheManager:
                 self.core = Core(**core_args)
             return self.core
 
+    def spawn_background(self, coro) -> None:
+        task = asyncio.get_running_loop().create_task(coro)
+        self._background.add(task)
+        task.add_done_callback(self._background.discard)
+
+    def submit_refresh(self, fn: Callable, *args) -> None:
+        with self._lock:
+            if self._refresh_pool is None:
+                self._refresh_pool = ThreadPoolExecutor(
+                    max_workers=REFRESH_WORKERS, thread_name_prefix="zoocache-refresh"
+                )
+            pool = self._refresh_pool
+        pool.submit(fn, *args)
+
     def check_telemetry(self) -> None:
         now = time.monotonic()
         if now - self._last_telemetry_check < 5.0:
@@ -101,6 +121,22 @@ def configure(
     channel_capacity: int = 1_000_000,
     batch_size: int = 1000,
     lru_cache_size: int = 10_000,
+    near_cache_size: int | None = None,
+    distributed_flights: bool = False,
+    trie_layout: str = "sharded",
+    bus_coalesce_ms: int | None = None,
+    bus_coalesce_max: int = 1000,
+    redis_pool_size: int = 1,
+    redis_read_mode: str = "script",
+    redis_lru_mode: str = "global",
+    redis_tracking_size: int | None = None,
+    lmdb_group_commit: int | None = None,
+    lmdb_lru_mode: str = "exact",
+    expiry_sweep_interval: int = 60,
+    eviction_policy: str = "lru",
+    max_bytes: int | None = None,
+    background_eviction: bool = False,
+    ttl_jitter: float = 0.0,
     telemetry: TelemetryManager | None = None,
 ) -> None:
     defaults: dict[str, Any] = {
@@ -120,6 +156,22 @@ def configure(
         "channel_capacity": 1_000_000,
         "batch_size": 1000,
         "lru_cache_size": 10_000,
+        "near_cache_size": None,
+        "distributed_flights": False,
+        "trie_layout": "sharded",
+        "bus_coalesce_ms": None,
+        "bus_coalesce_max": 1000,
+        "redis_pool_size": 1,
+        "redis_read_mode": "script",
+        "redis_lru_mode": "global",
+        "redis_tracking_size": None,
+        "lmdb_group_commit": None,
+        "lmdb_lru_mode": "exact",
+        "expiry_sweep_interval": 60,
+        "eviction_policy": "lru",
+        "max_bytes": None,
+        "background_eviction": False,
+        "ttl_jitter": 0.0,
     }
 
     raw_config = {
@@ -139,6 +191,22 @@ def configure(
         "channel_capacity": channel_capacity,
         "batch_size": batch_size,
         "lru_cache_size": lru_cache_size,
+        "near_cache_size": near_cache_size,
+        "distributed_flights": distributed_flights,
+        "trie_layout": trie_layout,
+        "bus_coalesce_ms": bus_coalesce_ms,
+        "bus_coalesce_max": bus_coalesce_max,
+        "redis_pool_size": redis_pool_size,
+        "redis_read_mode": redis_read_mode,
+        "redis_lru_mode": redis_lru_mode,
+        "redis_tracking_size": redis_tracking_size,
+        "lmdb_group_commit": lmdb_group_commit,
+        "lmdb_lru_mode": lmdb_lru_mode,
+        "expiry_sweep_interval": expiry_sweep_interval,
+        "eviction_policy": eviction_policy,
+        "max_bytes": max_bytes,
+        "background_eviction": background_eviction,
+        "ttl_jitter": ttl_jitter,
     }
 
     if _manager.is_configured() and _manager.config:
@@ -171,6 +239,22 @@ def configure(
         channel_capacity=normalized_config["channel_capacity"],
         batch_size=normalized_config["batch_size"],
         lru_cache_size=normalized_config["lru_cache_size"],
+        near_cache_size=normalized_config["near_cache_size"],
+        distributed_flights=normalized_config["distributed_flights"],
+        trie_layout=normalized_config["trie_layout"],
+        bus_coalesce_ms=normalized_config["bus_coalesce_ms"],
+        bus_coalesce_max=normalized_config["bus_coalesce_max"],
+        redis_pool_size=normalized_config["redis_pool_size"],
+        redis_read_mode=normalized_config["redis_read_mode"],
+        redis_lru_mode=normalized_config["redis_lru_mode"],
+        redis_tracking_size=normalized_config["redis_tracking_size"],
+        lmdb_group_commit=normalized_config["lmdb_group_commit"],
+        lmdb_lru_mode=normalized_config["lmdb_lru_mode"],
+        expiry_sweep_interval=normalized_config["expiry_sweep_interval"],
+        eviction_policy=normalized_config["eviction_policy"],
+        max_bytes=normalized_config["max_bytes"],
+        background_eviction=normalized_config["background_eviction"],
+        ttl_jitter=normalized_config["ttl_jitter"],
         telemetry=telemetry,
     )
 
@@ -205,6 +289,25 @@ async def invalidate_async(tag: str) -> None:
         _manager.telemetry.increment("cache_invalidations_total", labels={"tag_prefix": tag})
 
 
+def _record_invalidations(tags: list[str]) -> None:
+    if _manager.telemetry.enabled:
+        _manager.telemetry.increment("cache_invalidations_total", len(tags))
+        for tag in tags:
+            _manager.telemetry.increment("cache_invalidations_total", labels={"tag_prefix": tag})
+
+
+def invalidate_many(tags: Iterable[str]) -> None:
+    tags = list(tags)
+    _manager.get_core().invalidate_many(tags)
+    _record_invalidations(tags)
+
+
+async def invalidate_many_async(tags: Iterable[str]) -> None:
+    tags = list(tags)
+    await _manager.get_core().invalidate_many_async(tags)
+    _record_invalidations(tags)
+
+
 def version() -> str:
     return _manager.get_core().version()
 
@@ -259,18 +362,79 @@ def cacheable(
     namespace: str | None = None,
     deps: Callable | Iterable[str] | None = None,
     ttl: int | None = None,
+    stale_while_revalidate: int | None = None,
+    early_refresh: float | None = None,
+    ttl_policy: str = "sliding",
+    max_lifetime: int | None = None,
 ):
+    swr = stale_while_revalidate
+    background_refresh = bool(swr or early_refresh)
+    set_opts = {"ttl": ttl, "stale_ttl": swr, "ttl_policy": ttl_policy, "max_lifetime": max_lifetime}
+
     def decorator(fn: Callable):
+        def refresh_failed() -> None:
+            _manager.telemetry.increment("cache_errors_total", labels={"error_type": "background_refresh"})
+
+        def cost_ms(started: float) -> int | None:
+            if not early_refresh:
+                return None
+            return max(1, int((time.perf_counter() - started) * 1000))
+
+        async def refresh_async(core: Core, key: str, args: tuple, kwargs: dict) -> None:
+            success = False
+            try:
+                with DepsTracker():
+                    started = time.perf_counter()
+                    res = await fn(*args, **kwargs)
+                    item_deps = _collect_deps(deps, args, kwargs)
+                    await core.set_async(key, res, item_deps, cost_ms=cost_ms(started), **set_opts)
+                success = True
+            except Exception:
+                refresh_failed()
+            finally:
+                core.finish_flight(key, not success)
+                _resolve_flight_signals(key)
+
+        def refresh_sync(core: Core, key: str, args: tuple, kwargs: dict) -> None:
+            success = False
+            try:
+                with DepsTracker():
+                    started = time.perf_counter()
+                    res = fn(*args, **kwargs)
+                    item_deps = _collect_deps(deps, args, kwargs)
+                    core.set(key, res, item_deps, cost_ms=cost_ms(started), **set_opts)
+                success = True
+            except Exception:
+                refresh_failed()
+            finally:
+                core.finish_flight(key, not success)
+                _resolve_flight_signals(key)
+
+        def count_hit(is_leader: bool) -> None:
+            if _manager.telemetry.enabled:
+                _manager.telemetry.increment("cache_hits_total")
+                if is_leader:
+                    _manager.telemetry.increment("cache_stale_refreshes_total")
+
         @functools.wraps(fn)
         async def async_wrapper(*args, **kwargs):
             core, key = _manager.get_core(), _generate_key(fn, namespace, args, kwargs)
 
-            with _timed("cache_get_duration_seconds"):
-                val, _, is_hit = core.get_or_entry_sync(key)
-            if is_hit:
-                if _manager.telemetry.enabled:
-                    _manager.telemetry.increment("cache_hits_total")
-                return val
+            if background_refresh:
+                with _timed("cache_get_duration_seconds"):
+                    val, is_leader, is_hit = await core.get_or_stale_async(key, swr or 0, early_refresh)
+                if is_hit:
+                    if is_leader:
+                        _manager.spawn_background(refresh_async(core, key, args, kwargs))
+                    count_hit(is_leader)
+                    return val
+            else:
+                with _timed("cache_get_duration_seconds"):
+                    val, _, is_hit = core.get_or_entry_sync(key)
+                if is_hit:
+                    if _manager.telemetry.enabled:
+                        _manager.telemetry.increment("cache_hits_total")
+                    return val
 
             with _timed("cache_get_duration_seconds"):
                 val, is_leader, is_hit = await core.get_or_entry_async(key)
@@ -289,9 +453,11 @@ def cacheable(
             exception = None
             try:
                 with DepsTracker():
+                    started = time.perf_counter()
                     res = await fn(*args, **kwargs)
                     with _timed("cache_set_duration_seconds"):
-                        await core.set_async(key, res, _collect_deps(deps, args, kwargs), ttl=ttl)
+                        item_deps = _collect_deps(deps, args, kwargs)
+                        await core.set_async(key, res, item_deps, cost_ms=cost_ms(started), **set_opts)
                 success = True
                 return res
             except BaseException as e:
@@ -307,6 +473,15 @@ def cacheable(
             core, key = _manager.get_core(), _generate_key(fn, namespace, args, kwargs)
             _manager.check_telemetry()
 
+            if background_refresh:
+                with _timed("cache_get_duration_seconds"):
+                    val, is_leader, is_hit = core.get_or_stale(key, swr or 0, early_refresh)
+                if is_hit:
+                    if is_leader:
+                        _manager.submit_refresh(refresh_sync, core, key, args, kwargs)
+                    count_hit(is_leader)
+                    return val
+
             with _timed("cache_get_duration_seconds"):
                 val, is_leader, is_hit = core.get_or_entry(key)
 
@@ -325,9 +500,11 @@ def cacheable(
             res = None
             try:
                 with DepsTracker():
+                    started = time.perf_counter()
                     res = fn(*args, **kwargs)
                     with _timed("cache_set_duration_seconds"):
-                        core.set(key, res, _collect_deps(deps, args, kwargs), ttl=ttl)
+                        item_deps = _collect_deps(deps, args, kwargs)
+                        core.set(key, res, item_deps, cost_ms=cost_ms(started), **set_opts)
                 success = True
                 return res
             except BaseException:
@@ -344,6 +521,91 @@ def cacheable(
     return decorator
 
 
+def cacheable_many(
+    func: Callable | None = None,
+    *,
+    namespace: str | None = None,
+    deps: Callable | Iterable[str] | None = None,
+    ttl: int | None = None,
+):
+    def decorator(fn: Callable):
+        def item_keys(items: list, args: tuple, kwargs: dict) -> list[str]:
+            return [_generate_key(fn, namespace, (item, *args), kwargs) for item in items]
+
+        def split_hits(items: list, keys: list[str], cached: list) -> tuple[dict, list, dict]:
+            hits, misses, miss_keys = {}, [], {}
+            for item, key, val in zip(items, keys, cached):
+                if val is not None:
+                    hits[item] = val
+                elif item not in miss_keys:
+                    misses.append(item)
+                    miss_keys[item] = key
+            if _manager.telemetry.enabled:
+                if hits:
+                    _manager.telemetry.increment("cache_hits_total", len(hits))
+                if misses:
+                    _manager.telemetry.increment("cache_misses_total", len(misses))
+            return hits, misses, miss_keys
+
+        def batch_items(misses: list, miss_keys: dict, fresh: dict, args: tuple, kwargs: dict) -> list[tuple]:
+            return [
+                (miss_keys[item], fresh[item], _collect_deps(deps, (item, *args), kwargs), ttl)
+                for item in misses
+                if item in fresh
+            ]
+
+        @functools.wraps(fn)
+        async def async_wrapper(items, *args, **kwargs):
+            core, items = _manager.get_core(), list(items)
+            keys = item_keys(items, args, kwargs)
+
+            with _timed("cache_get_duration_seconds"):
+                cached = await core.get_many_async(keys)
+            hits, misses, miss_keys = split_hits(items, keys, cached)
+
+            if misses:
+                try:
+                    with BatchDepsTracker():
+                        fresh = await fn(misses, *args, **kwargs)
+                        with _timed("cache_set_duration_seconds"):
+                            await core.set_many_async(batch_items(misses, miss_keys, fresh, args, kwargs))
+                except BaseException:
+                    _manager.telemetry.increment("cache_errors_total", labels={"error_type": "exception"})
+                    raise
+                hits.update((item, fresh[item]) for item in misses if item in fresh)
+
+            return {item: hits[item] for item in items if item in hits}
+
+        @functools.wraps(fn)
+        def sync_wrapper(items, *args, **kwargs):
+            core, items = _manager.get_core(), list(items)
+            keys = item_keys(items, args, kwargs)
+            _manager.check_telemetry()
+
+            with _timed("cache_get_duration_seconds"):
+                cached = core.get_many(keys)
+            hits, misses, miss_keys = split_hits(items, keys, cached)
+
+            if misses:
+                try:
+                    with BatchDepsTracker():
+                        fresh = fn(misses, *args, **kwargs)
+                        with _timed("cache_set_duration_seconds"):
+                            core.set_many(batch_items(misses, miss_keys, fresh, args, kwargs))
+                except BaseException:
+                    _manager.telemetry.increment("cache_errors_total", labels={"error_type": "exception"})
+                    raise
+                hits.update((item, fresh[item]) for item in misses if item in fresh)
+
+            return {item: hits[item] for item in items if item in hits}
+
+        return async_wrapper if inspect.iscoroutinefunction(fn) else sync_wrapper
+
+    if func is not None:
+        return decorator(func)
+    return decorator
+
+
 def reset() -> None:
     _manager.reset()
 
@@ -360,9 +622,35 @@ async def get_cache_async(key: str) -> Any:
     return await core.get_async(key)
 
 
+def get_cache_many(keys: Iterable[str]) -> list[Any]:
+    return _manager.get_core().get_many(list(keys))
+
+
+async def get_cache_many_async(keys: Iterable[str]) -> list[Any]:
+    return await _manager.get_core().get_many_async(list(keys))
+
+
 def set_cache(key: str, value: Any, deps: Iterable[str] = (), ttl: int | None = None) -> None:
     _manager.get_core().set(key, value, list(deps), ttl=ttl)
 
 
 async def set_cache_async(key: str, value: Any, deps: Iterable[str] = (), ttl: int | None = None) -> None:
     await _manager.get_core().set_async(key, value, list(deps), ttl=ttl)
+
+
+def _normalize_set_items(items: Iterable[tuple]) -> list[tuple]:
+    normalized = []
+    for item in items:
+        key, value, *rest = item
+        deps = list(rest[0]) if rest else []
+        ttl = rest[1] if len(rest) > 1 else None
+        normalized.append((key, value, deps, ttl))
+    return normalized
+
+
+def set_cache_many(items: Iterable[tuple]) -> None:
+    _manager.get_core().set_many(_normalize_set_items(items))
+
+
+async def set_cache_many_async(items: Iterable[tuple]) -> None:
+    await _manager.get_core().set_many_async(_normalize_set_items(items))
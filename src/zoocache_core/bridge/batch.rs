@@ -0,0 +1,335 @@
+use crate::core::{Core, EvictionLimits};
+use crate::near_cache::NearCache;
+use crate::storage::{CacheEntry, Storage, StorageResult};
+use crate::trie::{PrefixTrie, build_dependency_snapshots};
+use crate::ttl::{self, ReadExtension};
+use crate::worker::{TtiState, WorkerMsg};
+use crate::{RUNTIME, utils};
+use pyo3::prelude::*;
+use std::sync::Arc;
+
+/// Snapshot of the read-side state needed to resolve a batch of storage
+/// results, so the same logic runs on the calling thread and inside futures.
+struct BatchReader {
+    storage: Arc<dyn Storage>,
+    trie: PrefixTrie,
+    tti_state: Option<Arc<TtiState>>,
+    near_cache: Option<Arc<NearCache>>,
+    extension: ReadExtension,
+}
+
+impl BatchReader {
+    fn near_pass(&self, py: Python, keys: &[String]) -> (Vec<Option<Py<PyAny>>>, Vec<usize>) {
+        let results: Vec<Option<Py<PyAny>>> = match &self.near_cache {
+            Some(near) => keys
+                .iter()
+                .map(|key| {
+                    let entry = near.lookup(py, key, &self.trie)?;
+                    // Same as `Core::near_cache_get`: keep the key's recency and
+                    // storage TTL moving while only L1 serves it.
+                    if let Some(state) = &self.tti_state {
+                        state.touch(key, self.extension.ttl_for(&entry));
+                    }
+                    Some(entry.value.clone_ref(py))
+                })
+                .collect(),
+            None => keys.iter().map(|_| None).collect(),
+        };
+        let pending = (0..keys.len()).filter(|&i| results[i].is_none()).collect();
+        (results, pending)
+    }
+
+    fn resolve(
+        &self,
+        py: Python,
+        keys: &[String],
+        pending: &[usize],
+        statuses: Vec<StorageResult>,
+        results: &mut [Option<Py<PyAny>>],
+    ) {
+        let current_global_version = self.trie.get_global_version();
+        let now = utils::now_secs();
+        let touch_on_hit = self.storage.needs_tti_worker() || !self.storage.is_sync_storage();
+
+        for (&idx, status) in pending.iter().zip(statuses) {
+            let key = &keys[idx];
+            let (entry, expires_at, raw_data) = match status.fresh() {
+                StorageResult::Hit(e, exp, raw) => (e, exp, raw),
+                StorageResult::Expired => {
+                    self.discard(key);
+                    continue;
+                }
+                StorageResult::NotFound | StorageResult::Error => continue,
+            };
+
+            let unchanged = self
+                .trie
+                .unchanged_since(entry.trie_version, entry.dep_roots);
+            if !unchanged
+                && !crate::trie::validate_with_handles(
+                    &self.trie,
+                    &entry.dependencies,
+                    &entry.handles,
+                    now,
+                )
+            {
+                self.discard(key);
+                continue;
+            }
+
+            if !unchanged && self.trie.needs_restamp(entry.trie_version) {
+                self.schedule_rewrite(
+                    py,
+                    key,
+                    &entry,
+                    raw_data,
+                    current_global_version,
+                    expires_at.map(|e| e.saturating_sub(now)),
+                );
+            } else if touch_on_hit && let Some(state) = &self.tti_state {
+                state.touch(key, self.extension.ttl_for(&entry));
+            }
+
+            if let Some(near) = &self.near_cache {
+                near.put(key, Arc::clone(&entry), expires_at);
+            }
+            results[idx] = Some(entry.value.clone_ref(py));
+        }
+    }
+
+    fn discard(&self, key: &str) {
+        if self.storage.is_sync_storage() {
+            if let Err(e) = self.storage.try_remove_sync(key) {
+                log::warn!("Failed to remove stale key '{}': {}", key, e);
+            }
+        } else if let Some(state) = &self.tti_state
+            && let Err(e) = state.tx.try_send(WorkerMsg::Delete(key.to_string()))
+        {
+            log::warn!("Failed to send Delete for stale key '{}': {}", key, e);
+        }
+    }
+
+    fn schedule_rewrite(
+        &self,
+        py: Python,
+        key: &str,
+        entry: &Arc<CacheEntry>,
+        raw_data: Option<Vec<u8>>,
+        version: u64,
+        ttl: Option<u64>,
+    ) {
+        let Some(state) = &self.tti_state else {
+            return;
+        };
+        let msg = match raw_data {
+            Some(raw) => match CacheEntry::update_trie_version_raw(&raw, version) {
+                Ok(data) => WorkerMsg::Update(key.to_string(), data, ttl),
+                Err(_) => return,
+            },
+            None => WorkerMsg::UpdateEntry(
+                key.to_string(),
+                Arc::new(entry.with_trie_version(py, version)),
+                ttl,
+                entry.trie_version,
+            ),
+        };
+        if let Err(e) = state.tx.try_send(msg) {
+            log::warn!("Failed to send Update for key '{}': {}", key, e);
+        }
+    }
+}
+
+type SetItem = (String, Py<PyAny>, Vec<String>, Option<u64>);
+type PreparedItem = (String, Arc<CacheEntry>, Option<u64>);
+
+/// Write-side counterpart of `BatchReader`: owns what a batch write needs once
+/// it leaves the calling thread.
+struct BatchWriter {
+    storage: Arc<dyn Storage>,
+    trie: PrefixTrie,
+    tti_state: Option<Arc<TtiState>>,
+    near_cache: Option<Arc<NearCache>>,
+    limits: EvictionLimits,
+}
+
+impl BatchWriter {
+    async fn write(&self, items: Vec<PreparedItem>) -> PyResult<()> {
+        self.storage.set_many(items.clone()).await?;
+        self.remember(&items);
+        self.evict_overflow().await
+    }
+
+    fn remember(&self, items: &[PreparedItem]) {
+        if let Some(near) = &self.near_cache {
+            for (key, entry, ttl) in items {
+                near.remember(key, entry, *ttl);
+            }
+        }
+    }
+
+    async fn evict_overflow(&self) -> PyResult<()> {
+        if !self.limits.is_bounded() {
+            return Ok(());
+        }
+        let current = self.storage.len().await;
+        let to_evict = self.limits.overflow(current, self.storage.size_bytes());
+        if to_evict == 0 || self.limits.defer_to_worker(self.tti_state.as_deref()) {
+            return Ok(());
+        }
+        let evicted = self.storage.evict_lru(to_evict).await?;
+        if let Some(near) = &self.near_cache {
+            near.forget(&evicted);
+        }
+        match &self.tti_state {
+            Some(state) if state.tx.try_send(WorkerMsg::Prune(0)).is_ok() => {}
+            _ => self.trie.prune(0),
+        }
+        Ok(())
+    }
+}
+
+impl Core {
+    fn batch_writer(&self) -> BatchWriter {
+        BatchWriter {
+            storage: Arc::clone(&self.storage),
+            trie: self.trie.clone(),
+            tti_state: self.tti_state.clone(),
+            near_cache: self.near_cache.clone(),
+            limits: self.limits,
+        }
+    }
+
+    /// Validates every tag up front so a bad item rejects the batch before
+    /// anything is written, then snapshots all entries against one version.
+    fn prepare_set_many(&self, items: Vec<SetItem>) -> PyResult<Vec<PreparedItem>> {
+        for (_, _, dependencies, _) in &items {
+            for tag in dependencies {
+                super::utils::validate_tag(tag)?;
+            }
+        }
+        let trie_version = self.trie.get_global_version();
+        let now = utils::now_secs();
+        Ok(items
+            .into_iter()
+            .map(|(key, value, dependencies, ttl)| {
+                let dependencies = build_dependency_snapshots(&self.trie, dependencies, now);
+                let entry = Arc::new(CacheEntry {
+                    value,
+                    dep_roots: crate::trie::root_mask(&dependencies),
+                    dependencies,
+                    trie_version,
+                    cost_ms: 0,
+                    handles: Default::default(),
+                    max_expires_at: None,
+                    stale_window: 0,
+                });
+                let ttl = ttl
+                    .or(self.default_ttl)
+                    .map(|t| ttl::jitter(t, self.ttl_jitter));
+                (key, entry, ttl)
+            })
+            .collect())
+    }
+
+    pub(crate) fn bridge_set_many(&self, py: Python, items: Vec<SetItem>) -> PyResult<()> {
+        let prepared = self.prepare_set_many(items)?;
+        if prepared.is_empty() {
+            return Ok(());
+        }
+
+        if self.storage.is_sync_storage() {
+            self.storage.try_set_many_sync(py, prepared.clone())?;
+            self.batch_writer().remember(&prepared);
+            self.evict_overflow_sync();
+            return Ok(());
+        }
+
+        let writer = self.batch_writer();
+        py.detach(|| RUNTIME.block_on(writer.write(prepared)))
+    }
+
+    pub(crate) fn bridge_set_many_async<'py>(
+        &self,
+        py: Python<'py>,
+        items: Vec<SetItem>,
+    ) -> PyResult<Bound<'py, PyAny>> {
+        let prepared = self.prepare_set_many(items)?;
+
+        if prepared.is_empty() || self.storage.is_sync_storage() {
+            if !prepared.is_empty() {
+                self.storage.try_set_many_sync(py, prepared.clone())?;
+                self.batch_writer().remember(&prepared);
+                self.evict_overflow_sync();
+            }
+            return pyo3_async_runtimes::tokio::future_into_py(py, async move {
+                Ok(Python::attach(|py| py.None()))
+            });
+        }
+
+        let writer = self.batch_writer();
+        pyo3_async_runtimes::tokio::future_into_py(py, async move {
+            writer.write(prepared).await?;
+            Ok(Python::attach(|py| py.None()))
+        })
+    }
+
+    fn batch_reader(&self) -> BatchReader {
+        BatchReader {
+            storage: Arc::clone(&self.storage),
+            trie: self.trie.clone(),
+            tti_state: self.tti_state.clone(),
+            near_cache: self.near_cache.clone(),
+            extension: self.read_extension(),
+        }
+    }
+
+    pub(crate) fn bridge_get_many(
+        &self,
+        py: Python,
+        keys: Vec<String>,
+    ) -> PyResult<Vec<Option<Py<PyAny>>>> {
+        let reader = self.batch_reader();
+        let (mut results, pending) = reader.near_pass(py, &keys);
+        if pending.is_empty() {
+            return Ok(results);
+        }
+
+        let pending_keys: Vec<String> = pending.iter().map(|&i| keys[i].clone()).collect();
+        let statuses = match self.storage.try_get_many_sync(py, &pending_keys) {
+            Some(statuses) => statuses,
+            None => {
+                let storage = Arc::clone(&self.storage);
+                py.detach(|| RUNTIME.block_on(storage.get_many(&pending_keys)))
+            }
+        };
+
+        reader.resolve(py, &keys, &pending, statuses, &mut results);
+        Ok(results)
+    }
+
+    pub(crate) fn bridge_get_many_async<'py>(
+        &self,
+        py: Python<'py>,
+        keys: Vec<String>,
+    ) -> PyResult<Bound<'py, PyAny>> {
+        let reader = self.batch_reader();
+        let (mut results, pending) = reader.near_pass(py, &keys);
+
+        if pending.is_empty() || self.storage.is_sync_storage() {
+            if !pending.is_empty() {
+                let pending_keys: Vec<String> = pending.iter().map(|&i| keys[i].clone()).collect();
+                if let Some(statuses) = self.storage.try_get_many_sync(py, &pending_keys) {
+                    reader.resolve(py, &keys, &pending, statuses, &mut results);
+                }
+            }
+            return pyo3_async_runtimes::tokio::future_into_py(py, async move { Ok(results) });
+        }
+
+        pyo3_async_runtimes::tokio::future_into_py(py, async move {
+            let pending_keys: Vec<String> = pending.iter().map(|&i| keys[i].clone()).collect();
+            let statuses = reader.storage.get_many(&pending_keys).await;
+            Python::attach(|py| reader.resolve(py, &keys, &pending, statuses, &mut results));
+            Ok(results)
+        })
+    }
+}
@@ -1,13 +1,20 @@
-use crate::bus::{InvalidateBus, LocalBus, RedisPubSubBus};
-use crate::core::Core;
-use crate::storage::{InMemoryStorage, LmdbStorage, RedisStorage, set_compression_threshold};
-use crate::trie::PrefixTrie;
+use crate::bus::{CoalescingBus, InvalidateBus, LocalBus, RedisPubSubBus};
+use crate::core::{Core, EvictionLimits};
+use crate::lease::{FlightLease, LocalLease, RedisLease};
+use crate::near_cache::NearCache;
+use crate::storage::{
+    EvictionPolicy, InMemoryStorage, LmdbLruMode, LmdbStorage, RedisLruMode, RedisReadMode,
+    RedisStorage, set_compression_threshold,
+};
+use crate::trie::{PrefixTrie, TrieLayout};
 use crate::utils;
 use crate::utils::FastDashMap as DashMap;
 use crate::worker::{TtiState, spawn_worker};
 use pyo3::prelude::*;
+use std::num::NonZeroUsize;
 use std::sync::Arc;
-use std::sync::atomic::AtomicU64;
+use std::sync::atomic::{AtomicBool, AtomicU64};
+use std::time::Duration;
 
 impl Core {
     #[allow(clippy::too_many_arguments)]
@@ -29,31 +36,191 @@ impl Core {
         channel_capacity: usize,
         batch_size: usize,
         lru_cache_size: usize,
+        near_cache_size: Option<usize>,
+        distributed_flights: bool,
+        trie_layout: &str,
+        bus_coalesce_ms: Option<u64>,
+        bus_coalesce_max: usize,
+        redis_pool_size: usize,
+        redis_read_mode: &str,
+        redis_lru_mode: &str,
+        redis_tracking_size: Option<usize>,
+        lmdb_group_commit: Option<usize>,
+        lmdb_lru_mode: &str,
+        expiry_sweep_interval: u64,
+        eviction_policy: &str,
+        max_bytes: Option<usize>,
+        background_eviction: bool,
+        ttl_jitter: f64,
     ) -> PyResult<Self> {
         if lru_cache_size == 0 {
             return Err(PyErr::new::<pyo3::exceptions::PyValueError, _>(
                 "lru_cache_size must be >= 1",
             ));
         }
+        if near_cache_size == Some(0) {
+            return Err(PyErr::new::<pyo3::exceptions::PyValueError, _>(
+                "near_cache_size must be >= 1",
+            ));
+        }
+        if redis_pool_size == 0 {
+            return Err(PyErr::new::<pyo3::exceptions::PyValueError, _>(
+                "redis_pool_size must be >= 1",
+            ));
+        }
+        if !(0.0..=1.0).contains(&ttl_jitter) {
+            return Err(PyErr::new::<pyo3::exceptions::PyValueError, _>(
+                "ttl_jitter must be between 0.0 and 1.0",
+            ));
+        }
+        if lmdb_group_commit == Some(0) {
+            return Err(PyErr::new::<pyo3::exceptions::PyValueError, _>(
+                "lmdb_group_commit must be >= 1",
+            ));
+        }
+        if bus_coalesce_max == 0 {
+            return Err(PyErr::new::<pyo3::exceptions::PyValueError, _>(
+                "bus_coalesce_max must be >= 1",
+            ));
+        }
+        let Some(redis_read_mode) = RedisReadMode::parse(redis_read_mode) else {
+            return Err(PyErr::new::<pyo3::exceptions::PyValueError, _>(format!(
+                "Unsupported redis_read_mode: {} (expected 'script' or 'plain')",
+                redis_read_mode
+            )));
+        };
+        let Some(redis_lru_mode) = RedisLruMode::parse(redis_lru_mode) else {
+            return Err(PyErr::new::<pyo3::exceptions::PyValueError, _>(format!(
+                "Unsupported redis_lru_mode: {} (expected 'global', 'sharded' or 'none')",
+                redis_lru_mode
+            )));
+        };
+        let Some(lmdb_lru_mode) = LmdbLruMode::parse(lmdb_lru_mode) else {
+            return Err(PyErr::new::<pyo3::exceptions::PyValueError, _>(format!(
+                "Unsupported lmdb_lru_mode: {} (expected 'exact' or 'sampled')",
+                lmdb_lru_mode
+            )));
+        };
+        let Some(eviction_policy) = EvictionPolicy::parse(eviction_policy) else {
+            return Err(PyErr::new::<pyo3::exceptions::PyValueError, _>(format!(
+                "Unsupported eviction_policy: {} (expected 'lru' or 'tinylfu')",
+                eviction_policy
+            )));
+        };
+        if eviction_policy == EvictionPolicy::TinyLfu
+            && (storage_url.is_some() || max_entries.is_none())
+        {
+            return Err(PyErr::new::<pyo3::exceptions::PyValueError, _>(
+                "eviction_policy='tinylfu' needs in-memory storage and max_entries",
+            ));
+        }
+        let is_redis = storage_url.is_some_and(is_redis_url);
+        if max_bytes == Some(0) {
+            return Err(PyErr::new::<pyo3::exceptions::PyValueError, _>(
+                "max_bytes must be >= 1",
+            ));
+        }
+        if is_redis && max_bytes.is_some() {
+            return Err(PyErr::new::<pyo3::exceptions::PyValueError, _>(
+                "max_bytes is not supported with Redis storage; bound memory with \
+                 Redis maxmemory and maxmemory-policy instead",
+            ));
+        }
+        if is_redis && redis_lru_mode == RedisLruMode::Off && max_entries.is_some() {
+            return Err(PyErr::new::<pyo3::exceptions::PyValueError, _>(
+                "max_entries needs an LRU index; use redis_lru_mode='global' or 'sharded', \
+                 or bound memory with Redis maxmemory-policy instead",
+            ));
+        }
+        let redis_tracking_size = redis_tracking_size.and_then(NonZeroUsize::new);
+        if redis_tracking_size.is_some()
+            && storage_url.is_some_and(|url| url.starts_with("redis+cluster://"))
+        {
+            return Err(PyErr::new::<pyo3::exceptions::PyValueError, _>(
+                "redis_tracking_size is not supported with redis+cluster:// storage",
+            ));
+        }
+        let Some(trie_layout) = TrieLayout::parse(trie_layout) else {
+            return Err(PyErr::new::<pyo3::exceptions::PyValueError, _>(format!(
+                "Unsupported trie_layout: {} (expected 'sharded' or 'compact')",
+                trie_layout
+            )));
+        };
 
         set_compression_threshold(compression_threshold);
         let storage: Arc<dyn crate::storage::Storage> = match storage_url {
-            Some(url) if url.starts_with("redis://") => Arc::new(
-                RedisStorage::new(url, prefix, lru_update_interval).map_err(utils::to_conn_err)?,
+            Some(url) if is_redis_url(url) => Arc::new(
+                RedisStorage::new(
+                    url,
+                    prefix,
+                    lru_update_interval,
+                    redis_pool_size,
+                    redis_read_mode,
+                    redis_lru_mode,
+                    redis_tracking_size,
+                )
+                .map_err(utils::to_conn_err)?,
             ),
-            Some(url) if url.starts_with("lmdb://") => {
-                Arc::new(LmdbStorage::new(&url[7..], lmdb_map_size)?)
-            }
+            Some(url) if url.starts_with("lmdb://") => Arc::new(LmdbStorage::new(
+                &url[7..],
+                lmdb_map_size,
+                lmdb_group_commit,
+                lmdb_lru_mode,
+            )?),
             Some(url) => {
                 return Err(PyErr::new::<pyo3::exceptions::PyValueError, _>(format!(
                     "Unsupported storage scheme: {}",
                     url
                 )));
             }
-            None => Arc::new(InMemoryStorage::new()),
+            None => {
+                let mut memory = InMemoryStorage::new();
+                if let (EvictionPolicy::TinyLfu, Some(max)) = (eviction_policy, max_entries) {
+                    memory = memory.with_tinylfu(max);
+                }
+                if max_bytes.is_some() {
+                    memory = memory.with_size_tracking();
+                }
+                Arc::new(memory)
+            }
         };
 
-        let trie = PrefixTrie::new();
+        let near_cache = match (storage_url, near_cache_size.and_then(NonZeroUsize::new)) {
+            (Some(_), Some(capacity)) => Some(Arc::new(NearCache::new(capacity))),
+            _ => None,
+        };
+        if near_cache.is_some()
+            || (redis_tracking_size.is_some() && storage_url.is_some_and(is_redis_url))
+        {
+            // Unlike a plain LMDB/Redis hit, these tiers hand every reader the
+            // object they hold, so mutating a result changes the cached value.
+            Python::attach(|py| {
+                PyErr::warn(
+                    py,
+                    &py.get_type::<pyo3::exceptions::PyUserWarning>(),
+                    c"near_cache_size/redis_tracking_size return the same Python object \
+                      to every hit on a key; do not mutate cached results",
+                    1,
+                )
+            })?;
+        }
+
+        let flight_lease: Option<Arc<dyn FlightLease>> = match storage_url {
+            _ if !distributed_flights => None,
+            Some(url) if is_redis_url(url) => Some(Arc::new(
+                RedisLease::new(url, prefix).map_err(utils::to_conn_err)?,
+            )),
+            _ => {
+                log::warn!(
+                    "distributed_flights without Redis storage only coordinates Cores in \
+                     this process; other processes and hosts still recompute misses"
+                );
+                Some(LocalLease::shared())
+            }
+        };
+
+        let trie = PrefixTrie::with_layout(trie_layout);
+        let silent_errors = Arc::new(AtomicU64::new(0));
         let mut bus_is_remote = false;
 
         let bus: Arc<dyn InvalidateBus> = match bus_url {
@@ -70,8 +237,8 @@ impl Core {
                 let node_id_owned = node_id.unwrap_or("unknown").to_string();
 
                 r_bus.start_listener(
-                    move |tag, ver| {
-                        t_clone.set_min_version(tag, ver);
+                    move |items| {
+                        t_clone.set_min_versions(items);
                     },
                     move |prefix, req_id, client, inspect_reply_channel| {
                         let storage = Arc::clone(&storage_clone);
@@ -132,7 +299,15 @@ impl Core {
                         });
                     },
                 );
-                r_bus
+                match bus_coalesce_ms {
+                    Some(ms) if ms > 0 => Arc::new(CoalescingBus::new(
+                        r_bus,
+                        Duration::from_millis(ms),
+                        bus_coalesce_max,
+                        Arc::clone(&silent_errors),
+                    )),
+                    _ => r_bus,
+                }
             }
             None => Arc::new(LocalBus::new()),
         };
@@ -140,9 +315,16 @@ impl Core {
         let mut tti_state = None;
         let flights = Arc::new(DashMap::default());
         let flight_timeout_val = flight_timeout.unwrap_or(60);
-        let silent_errors = Arc::new(AtomicU64::new(0));
 
-        if read_extend_ttl || max_entries.is_some() || bus_is_remote {
+        let sweeps_expired =
+            expiry_sweep_interval > 0 && storage_url.is_some_and(|url| url.starts_with("lmdb://"));
+        let limits = EvictionLimits {
+            max_entries,
+            max_bytes,
+            background: background_eviction,
+        };
+        let eviction_pending = Arc::new(AtomicBool::new(false));
+        if read_extend_ttl || limits.is_bounded() || bus_is_remote || sweeps_expired {
             let tx = spawn_worker(
                 Arc::clone(&storage),
                 trie.clone(),
@@ -150,9 +332,13 @@ impl Core {
                 node_id.unwrap_or("unknown").to_string(),
                 Arc::clone(&flights),
                 Arc::clone(&silent_errors),
+                limits,
+                near_cache.clone(),
+                Arc::clone(&eviction_pending),
                 tti_flush_secs.unwrap_or(30),
                 auto_prune_secs,
                 auto_prune_interval,
+                expiry_sweep_interval,
                 bus_is_remote,
                 lru_update_interval,
                 flight_timeout_val,
@@ -163,6 +349,7 @@ impl Core {
             tti_state = Some(Arc::new(TtiState {
                 tx,
                 dropped: AtomicU64::new(0),
+                eviction_pending,
             }));
         }
 
@@ -172,11 +359,19 @@ impl Core {
             trie,
             flights,
             default_ttl,
-            max_entries,
+            ttl_jitter,
+            limits,
             tti_state,
             flight_timeout: flight_timeout_val,
             silent_errors,
             bus_is_remote,
+            near_cache,
+            flight_lease,
+            lease_tokens: Arc::new(DashMap::default()),
         })
     }
 }
+
+fn is_redis_url(url: &str) -> bool {
+    url.starts_with("redis://") || url.starts_with("redis+cluster://")
+}
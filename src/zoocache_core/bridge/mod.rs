@@ -1,11 +1,15 @@
 use crate::core::Core;
+use crate::ttl::TtlPolicy;
 use crate::{InvalidTag, StorageIsFull};
 use foldhash::HashMap;
 use pyo3::prelude::*;
 use std::sync::atomic::Ordering;
 
+mod batch;
 mod core_impl;
 mod read;
+mod remote_flight;
+mod stale;
 pub mod utils;
 mod write;
 
@@ -13,7 +17,7 @@ mod write;
 impl Core {
     #[new]
     #[allow(clippy::too_many_arguments)]
-    #[pyo3(signature = (node_id=None, storage_url=None, bus_url=None, prefix=None, default_ttl=None, read_extend_ttl=true, max_entries=None, lmdb_map_size=None, flight_timeout=60, tti_flush_secs=30, auto_prune_secs=3600, auto_prune_interval=3600, lru_update_interval=30, compression_threshold=256, channel_capacity=1000000, batch_size=1000, lru_cache_size=10000))]
+    #[pyo3(signature = (node_id=None, storage_url=None, bus_url=None, prefix=None, default_ttl=None, read_extend_ttl=true, max_entries=None, lmdb_map_size=None, flight_timeout=60, tti_flush_secs=30, auto_prune_secs=3600, auto_prune_interval=3600, lru_update_interval=30, compression_threshold=256, channel_capacity=1000000, batch_size=1000, lru_cache_size=10000, near_cache_size=None, distributed_flights=false, trie_layout="sharded", bus_coalesce_ms=None, bus_coalesce_max=1000, redis_pool_size=1, redis_read_mode="script", redis_lru_mode="global", redis_tracking_size=None, lmdb_group_commit=None, lmdb_lru_mode="exact", expiry_sweep_interval=60, eviction_policy="lru", max_bytes=None, background_eviction=false, ttl_jitter=0.0))]
     fn new(
         node_id: Option<&str>,
         storage_url: Option<&str>,
@@ -32,6 +36,22 @@ impl Core {
         channel_capacity: usize,
         batch_size: usize,
         lru_cache_size: usize,
+        near_cache_size: Option<usize>,
+        distributed_flights: bool,
+        trie_layout: &str,
+        bus_coalesce_ms: Option<u64>,
+        bus_coalesce_max: usize,
+        redis_pool_size: usize,
+        redis_read_mode: &str,
+        redis_lru_mode: &str,
+        redis_tracking_size: Option<usize>,
+        lmdb_group_commit: Option<usize>,
+        lmdb_lru_mode: &str,
+        expiry_sweep_interval: u64,
+        eviction_policy: &str,
+        max_bytes: Option<usize>,
+        background_eviction: bool,
+        ttl_jitter: f64,
     ) -> PyResult<Self> {
         Self::bridge_new(
             node_id,
@@ -51,6 +71,22 @@ impl Core {
             channel_capacity,
             batch_size,
             lru_cache_size,
+            near_cache_size,
+            distributed_flights,
+            trie_layout,
+            bus_coalesce_ms,
+            bus_coalesce_max,
+            redis_pool_size,
+            redis_read_mode,
+            redis_lru_mode,
+            redis_tracking_size,
+            lmdb_group_commit,
+            lmdb_lru_mode,
+            expiry_sweep_interval,
+            eviction_policy,
+            max_bytes,
+            background_eviction,
+            ttl_jitter,
         )
     }
 
@@ -78,6 +114,28 @@ impl Core {
         self.bridge_get_or_entry_async(py, key)
     }
 
+    #[pyo3(signature = (key, window, early_refresh=None))]
+    fn get_or_stale<'py>(
+        &self,
+        py: Python<'py>,
+        key: &str,
+        window: u64,
+        early_refresh: Option<f64>,
+    ) -> PyResult<(Option<Py<PyAny>>, bool, bool)> {
+        self.bridge_get_or_stale(py, key, window, early_refresh)
+    }
+
+    #[pyo3(signature = (key, window, early_refresh=None))]
+    fn get_or_stale_async<'py>(
+        &self,
+        py: Python<'py>,
+        key: &str,
+        window: u64,
+        early_refresh: Option<f64>,
+    ) -> PyResult<Bound<'py, PyAny>> {
+        self.bridge_get_or_stale_async(py, key, window, early_refresh)
+    }
+
     fn finish_flight(&self, _py: Python, key: &str, is_error: bool) {
         self.complete_flight(key, is_error);
     }
@@ -90,7 +148,36 @@ impl Core {
         self.bridge_get_async(py, key)
     }
 
-    #[pyo3(signature = (key, value, dependencies, ttl=None))]
+    fn get_many(&self, py: Python, keys: Vec<String>) -> PyResult<Vec<Option<Py<PyAny>>>> {
+        self.bridge_get_many(py, keys)
+    }
+
+    fn get_many_async<'py>(
+        &self,
+        py: Python<'py>,
+        keys: Vec<String>,
+    ) -> PyResult<Bound<'py, PyAny>> {
+        self.bridge_get_many_async(py, keys)
+    }
+
+    fn set_many(
+        &self,
+        py: Python,
+        items: Vec<(String, Py<PyAny>, Vec<String>, Option<u64>)>,
+    ) -> PyResult<()> {
+        self.bridge_set_many(py, items)
+    }
+
+    fn set_many_async<'py>(
+        &self,
+        py: Python<'py>,
+        items: Vec<(String, Py<PyAny>, Vec<String>, Option<u64>)>,
+    ) -> PyResult<Bound<'py, PyAny>> {
+        self.bridge_set_many_async(py, items)
+    }
+
+    #[allow(clippy::too_many_arguments)]
+    #[pyo3(signature = (key, value, dependencies, ttl=None, stale_ttl=None, cost_ms=None, ttl_policy="sliding", max_lifetime=None))]
     fn set(
         &self,
         py: Python,
@@ -98,11 +185,26 @@ impl Core {
         value: Py<PyAny>,
         dependencies: Vec<String>,
         ttl: Option<u64>,
+        stale_ttl: Option<u64>,
+        cost_ms: Option<u32>,
+        ttl_policy: &str,
+        max_lifetime: Option<u64>,
     ) -> PyResult<()> {
-        self.bridge_set(py, key, value, dependencies, ttl)
+        let ttl_policy = TtlPolicy::parse(ttl_policy, max_lifetime)?;
+        self.bridge_set(
+            py,
+            key,
+            value,
+            dependencies,
+            ttl,
+            stale_ttl,
+            cost_ms,
+            ttl_policy,
+        )
     }
 
-    #[pyo3(signature = (key, value, dependencies, ttl=None))]
+    #[allow(clippy::too_many_arguments)]
+    #[pyo3(signature = (key, value, dependencies, ttl=None, stale_ttl=None, cost_ms=None, ttl_policy="sliding", max_lifetime=None))]
     fn set_async<'py>(
         &self,
         py: Python<'py>,
@@ -110,8 +212,22 @@ impl Core {
         value: Py<PyAny>,
         dependencies: Vec<String>,
         ttl: Option<u64>,
+        stale_ttl: Option<u64>,
+        cost_ms: Option<u32>,
+        ttl_policy: &str,
+        max_lifetime: Option<u64>,
     ) -> PyResult<Bound<'py, PyAny>> {
-        self.bridge_set_async(py, key, value, dependencies, ttl)
+        let ttl_policy = TtlPolicy::parse(ttl_policy, max_lifetime)?;
+        self.bridge_set_async(
+            py,
+            key,
+            value,
+            dependencies,
+            ttl,
+            stale_ttl,
+            cost_ms,
+            ttl_policy,
+        )
     }
 
     fn invalidate(&self, py: Python, tag: String) -> PyResult<()> {
@@ -122,6 +238,18 @@ impl Core {
         self.bridge_invalidate_async(py, tag)
     }
 
+    fn invalidate_many(&self, py: Python, tags: Vec<String>) -> PyResult<()> {
+        self.bridge_invalidate_many(py, tags)
+    }
+
+    fn invalidate_many_async<'py>(
+        &self,
+        py: Python<'py>,
+        tags: Vec<String>,
+    ) -> PyResult<Bound<'py, PyAny>> {
+        self.bridge_invalidate_many_async(py, tags)
+    }
+
     fn clear(&self, py: Python) -> PyResult<()> {
         self.bridge_clear(py)
     }
@@ -180,6 +308,7 @@ impl Core {
 
 impl Core {
     fn complete_flight(&self, key: &str, is_error: bool) {
+        self.release_lease(key);
         crate::flight::complete_flight(&self.flights, key, is_error);
     }
 }
@@ -17,14 +17,22 @@ impl Core {
         let current_global_version = self.trie.get_global_version();
         let now = utils::now_secs();
 
-        if entry.trie_version == current_global_version {
+        if self
+            .trie
+            .unchanged_since(entry.trie_version, entry.dep_roots)
+        {
             if self.storage.needs_tti_worker() && self.storage.check_and_update_touch_gate() {
-                self.tti_touch(key, self.default_ttl);
+                self.tti_touch(key, self.read_extension().ttl_for(&entry));
             }
             return Ok(Some(entry.value.clone_ref(py)));
         }
 
-        let valid = crate::trie::validate_dependencies(&self.trie, &entry.dependencies, now);
+        let valid = crate::trie::validate_with_handles(
+            &self.trie,
+            &entry.dependencies,
+            &entry.handles,
+            now,
+        );
         if !valid {
             if let Err(e) = self.storage.try_remove_sync(key) {
                 log::warn!("Failed to remove invalid key '{}': {}", key, e);
@@ -37,7 +45,7 @@ impl Core {
             return Ok(None);
         }
 
-        if entry.trie_version < current_global_version {
+        if self.trie.needs_restamp(entry.trie_version) {
             if let Some(state) = &self.tti_state {
                 if let Some(raw) = raw_data {
                     if let Ok(data) = crate::storage::CacheEntry::update_trie_version_raw(
@@ -51,22 +59,20 @@ impl Core {
                         log::warn!("Failed to send Update for key '{}': {}", key, e);
                     }
                 } else {
-                    let updated_entry = Arc::new(crate::storage::CacheEntry {
-                        value: entry.value.clone_ref(py),
-                        dependencies: Arc::clone(&entry.dependencies),
-                        trie_version: current_global_version,
-                    });
+                    let updated_entry =
+                        Arc::new(entry.with_trie_version(py, current_global_version));
                     if let Err(e) = state.tx.try_send(WorkerMsg::UpdateEntry(
                         key.to_string(),
                         updated_entry,
                         expires_at.map(|e| e.saturating_sub(now)),
+                        entry.trie_version,
                     )) {
                         log::warn!("Failed to send UpdateEntry for key '{}': {}", key, e);
                     }
                 }
             }
         } else {
-            self.tti_touch(key, self.default_ttl);
+            self.tti_touch(key, self.read_extension().ttl_for(&entry));
         }
 
         Ok(Some(entry.value.clone_ref(py)))
@@ -77,7 +83,14 @@ impl Core {
         py: Python<'py>,
         key: &str,
     ) -> PyResult<Option<Py<PyAny>>> {
-        let status = self.storage.try_get_sync(py, key);
+        if let Some(val) = self.near_cache_get(py, key) {
+            return Ok(Some(val));
+        }
+
+        let status = self
+            .storage
+            .try_get_sync(py, key)
+            .map(crate::storage::StorageResult::fresh);
         let (entry, expires_at, raw_data) = match status {
             Some(crate::storage::StorageResult::Hit(e, exp, raw)) => (e, exp, raw),
             Some(crate::storage::StorageResult::Expired) => {
@@ -96,7 +109,13 @@ impl Core {
             None => return Ok(None),
         };
 
-        self.validate_entry_sync(py, key, entry, expires_at, raw_data)
+        let res = self.validate_entry_sync(py, key, Arc::clone(&entry), expires_at, raw_data)?;
+        if res.is_some()
+            && let Some(near) = &self.near_cache
+        {
+            near.put(key, entry, expires_at);
+        }
+        Ok(res)
     }
 
     pub(crate) fn bridge_get_or_entry_sync<'py>(
@@ -124,9 +143,11 @@ impl Core {
         let flights = self.flights.clone();
         let trie = self.trie.clone();
         let flight_timeout = self.flight_timeout;
-        let default_ttl = self.default_ttl;
+        let extension = self.read_extension();
         let tti_state = self.tti_state.clone();
         let key_owned = key.to_string();
+        let near_cache = self.near_cache.clone();
+        let remote = self.remote_flight();
 
         py.detach(|| {
             RUNTIME.block_on(async move {
@@ -156,18 +177,185 @@ impl Core {
                     };
                 }
 
-                let status = storage.get(&key_owned).await;
+                let res: PyResult<(Option<Py<PyAny>>, bool, bool)> = async {
+                    let status = storage.get(&key_owned).await.fresh();
+                    let (entry, expires_at, raw_data) = match status {
+                        crate::storage::StorageResult::Hit(e, exp, raw) => (e, exp, raw),
+                        crate::storage::StorageResult::Expired => {
+                            if let Some(state) = &tti_state
+                                && let Err(e) =
+                                    state.tx.try_send(WorkerMsg::Delete(key_owned.clone()))
+                            {
+                                log::warn!(
+                                    "Failed to send Delete for expired key '{}': {}",
+                                    key_owned,
+                                    e
+                                );
+                            }
+                            return Ok((None, true, false));
+                        }
+                        crate::storage::StorageResult::NotFound => {
+                            return Ok((None, true, false));
+                        }
+                        crate::storage::StorageResult::Error => {
+                            return Ok((None, true, false));
+                        }
+                    };
+
+                    let current_global_version = trie.get_global_version();
+                    let now = utils::now_secs();
+                    if trie.unchanged_since(entry.trie_version, entry.dep_roots) {
+                        if let Some(state) = &tti_state {
+                            state.touch(&key_owned, extension.ttl_for(&entry));
+                        }
+                        if let Some(near) = &near_cache {
+                            near.put(&key_owned, Arc::clone(&entry), expires_at);
+                        }
+                        let res_val = Python::attach(|py| {
+                            let val = entry.value.clone_ref(py);
+                            complete_flight(&flights, &key_owned, false);
+                            val
+                        });
+                        return Ok((Some(res_val), false, true));
+                    }
+
+                    let valid = crate::trie::validate_with_handles(
+                        &trie,
+                        &entry.dependencies,
+                        &entry.handles,
+                        now,
+                    );
+                    if !valid {
+                        if let Err(e) = storage.remove(&key_owned).await {
+                            log::warn!("Failed to remove invalid key '{}': {}", key_owned, e);
+                        }
+                        return Ok((None, true, false));
+                    }
+
+                    if trie.needs_restamp(entry.trie_version) {
+                        if let Some(state) = &tti_state {
+                            if let Some(raw) = raw_data {
+                                if let Ok(data) =
+                                    crate::storage::CacheEntry::update_trie_version_raw(
+                                        &raw,
+                                        current_global_version,
+                                    )
+                                    && let Err(e) = state.tx.try_send(WorkerMsg::Update(
+                                        key_owned.clone(),
+                                        data,
+                                        expires_at.map(|e| e.saturating_sub(now)),
+                                    ))
+                                {
+                                    log::warn!(
+                                        "Failed to send Update for key '{}': {}",
+                                        key_owned,
+                                        e
+                                    );
+                                }
+                            } else {
+                                let updated_entry = Python::attach(|py| {
+                                    Arc::new(entry.with_trie_version(py, current_global_version))
+                                });
+                                if let Err(e) = state.tx.try_send(WorkerMsg::UpdateEntry(
+                                    key_owned.clone(),
+                                    updated_entry,
+                                    expires_at.map(|e| e.saturating_sub(now)),
+                                    entry.trie_version,
+                                )) {
+                                    log::warn!(
+                                        "Failed to send UpdateEntry for key '{}': {}",
+                                        key_owned,
+                                        e
+                                    );
+                                }
+                            }
+                        }
+                    } else if let Some(state) = &tti_state {
+                        state.touch(&key_owned, extension.ttl_for(&entry));
+                    }
+
+                    if let Some(near) = &near_cache {
+                        near.put(&key_owned, Arc::clone(&entry), expires_at);
+                    }
+                    let res_val = Python::attach(|py| {
+                        let val = entry.value.clone_ref(py);
+                        complete_flight(&flights, &key_owned, false);
+                        val
+                    });
+                    Ok((Some(res_val), false, true))
+                }
+                .await;
+
+                match (&remote, res) {
+                    (Some(remote), Ok((None, true, false))) => remote.coordinate(&key_owned).await,
+                    (_, res) => res,
+                }
+            })
+        })
+    }
+
+    pub(crate) fn bridge_get_or_entry_async<'py>(
+        &self,
+        py: Python<'py>,
+        key: &str,
+    ) -> PyResult<Bound<'py, PyAny>> {
+        if let Some(val) = self.near_cache_get(py, key) {
+            return pyo3_async_runtimes::tokio::future_into_py(py, async move {
+                Ok((Some(val), false, true))
+            });
+        }
+        let storage = Arc::clone(&self.storage);
+        let flights = self.flights.clone();
+        let trie = self.trie.clone();
+        let _flight_timeout = self.flight_timeout;
+        let extension = self.read_extension();
+        let tti_state = self.tti_state.clone();
+        let key_owned = key.to_string();
+        let near_cache = self.near_cache.clone();
+        let remote = self.remote_flight();
+
+        pyo3_async_runtimes::tokio::future_into_py(py, async move {
+            let (flight, is_leader) = try_enter_flight(&flights, &key_owned);
+            if !is_leader {
+                let status = wait_for_flight(&flight, _flight_timeout).await;
+                return match status {
+                    FlightStatus::Done => {
+                        let val = Python::attach(|inner_py| {
+                            if let Some(near_val) = near_cache
+                                .as_ref()
+                                .and_then(|near| near.lookup(inner_py, &key_owned, &trie))
+                                .map(|entry| entry.value.clone_ref(inner_py))
+                            {
+                                Some(near_val)
+                            } else if let Some(crate::storage::StorageResult::Hit(e, _, _)) =
+                                storage
+                                    .try_get_sync(inner_py, &key_owned)
+                                    .map(crate::storage::StorageResult::fresh)
+                            {
+                                Some(e.value.clone_ref(inner_py))
+                            } else {
+                                None
+                            }
+                        });
+                        let is_hit = val.is_some();
+                        Ok((val, false, is_hit))
+                    }
+                    FlightStatus::Error => Err(PyErr::new::<pyo3::exceptions::PyRuntimeError, _>(
+                        "Thundering herd leader failed",
+                    )),
+                    _ => Ok((None, false, false)),
+                };
+            }
+
+            let res: PyResult<(Option<Py<PyAny>>, bool, bool)> = async {
+                let status = storage.get(&key_owned).await.fresh();
                 let (entry, expires_at, raw_data) = match status {
                     crate::storage::StorageResult::Hit(e, exp, raw) => (e, exp, raw),
                     crate::storage::StorageResult::Expired => {
                         if let Some(state) = &tti_state
                             && let Err(e) = state.tx.try_send(WorkerMsg::Delete(key_owned.clone()))
                         {
-                            log::warn!(
-                                "Failed to send Delete for expired key '{}': {}",
-                                key_owned,
-                                e
-                            );
+                            log::warn!("Failed to send Delete for key '{}': {}", key_owned, e);
                         }
                         return Ok((None, true, false));
                     }
@@ -181,9 +369,12 @@ impl Core {
 
                 let current_global_version = trie.get_global_version();
                 let now = utils::now_secs();
-                if entry.trie_version == current_global_version {
+                if trie.unchanged_since(entry.trie_version, entry.dep_roots) {
                     if let Some(state) = &tti_state {
-                        state.touch(&key_owned, default_ttl);
+                        state.touch(&key_owned, extension.ttl_for(&entry));
+                    }
+                    if let Some(near) = &near_cache {
+                        near.put(&key_owned, Arc::clone(&entry), expires_at);
                     }
                     let res_val = Python::attach(|py| {
                         let val = entry.value.clone_ref(py);
@@ -193,7 +384,12 @@ impl Core {
                     return Ok((Some(res_val), false, true));
                 }
 
-                let valid = crate::trie::validate_dependencies(&trie, &entry.dependencies, now);
+                let valid = crate::trie::validate_with_handles(
+                    &trie,
+                    &entry.dependencies,
+                    &entry.handles,
+                    now,
+                );
                 if !valid {
                     if let Err(e) = storage.remove(&key_owned).await {
                         log::warn!("Failed to remove invalid key '{}': {}", key_owned, e);
@@ -201,7 +397,7 @@ impl Core {
                     return Ok((None, true, false));
                 }
 
-                if entry.trie_version < current_global_version {
+                if trie.needs_restamp(entry.trie_version) {
                     if let Some(state) = &tti_state {
                         if let Some(raw) = raw_data {
                             if let Ok(data) = crate::storage::CacheEntry::update_trie_version_raw(
@@ -215,15 +411,14 @@ impl Core {
                                 log::warn!("Failed to send Update for key '{}': {}", key_owned, e);
                             }
                         } else {
-                            let updated_entry = Arc::new(crate::storage::CacheEntry {
-                                value: Python::attach(|py| entry.value.clone_ref(py)),
-                                dependencies: Arc::clone(&entry.dependencies),
-                                trie_version: current_global_version,
+                            let updated_entry = Python::attach(|py| {
+                                Arc::new(entry.with_trie_version(py, current_global_version))
                             });
                             if let Err(e) = state.tx.try_send(WorkerMsg::UpdateEntry(
                                 key_owned.clone(),
                                 updated_entry,
                                 expires_at.map(|e| e.saturating_sub(now)),
+                                entry.trie_version,
                             )) {
                                 log::warn!(
                                     "Failed to send UpdateEntry for key '{}': {}",
@@ -234,136 +429,25 @@ impl Core {
                         }
                     }
                 } else if let Some(state) = &tti_state {
-                    state.touch(&key_owned, default_ttl);
+                    state.touch(&key_owned, extension.ttl_for(&entry));
                 }
 
-                let res_val = Python::attach(|py| {
-                    let val = entry.value.clone_ref(py);
-                    complete_flight(&flights, &key_owned, false);
-                    val
-                });
-                Ok((Some(res_val), false, true))
-            })
-        })
-    }
-
-    pub(crate) fn bridge_get_or_entry_async<'py>(
-        &self,
-        py: Python<'py>,
-        key: &str,
-    ) -> PyResult<Bound<'py, PyAny>> {
-        let storage = Arc::clone(&self.storage);
-        let flights = self.flights.clone();
-        let trie = self.trie.clone();
-        let _flight_timeout = self.flight_timeout;
-        let default_ttl = self.default_ttl;
-        let tti_state = self.tti_state.clone();
-        let key_owned = key.to_string();
-
-        pyo3_async_runtimes::tokio::future_into_py(py, async move {
-            let (flight, is_leader) = try_enter_flight(&flights, &key_owned);
-            if !is_leader {
-                let status = wait_for_flight(&flight, _flight_timeout).await;
-                return match status {
-                    FlightStatus::Done => {
-                        let val = Python::attach(|inner_py| {
-                            if let Some(crate::storage::StorageResult::Hit(e, _, _)) =
-                                storage.try_get_sync(inner_py, &key_owned)
-                            {
-                                Some(e.value.clone_ref(inner_py))
-                            } else {
-                                None
-                            }
-                        });
-                        let is_hit = val.is_some();
-                        Ok((val, false, is_hit))
-                    }
-                    FlightStatus::Error => Err(PyErr::new::<pyo3::exceptions::PyRuntimeError, _>(
-                        "Thundering herd leader failed",
-                    )),
-                    _ => Ok((None, false, false)),
-                };
-            }
-
-            let status = storage.get(&key_owned).await;
-            let (entry, expires_at, raw_data) = match status {
-                crate::storage::StorageResult::Hit(e, exp, raw) => (e, exp, raw),
-                crate::storage::StorageResult::Expired => {
-                    if let Some(state) = &tti_state
-                        && let Err(e) = state.tx.try_send(WorkerMsg::Delete(key_owned.clone()))
-                    {
-                        log::warn!("Failed to send Delete for key '{}': {}", key_owned, e);
-                    }
-                    return Ok((None, true, false));
-                }
-                crate::storage::StorageResult::NotFound => {
-                    return Ok((None, true, false));
-                }
-                crate::storage::StorageResult::Error => {
-                    return Ok((None, true, false));
-                }
-            };
-
-            let current_global_version = trie.get_global_version();
-            let now = utils::now_secs();
-            if entry.trie_version == current_global_version {
-                if let Some(state) = &tti_state {
-                    state.touch(&key_owned, default_ttl);
+                if let Some(near) = &near_cache {
+                    near.put(&key_owned, Arc::clone(&entry), expires_at);
                 }
                 let res_val = Python::attach(|py| {
                     let val = entry.value.clone_ref(py);
                     complete_flight(&flights, &key_owned, false);
                     val
                 });
-                return Ok((Some(res_val), false, true));
-            }
-
-            let valid = crate::trie::validate_dependencies(&trie, &entry.dependencies, now);
-            if !valid {
-                if let Err(e) = storage.remove(&key_owned).await {
-                    log::warn!("Failed to remove invalid key '{}': {}", key_owned, e);
-                }
-                return Ok((None, true, false));
+                Ok((Some(res_val), false, true))
             }
+            .await;
 
-            if entry.trie_version < current_global_version {
-                if let Some(state) = &tti_state {
-                    if let Some(raw) = raw_data {
-                        if let Ok(data) = crate::storage::CacheEntry::update_trie_version_raw(
-                            &raw,
-                            current_global_version,
-                        ) && let Err(e) = state.tx.try_send(WorkerMsg::Update(
-                            key_owned.clone(),
-                            data,
-                            expires_at.map(|e| e.saturating_sub(now)),
-                        )) {
-                            log::warn!("Failed to send Update for key '{}': {}", key_owned, e);
-                        }
-                    } else {
-                        let updated_entry = Arc::new(crate::storage::CacheEntry {
-                            value: Python::attach(|py| entry.value.clone_ref(py)),
-                            dependencies: Arc::clone(&entry.dependencies),
-                            trie_version: current_global_version,
-                        });
-                        if let Err(e) = state.tx.try_send(WorkerMsg::UpdateEntry(
-                            key_owned.clone(),
-                            updated_entry,
-                            expires_at.map(|e| e.saturating_sub(now)),
-                        )) {
-                            log::warn!("Failed to send UpdateEntry for key '{}': {}", key_owned, e);
-                        }
-                    }
-                }
-            } else if let Some(state) = &tti_state {
-                state.touch(&key_owned, default_ttl);
+            match (&remote, res) {
+                (Some(remote), Ok((None, true, false))) => remote.coordinate(&key_owned).await,
+                (_, res) => res,
             }
-
-            let res_val = Python::attach(|py| {
-                let val = entry.value.clone_ref(py);
-                complete_flight(&flights, &key_owned, false);
-                val
-            });
-            Ok((Some(res_val), false, true))
         })
     }
 
@@ -379,13 +463,14 @@ impl Core {
 
         let storage = Arc::clone(&self.storage);
         let trie = self.trie.clone();
-        let default_ttl = self.default_ttl;
+        let extension = self.read_extension();
         let tti_state = self.tti_state.clone();
         let key_owned = key.to_string();
+        let near_cache = self.near_cache.clone();
 
         py.detach(|| {
             RUNTIME.block_on(async move {
-                let status = storage.get(&key_owned).await;
+                let status = storage.get(&key_owned).await.fresh();
                 let (entry, expires_at, raw_data) = match status {
                     crate::storage::StorageResult::Hit(e, exp, raw) => (e, exp, raw),
                     crate::storage::StorageResult::Expired => {
@@ -402,14 +487,22 @@ impl Core {
 
                 let current_global_version = trie.get_global_version();
                 let now = utils::now_secs();
-                if entry.trie_version == current_global_version {
+                if trie.unchanged_since(entry.trie_version, entry.dep_roots) {
                     if let Some(state) = &tti_state {
-                        state.touch(&key_owned, default_ttl);
+                        state.touch(&key_owned, extension.ttl_for(&entry));
+                    }
+                    if let Some(near) = &near_cache {
+                        near.put(&key_owned, Arc::clone(&entry), expires_at);
                     }
                     return Ok(Some(Python::attach(|py| entry.value.clone_ref(py))));
                 }
 
-                let valid = crate::trie::validate_dependencies(&trie, &entry.dependencies, now);
+                let valid = crate::trie::validate_with_handles(
+                    &trie,
+                    &entry.dependencies,
+                    &entry.handles,
+                    now,
+                );
                 if !valid {
                     if let Err(e) = storage.remove(&key_owned).await {
                         log::warn!("Failed to remove invalid key '{}': {}", key_owned, e);
@@ -417,7 +510,7 @@ impl Core {
                     return Ok(None);
                 }
 
-                if entry.trie_version < current_global_version {
+                if trie.needs_restamp(entry.trie_version) {
                     if let Some(state) = &tti_state {
                         if let Some(raw) = raw_data {
                             if let Ok(data) = crate::storage::CacheEntry::update_trie_version_raw(
@@ -431,15 +524,14 @@ impl Core {
                                 log::warn!("Failed to send Update for key '{}': {}", key_owned, e);
                             }
                         } else {
-                            let updated_entry = Arc::new(crate::storage::CacheEntry {
-                                value: Python::attach(|py| entry.value.clone_ref(py)),
-                                dependencies: Arc::clone(&entry.dependencies),
-                                trie_version: current_global_version,
+                            let updated_entry = Python::attach(|py| {
+                                Arc::new(entry.with_trie_version(py, current_global_version))
                             });
                             if let Err(e) = state.tx.try_send(WorkerMsg::UpdateEntry(
                                 key_owned.clone(),
                                 updated_entry,
                                 expires_at.map(|e| e.saturating_sub(now)),
+                                entry.trie_version,
                             )) {
                                 log::warn!(
                                     "Failed to send UpdateEntry for key '{}': {}",
@@ -450,9 +542,12 @@ impl Core {
                         }
                     }
                 } else if let Some(state) = &tti_state {
-                    state.touch(&key_owned, default_ttl);
+                    state.touch(&key_owned, extension.ttl_for(&entry));
                 }
 
+                if let Some(near) = &near_cache {
+                    near.put(&key_owned, Arc::clone(&entry), expires_at);
+                }
                 Ok(Some(Python::attach(|py| entry.value.clone_ref(py))))
             })
         })
@@ -463,14 +558,18 @@ impl Core {
         py: Python<'py>,
         key: &str,
     ) -> PyResult<Bound<'py, PyAny>> {
+        if let Some(val) = self.near_cache_get(py, key) {
+            return pyo3_async_runtimes::tokio::future_into_py(py, async move { Ok(Some(val)) });
+        }
         let storage = Arc::clone(&self.storage);
         let trie = self.trie.clone();
-        let default_ttl = self.default_ttl;
+        let extension = self.read_extension();
         let tti_state = self.tti_state.clone();
         let key_owned = key.to_string();
+        let near_cache = self.near_cache.clone();
 
         pyo3_async_runtimes::tokio::future_into_py(py, async move {
-            let status = storage.get(&key_owned).await;
+            let status = storage.get(&key_owned).await.fresh();
             let (entry, expires_at, raw_data) = match status {
                 crate::storage::StorageResult::Hit(e, exp, raw) => (e, exp, raw),
                 crate::storage::StorageResult::Expired => {
@@ -487,14 +586,18 @@ impl Core {
 
             let current_global_version = trie.get_global_version();
             let now = utils::now_secs();
-            if entry.trie_version == current_global_version {
+            if trie.unchanged_since(entry.trie_version, entry.dep_roots) {
                 if let Some(state) = &tti_state {
-                    state.touch(&key_owned, default_ttl);
+                    state.touch(&key_owned, extension.ttl_for(&entry));
+                }
+                if let Some(near) = &near_cache {
+                    near.put(&key_owned, Arc::clone(&entry), expires_at);
                 }
                 return Ok(Some(Python::attach(|py| entry.value.clone_ref(py))));
             }
 
-            let valid = crate::trie::validate_dependencies(&trie, &entry.dependencies, now);
+            let valid =
+                crate::trie::validate_with_handles(&trie, &entry.dependencies, &entry.handles, now);
             if !valid {
                 if let Err(e) = storage.remove(&key_owned).await {
                     log::warn!("Failed to remove invalid key '{}': {}", key_owned, e);
@@ -502,7 +605,7 @@ impl Core {
                 return Ok(None);
             }
 
-            if entry.trie_version < current_global_version {
+            if trie.needs_restamp(entry.trie_version) {
                 if let Some(state) = &tti_state {
                     if let Some(raw) = raw_data {
                         if let Ok(data) = crate::storage::CacheEntry::update_trie_version_raw(
@@ -516,24 +619,26 @@ impl Core {
                             log::warn!("Failed to send Update for key '{}': {}", key_owned, e);
                         }
                     } else {
-                        let updated_entry = Arc::new(crate::storage::CacheEntry {
-                            value: Python::attach(|py| entry.value.clone_ref(py)),
-                            dependencies: Arc::clone(&entry.dependencies),
-                            trie_version: current_global_version,
+                        let updated_entry = Python::attach(|py| {
+                            Arc::new(entry.with_trie_version(py, current_global_version))
                         });
                         if let Err(e) = state.tx.try_send(WorkerMsg::UpdateEntry(
                             key_owned.clone(),
                             updated_entry,
                             expires_at.map(|e| e.saturating_sub(now)),
+                            entry.trie_version,
                         )) {
                             log::warn!("Failed to send UpdateEntry for key '{}': {}", key_owned, e);
                         }
                     }
                 }
             } else if let Some(state) = &tti_state {
-                state.touch(&key_owned, default_ttl);
+                state.touch(&key_owned, extension.ttl_for(&entry));
             }
 
+            if let Some(near) = &near_cache {
+                near.put(&key_owned, Arc::clone(&entry), expires_at);
+            }
             Ok(Some(Python::attach(|py| entry.value.clone_ref(py))))
         })
     }
@@ -0,0 +1,101 @@
+use crate::core::Core;
+use crate::flight::{Flight, complete_flight};
+use crate::lease::FlightLease;
+use crate::storage::{Storage, StorageResult};
+use crate::trie::PrefixTrie;
+use crate::utils::{self, FastDashMap as DashMap};
+use pyo3::prelude::*;
+use std::sync::Arc;
+use std::time::Duration;
+
+/// Extends a local flight leader's miss to the whole cluster: the leader either
+/// takes the lease and recomputes, or waits for the node that holds it and
+/// serves what that node wrote.
+pub(super) struct RemoteFlight {
+    lease: Arc<dyn FlightLease>,
+    tokens: Arc<DashMap<String, String>>,
+    storage: Arc<dyn Storage>,
+    trie: PrefixTrie,
+    flights: Arc<DashMap<String, Arc<Flight>>>,
+    timeout_secs: u64,
+}
+
+impl RemoteFlight {
+    pub(super) async fn coordinate(&self, key: &str) -> PyResult<(Option<Py<PyAny>>, bool, bool)> {
+        if self.claim(key).await {
+            return Ok((None, true, false));
+        }
+
+        self.lease
+            .wait_released(key, Duration::from_secs(self.timeout_secs))
+            .await;
+
+        if let StorageResult::Hit(entry, _, _) = self.storage.get(key).await.fresh()
+            && (self
+                .trie
+                .unchanged_since(entry.trie_version, entry.dep_roots)
+                || crate::trie::validate_with_handles(
+                    &self.trie,
+                    &entry.dependencies,
+                    &entry.handles,
+                    utils::now_secs(),
+                ))
+        {
+            let val = Python::attach(|py| {
+                let val = entry.value.clone_ref(py);
+                complete_flight(&self.flights, key, false);
+                val
+            });
+            return Ok((Some(val), false, true));
+        }
+
+        // The holder failed or timed out without writing: recompute here.
+        self.claim(key).await;
+        Ok((None, true, false))
+    }
+
+    /// Returns `true` when this node should recompute: either it now holds the
+    /// lease or the lease backend is unreachable.
+    async fn claim(&self, key: &str) -> bool {
+        match self
+            .lease
+            .try_acquire(key, self.timeout_secs.saturating_mul(1000))
+            .await
+        {
+            Ok(Some(token)) => {
+                self.tokens.insert(key.to_string(), token);
+                true
+            }
+            Ok(None) => false,
+            Err(e) => {
+                log::warn!("Flight lease unavailable for '{}': {}", key, e);
+                true
+            }
+        }
+    }
+}
+
+impl Core {
+    pub(super) fn remote_flight(&self) -> Option<RemoteFlight> {
+        Some(RemoteFlight {
+            lease: Arc::clone(self.flight_lease.as_ref()?),
+            tokens: Arc::clone(&self.lease_tokens),
+            storage: Arc::clone(&self.storage),
+            trie: self.trie.clone(),
+            flights: Arc::clone(&self.flights),
+            timeout_secs: self.flight_timeout,
+        })
+    }
+
+    pub(super) fn release_lease(&self, key: &str) {
+        if let Some(lease) = &self.flight_lease
+            && let Some((_, token)) = self.lease_tokens.remove(key)
+        {
+            let lease = Arc::clone(lease);
+            let key = key.to_string();
+            crate::RUNTIME.spawn(async move {
+                lease.release(&key, &token).await;
+            });
+        }
+    }
+}
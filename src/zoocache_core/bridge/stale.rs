@@ -0,0 +1,160 @@
+use crate::core::Core;
+use crate::flight::{Flight, try_enter_flight};
+use crate::storage::{CacheEntry, Storage, StorageResult};
+use crate::trie::PrefixTrie;
+use crate::ttl::ReadExtension;
+use crate::utils::FastDashMap as DashMap;
+use crate::worker::TtiState;
+use crate::{RUNTIME, utils};
+use pyo3::prelude::*;
+use std::sync::Arc;
+
+/// Where a stored entry sits relative to a `stale_while_revalidate` window.
+enum Freshness {
+    Fresh,
+    Stale,
+    Gone,
+}
+
+/// Read-side state for stale-while-revalidate and early-refresh lookups.
+/// Entries written with a window keep it as extra physical TTL and record it
+/// as `stale_window`, so the logical expiry is `expires_at - stale_window`;
+/// invalidated entries stay servable for `window` seconds after the
+/// invalidation that broke them.
+struct StaleReader {
+    storage: Arc<dyn Storage>,
+    trie: PrefixTrie,
+    flights: Arc<DashMap<String, Arc<Flight>>>,
+    tti_state: Option<Arc<TtiState>>,
+    extension: ReadExtension,
+}
+
+impl StaleReader {
+    fn classify(
+        &self,
+        entry: &CacheEntry,
+        expires_at: Option<u64>,
+        window: u64,
+        early_refresh: Option<f64>,
+    ) -> Freshness {
+        let now = utils::now_secs();
+        if !self
+            .trie
+            .unchanged_since(entry.trie_version, entry.dep_roots)
+            && let Some(at) =
+                crate::trie::invalidated_at(&self.trie, &entry.dependencies, &entry.handles, now)
+        {
+            let age = utils::now_nanos().saturating_sub(at);
+            return if age <= window.saturating_mul(1_000_000_000) {
+                Freshness::Stale
+            } else {
+                Freshness::Gone
+            };
+        }
+        let Some(expiry) = entry.logical_expiry(expires_at) else {
+            return Freshness::Fresh;
+        };
+        if now > expiry {
+            return Freshness::Stale;
+        }
+        if let Some(beta) = early_refresh
+            && entry.cost_ms > 0
+            && should_refresh_early(expiry, entry.cost_ms, beta)
+        {
+            return Freshness::Stale;
+        }
+        Freshness::Fresh
+    }
+
+    /// Maps a storage result to `(value, is_leader, is_hit)`. A stale hit elects
+    /// one refresher through the flights map; everything else that cannot be
+    /// served reports a plain miss so the caller falls back to `get_or_entry`.
+    fn resolve(
+        &self,
+        py: Python,
+        key: &str,
+        status: StorageResult,
+        window: u64,
+        early_refresh: Option<f64>,
+    ) -> (Option<Py<PyAny>>, bool, bool) {
+        let StorageResult::Hit(entry, expires_at, _) = status else {
+            return (None, false, false);
+        };
+        match self.classify(&entry, expires_at, window, early_refresh) {
+            Freshness::Fresh => {
+                if let Some(state) = &self.tti_state {
+                    state.touch(key, self.extension.ttl_for(&entry));
+                }
+                (Some(entry.value.clone_ref(py)), false, true)
+            }
+            Freshness::Stale => {
+                let (_, is_leader) = try_enter_flight(&self.flights, key);
+                (Some(entry.value.clone_ref(py)), is_leader, true)
+            }
+            Freshness::Gone => (None, false, false),
+        }
+    }
+}
+
+/// XFetch (Vattani et al.): refresh when `now - cost * beta * ln(rand) >= expiry`.
+/// The chance grows as expiry approaches and with the recompute cost, so across
+/// a fleet usually a single caller refreshes shortly before the entry expires.
+fn should_refresh_early(expiry: u64, cost_ms: u32, beta: f64) -> bool {
+    let now = utils::now_nanos() as f64 / 1e9;
+    let cost = cost_ms as f64 / 1e3;
+    let gap = -cost * beta * rand::random::<f64>().ln();
+    now + gap >= expiry as f64
+}
+
+impl Core {
+    fn stale_reader(&self) -> StaleReader {
+        StaleReader {
+            storage: Arc::clone(&self.storage),
+            trie: self.trie.clone(),
+            flights: Arc::clone(&self.flights),
+            tti_state: self.tti_state.clone(),
+            extension: self.read_extension(),
+        }
+    }
+
+    pub(crate) fn bridge_get_or_stale(
+        &self,
+        py: Python,
+        key: &str,
+        window: u64,
+        early_refresh: Option<f64>,
+    ) -> PyResult<(Option<Py<PyAny>>, bool, bool)> {
+        let reader = self.stale_reader();
+        let status = match self.storage.try_get_sync(py, key) {
+            Some(status) => status,
+            None => {
+                let storage = Arc::clone(&self.storage);
+                py.detach(|| RUNTIME.block_on(storage.get(key)))
+            }
+        };
+        Ok(reader.resolve(py, key, status, window, early_refresh))
+    }
+
+    pub(crate) fn bridge_get_or_stale_async<'py>(
+        &self,
+        py: Python<'py>,
+        key: &str,
+        window: u64,
+        early_refresh: Option<f64>,
+    ) -> PyResult<Bound<'py, PyAny>> {
+        let reader = self.stale_reader();
+
+        if let Some(status) = self.storage.try_get_sync(py, key) {
+            let res = reader.resolve(py, key, status, window, early_refresh);
+            return pyo3_async_runtimes::tokio::future_into_py(py, async move { Ok(res) });
+        }
+
+        let key_owned = key.to_string();
+        pyo3_async_runtimes::tokio::future_into_py(py, async move {
+            let status = reader.storage.get(&key_owned).await;
+            Ok(Python::attach(|py| {
+                reader.resolve(py, &key_owned, status, window, early_refresh)
+            }))
+        })
+    }
+}
@@ -1,6 +1,7 @@
 use crate::core::Core;
 use crate::storage::CacheEntry;
 use crate::trie::build_dependency_snapshots;
+use crate::ttl::{self, TtlPolicy};
 use crate::worker::WorkerMsg;
 use crate::{RUNTIME, utils};
 use foldhash::HashMap;
@@ -9,6 +10,7 @@ use std::sync::Arc;
 use std::sync::atomic::Ordering;
 
 impl Core {
+    #[allow(clippy::too_many_arguments)]
     pub(crate) fn bridge_set(
         &self,
         py: Python,
@@ -16,50 +18,53 @@ impl Core {
         value: Py<PyAny>,
         dependencies: Vec<String>,
         ttl: Option<u64>,
+        stale_ttl: Option<u64>,
+        cost_ms: Option<u32>,
+        ttl_policy: TtlPolicy,
     ) -> PyResult<()> {
         for tag in &dependencies {
             super::utils::validate_tag(tag)?;
         }
         let trie_version = self.trie.get_global_version();
-        let snapshots = build_dependency_snapshots(&self.trie, dependencies, utils::now_secs());
+        let now = utils::now_secs();
+        let snapshots = build_dependency_snapshots(&self.trie, dependencies, now);
+        let (final_ttl, max_expires_at) = self.write_ttl(now, ttl, stale_ttl, ttl_policy);
         let entry = Arc::new(crate::storage::CacheEntry {
             value,
+            dep_roots: crate::trie::root_mask(&snapshots),
             dependencies: snapshots,
             trie_version,
+            cost_ms: cost_ms.unwrap_or(0),
+            handles: Default::default(),
+            max_expires_at,
+            stale_window: stale_ttl.unwrap_or(0),
         });
         let storage = Arc::clone(&self.storage);
-        let final_ttl = ttl.or(self.default_ttl);
-        let max_entries = self.max_entries;
+        let limits = self.limits;
         let trie = self.trie.clone();
 
         let res = storage.try_set_sync(py, key.clone(), Arc::clone(&entry), final_ttl);
         if storage.is_sync_storage() || res.is_ok() {
-            if let Ok(()) = res
-                && let Some(max) = max_entries
-                && let Some(current) = storage.try_len_sync()
-                && current > max
-            {
-                let to_evict = current - max + (max / 10).max(1);
-                if let Some(Ok(_evicted)) = storage.try_evict_lru_sync(to_evict) {
-                    if let Some(state) = &self.tti_state {
-                        let _ = state.tx.try_send(WorkerMsg::Prune(0));
-                    } else {
-                        trie.prune(0);
-                    }
-                }
+            if res.is_ok() {
+                self.remember_near(&key, &entry, final_ttl);
+                self.evict_overflow_sync();
             }
             return res;
         }
 
         py.detach(|| {
             RUNTIME.block_on(async move {
-                storage.set(key, entry, final_ttl).await?;
+                storage
+                    .set(key.clone(), Arc::clone(&entry), final_ttl)
+                    .await?;
+                self.remember_near(&key, &entry, final_ttl);
 
-                if let Some(max) = max_entries {
+                if limits.is_bounded() {
                     let current = storage.len().await;
-                    if current > max {
-                        let to_evict = current - max + (max / 10).max(1);
-                        storage.evict_lru(to_evict).await?;
+                    let to_evict = limits.overflow(current, storage.size_bytes());
+                    if to_evict > 0 && !limits.defer_to_worker(self.tti_state.as_deref()) {
+                        let evicted = storage.evict_lru(to_evict).await?;
+                        self.forget_near(&evicted);
                         if let Some(state) = &self.tti_state {
                             let _ = state.tx.try_send(WorkerMsg::Prune(0));
                         } else {
@@ -72,6 +77,7 @@ impl Core {
         })
     }
 
+    #[allow(clippy::too_many_arguments)]
     pub(crate) fn bridge_set_async<'py>(
         &self,
         py: Python<'py>,
@@ -79,37 +85,36 @@ impl Core {
         value: Py<PyAny>,
         dependencies: Vec<String>,
         ttl: Option<u64>,
+        stale_ttl: Option<u64>,
+        cost_ms: Option<u32>,
+        ttl_policy: TtlPolicy,
     ) -> PyResult<Bound<'py, PyAny>> {
         for tag in &dependencies {
             super::utils::validate_tag(tag)?;
         }
         let trie_version = self.trie.get_global_version();
-        let snapshots = build_dependency_snapshots(&self.trie, dependencies, utils::now_secs());
+        let now = utils::now_secs();
+        let snapshots = build_dependency_snapshots(&self.trie, dependencies, now);
+        let (final_ttl, max_expires_at) = self.write_ttl(now, ttl, stale_ttl, ttl_policy);
         let entry = Arc::new(CacheEntry {
             value,
+            dep_roots: crate::trie::root_mask(&snapshots),
             dependencies: snapshots,
             trie_version,
+            cost_ms: cost_ms.unwrap_or(0),
+            handles: Default::default(),
+            max_expires_at,
+            stale_window: stale_ttl.unwrap_or(0),
         });
         let storage = Arc::clone(&self.storage);
-        let final_ttl = ttl.or(self.default_ttl);
-        let max_entries = self.max_entries;
+        let limits = self.limits;
         let trie = self.trie.clone();
 
         let res = storage.try_set_sync(py, key.clone(), Arc::clone(&entry), final_ttl);
         if storage.is_sync_storage() || res.is_ok() {
-            if let Ok(()) = res
-                && let Some(max) = max_entries
-                && let Some(current) = storage.try_len_sync()
-                && current > max
-            {
-                let to_evict = current - max + (max / 10).max(1);
-                if let Some(Ok(_evicted)) = storage.try_evict_lru_sync(to_evict) {
-                    if let Some(state) = &self.tti_state {
-                        let _ = state.tx.try_send(WorkerMsg::Prune(0));
-                    } else {
-                        trie.prune(0);
-                    }
-                }
+            if res.is_ok() {
+                self.remember_near(&key, &entry, final_ttl);
+                self.evict_overflow_sync();
             }
             return pyo3_async_runtimes::tokio::future_into_py(py, async move {
                 Ok(Python::attach(|py| py.None()))
@@ -117,15 +122,24 @@ impl Core {
         }
 
         let tti_state = self.tti_state.clone();
+        let near_cache = self.near_cache.clone();
 
         pyo3_async_runtimes::tokio::future_into_py(py, async move {
-            storage.set(key, entry, final_ttl).await?;
+            storage
+                .set(key.clone(), Arc::clone(&entry), final_ttl)
+                .await?;
+            if let Some(near) = &near_cache {
+                near.remember(&key, &entry, final_ttl);
+            }
 
-            if let Some(max) = max_entries {
+            if limits.is_bounded() {
                 let current = storage.len().await;
-                if current > max {
-                    let to_evict = current - max + (max / 10).max(1);
-                    storage.evict_lru(to_evict).await?;
+                let to_evict = limits.overflow(current, storage.size_bytes());
+                if to_evict > 0 && !limits.defer_to_worker(tti_state.as_deref()) {
+                    let evicted = storage.evict_lru(to_evict).await?;
+                    if let Some(near) = &near_cache {
+                        near.forget(&evicted);
+                    }
                     if let Some(state) = &tti_state {
                         if let Err(e) = state.tx.try_send(WorkerMsg::Prune(0)) {
                             log::warn!("Failed to cleanly trigger bg prune (slow path): {}", e);
@@ -184,10 +198,61 @@ impl Core {
         })
     }
 
+    /// Collapses the batch to its distinct uncovered tags, bumps the trie once
+    /// for all of them, and announces them in a single bus message.
+    fn invalidate_batch(&self, tags: Vec<String>) -> PyResult<Vec<(String, u64)>> {
+        for tag in &tags {
+            super::utils::validate_tag(tag)?;
+        }
+        let tags = crate::trie::collapse_covered(tags);
+        let versions = self.trie.invalidate_many(&tags);
+        Ok(tags.into_iter().zip(versions).collect())
+    }
+
+    pub(crate) fn bridge_invalidate_many(&self, py: Python, tags: Vec<String>) -> PyResult<()> {
+        let items = self.invalidate_batch(tags)?;
+
+        if self.bus_is_remote && !items.is_empty() {
+            let bus = Arc::clone(&self.bus);
+            let silent_errors = Arc::clone(&self.silent_errors);
+            py.detach(|| {
+                RUNTIME.spawn(async move {
+                    if let Err(e) = bus.publish_many(&items).await {
+                        silent_errors.fetch_add(1, Ordering::Relaxed);
+                        log::warn!("Failed to publish {} invalidations: {}", items.len(), e);
+                    }
+                });
+            });
+        }
+        Ok(())
+    }
+
+    pub(crate) fn bridge_invalidate_many_async<'py>(
+        &self,
+        py: Python<'py>,
+        tags: Vec<String>,
+    ) -> PyResult<Bound<'py, PyAny>> {
+        let items = self.invalidate_batch(tags)?;
+        let bus = Arc::clone(&self.bus);
+        let silent_errors = Arc::clone(&self.silent_errors);
+
+        pyo3_async_runtimes::tokio::future_into_py(py, async move {
+            if let Err(e) = bus.publish_many(&items).await {
+                silent_errors.fetch_add(1, Ordering::Relaxed);
+                log::warn!("Failed to publish {} invalidations: {}", items.len(), e);
+            }
+            Ok(Python::attach(|py| py.None()))
+        })
+    }
+
     pub(crate) fn bridge_clear(&self, py: Python) -> PyResult<()> {
         let storage = Arc::clone(&self.storage);
         let trie = self.trie.clone();
 
+        if let Some(near) = &self.near_cache {
+            near.clear();
+        }
+
         let res = storage.try_clear_sync();
         if storage.is_sync_storage() || res.is_ok() {
             if res.is_ok() {
@@ -206,6 +271,9 @@ impl Core {
     }
 
     pub(crate) fn bridge_clear_async<'py>(&self, py: Python<'py>) -> PyResult<Bound<'py, PyAny>> {
+        if let Some(near) = &self.near_cache {
+            near.clear();
+        }
         let storage = Arc::clone(&self.storage);
         let trie = self.trie.clone();
         pyo3_async_runtimes::tokio::future_into_py(py, async move {
@@ -215,6 +283,59 @@ impl Core {
         })
     }
 
+    /// Trims storage back under `max_entries`/`max_bytes` after a write on
+    /// sync backends.
+    pub(super) fn evict_overflow_sync(&self) {
+        if !self.limits.is_bounded() {
+            return;
+        }
+        let Some(current) = self.storage.try_len_sync() else {
+            return;
+        };
+        let to_evict = self.limits.overflow(current, self.storage.size_bytes());
+        if to_evict > 0
+            && !self.limits.defer_to_worker(self.tti_state.as_deref())
+            && let Some(Ok(evicted)) = self.storage.try_evict_lru_sync(to_evict)
+        {
+            self.forget_near(&evicted);
+            if let Some(state) = &self.tti_state {
+                let _ = state.tx.try_send(WorkerMsg::Prune(0));
+            } else {
+                self.trie.prune(0);
+            }
+        }
+    }
+
+    /// Physical TTL for a single-key write (jittered, then bounded by the
+    /// policy) and the entry's `max_expires_at`. Entries served
+    /// stale-while-revalidate outlive their logical TTL by the window, which
+    /// they record as `stale_window`.
+    fn write_ttl(
+        &self,
+        now: u64,
+        ttl: Option<u64>,
+        stale_ttl: Option<u64>,
+        policy: TtlPolicy,
+    ) -> (Option<u64>, Option<u64>) {
+        let window = stale_ttl.unwrap_or(0);
+        let ttl = ttl
+            .or(self.default_ttl)
+            .map(|t| ttl::jitter(t, self.ttl_jitter).saturating_add(window));
+        policy.apply(now, ttl, window)
+    }
+
+    pub(super) fn remember_near(&self, key: &str, entry: &Arc<CacheEntry>, ttl: Option<u64>) {
+        if let Some(near) = &self.near_cache {
+            near.remember(key, entry, ttl);
+        }
+    }
+
+    pub(super) fn forget_near(&self, keys: &[String]) {
+        if let Some(near) = &self.near_cache {
+            near.forget(keys);
+        }
+    }
+
     pub(crate) fn bridge_flush_metrics(&self, metrics: HashMap<String, f64>) -> PyResult<()> {
         if let Some(state) = &self.tti_state
             && let Err(e) = state.tx.try_send(WorkerMsg::FlushMetrics(metrics))
@@ -0,0 +1,101 @@
+use super::InvalidateBus;
+use async_trait::async_trait;
+use foldhash::HashMap;
+use std::sync::Arc;
+use std::sync::atomic::{AtomicU64, Ordering};
+use std::time::Duration;
+use tokio::sync::mpsc;
+use tokio::time::Instant;
+
+const QUEUE_CAPACITY: usize = 65_536;
+
+/// Publisher stage in front of a remote bus: invalidations are queued and
+/// flushed as one multi-tag message once the window elapses or `max_tags`
+/// distinct tags are pending, keeping only the highest version per tag.
+pub(crate) struct CoalescingBus {
+    inner: Arc<dyn InvalidateBus>,
+    tx: mpsc::Sender<(String, u64)>,
+}
+
+impl CoalescingBus {
+    pub fn new(
+        inner: Arc<dyn InvalidateBus>,
+        window: Duration,
+        max_tags: usize,
+        silent_errors: Arc<AtomicU64>,
+    ) -> Self {
+        let (tx, rx) = mpsc::channel(QUEUE_CAPACITY);
+        crate::RUNTIME.spawn(Self::run(
+            Arc::clone(&inner),
+            rx,
+            window,
+            max_tags,
+            silent_errors,
+        ));
+        Self { inner, tx }
+    }
+
+    async fn run(
+        inner: Arc<dyn InvalidateBus>,
+        mut rx: mpsc::Receiver<(String, u64)>,
+        window: Duration,
+        max_tags: usize,
+        silent_errors: Arc<AtomicU64>,
+    ) {
+        let mut pending: HashMap<String, u64> = HashMap::default();
+
+        while let Some((tag, version)) = rx.recv().await {
+            Self::merge(&mut pending, tag, version);
+            let deadline = Instant::now() + window;
+            while pending.len() < max_tags {
+                match tokio::time::timeout_at(deadline, rx.recv()).await {
+                    Ok(Some((tag, version))) => Self::merge(&mut pending, tag, version),
+                    Ok(None) | Err(_) => break,
+                }
+            }
+
+            let items: Vec<(String, u64)> = pending.drain().collect();
+            if let Err(e) = inner.publish_many(&items).await {
+                silent_errors.fetch_add(1, Ordering::Relaxed);
+                log::warn!(
+                    "Failed to publish {} coalesced invalidations: {}",
+                    items.len(),
+                    e
+                );
+            }
+        }
+    }
+
+    fn merge(pending: &mut HashMap<String, u64>, tag: String, version: u64) {
+        let slot = pending.entry(tag).or_insert(version);
+        *slot = (*slot).max(version);
+    }
+}
+
+#[async_trait]
+impl InvalidateBus for CoalescingBus {
+    async fn publish(
+        &self,
+        tag: &str,
+        version: u64,
+    ) -> Result<(), Box<dyn std::error::Error + Send + Sync>> {
+        self.tx
+            .send((tag.to_string(), version))
+            .await
+            .map_err(|e| Box::new(e) as Box<dyn std::error::Error + Send + Sync>)
+    }
+
+    async fn publish_many(
+        &self,
+        items: &[(String, u64)],
+    ) -> Result<(), Box<dyn std::error::Error + Send + Sync>> {
+        for (tag, version) in items {
+            self.publish(tag, *version).await?;
+        }
+        Ok(())
+    }
+
+    async fn push_heartbeat(&self, node_id: &str, payload: &str, ttl: u64) -> pyo3::PyResult<()> {
+        self.inner.push_heartbeat(node_id, payload, ttl).await
+    }
+}
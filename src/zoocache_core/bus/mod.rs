@@ -1,6 +1,8 @@
+mod coalesce;
 mod local;
 mod redis_pubsub;
 
+pub(crate) use coalesce::CoalescingBus;
 pub(crate) use local::LocalBus;
 pub(crate) use redis_pubsub::RedisPubSubBus;
 
@@ -13,6 +15,16 @@ pub(crate) trait InvalidateBus: Send + Sync {
         tag: &str,
         version: u64,
     ) -> Result<(), Box<dyn std::error::Error + Send + Sync>>;
+    /// Publishes several invalidations; remote buses send them as one message.
+    async fn publish_many(
+        &self,
+        items: &[(String, u64)],
+    ) -> Result<(), Box<dyn std::error::Error + Send + Sync>> {
+        for (tag, version) in items {
+            self.publish(tag, *version).await?;
+        }
+        Ok(())
+    }
     async fn push_heartbeat(
         &self,
         _node_id: &str,
@@ -1,14 +1,12 @@
+use crate::redis_conn::{RedisConn, RedisConnections};
 use async_trait::async_trait;
-use redis::aio::MultiplexedConnection;
 use redis::{AsyncCommands, Client};
-use std::sync::Arc;
-use tokio::sync::RwLock;
 
 use super::InvalidateBus;
 
 pub(crate) struct RedisPubSubBus {
     client: Client,
-    connection: Arc<RwLock<Option<MultiplexedConnection>>>,
+    connections: RedisConnections,
     channel: String,
     node_channel: Option<String>,
     inspect_channel: String,
@@ -31,8 +29,8 @@ impl RedisPubSubBus {
         let inspect_reply_channel = format!("{}:inspect:reply", p_str);
 
         Ok(Self {
+            connections: RedisConnections::new(client.clone(), 1),
             client,
-            connection: Arc::new(RwLock::new(None)),
             channel: channel
                 .map(|s| s.to_string())
                 .unwrap_or_else(|| format!("{}:invalidate", p_str)),
@@ -43,25 +41,17 @@ impl RedisPubSubBus {
         })
     }
 
-    async fn get_conn(&self) -> Result<MultiplexedConnection, redis::RedisError> {
-        let mut conn_guard = self.connection.write().await;
-        if let Some(conn) = &*conn_guard {
-            return Ok(conn.clone());
-        }
-
-        let conn = self.client.get_multiplexed_async_connection().await?;
-        *conn_guard = Some(conn.clone());
-        Ok(conn)
+    async fn get_conn(&self) -> Result<RedisConn, redis::RedisError> {
+        self.connections.get().await
     }
 
-    async fn clear_conn(&self) {
-        let mut conn_guard = self.connection.write().await;
-        *conn_guard = None;
+    fn clear_conn(&self) {
+        self.connections.reset();
     }
 
     pub fn start_listener<F, I>(&self, invalidate_cb: F, inspect_cb: I)
     where
-        F: Fn(&str, u64) + Send + Sync + 'static,
+        F: Fn(&[(&str, u64)]) + Send + Sync + 'static,
         I: Fn(&str, &str, Client, String) + Send + Sync + 'static,
     {
         let client = self.client.clone();
@@ -131,10 +121,18 @@ impl RedisPubSubBus {
                                 inspect_reply_channel.clone(),
                             );
                         }
-                    } else if let Some((tag, ver_str)) = payload.rsplit_once('|')
-                        && let Ok(ver) = ver_str.trim().parse::<u64>()
-                    {
-                        invalidate_cb(tag.trim(), ver);
+                    } else {
+                        // One `tag|version` per line; batches carry several.
+                        let items: Vec<(&str, u64)> = payload
+                            .lines()
+                            .filter_map(|line| {
+                                let (tag, ver_str) = line.rsplit_once('|')?;
+                                Some((tag.trim(), ver_str.trim().parse::<u64>().ok()?))
+                            })
+                            .collect();
+                        if !items.is_empty() {
+                            invalidate_cb(&items);
+                        }
                     }
                 }
 
@@ -163,6 +161,29 @@ impl InvalidateBus for RedisPubSubBus {
         Ok(())
     }
 
+    async fn publish_many(
+        &self,
+        items: &[(String, u64)],
+    ) -> Result<(), Box<dyn std::error::Error + Send + Sync>> {
+        if items.is_empty() {
+            return Ok(());
+        }
+        let mut conn = self
+            .get_conn()
+            .await
+            .map_err(|e| Box::new(e) as Box<dyn std::error::Error + Send + Sync>)?;
+        let payload = items
+            .iter()
+            .map(|(tag, version)| format!("{}|{}", tag, version))
+            .collect::<Vec<_>>()
+            .join("\n");
+        let _: usize = conn
+            .publish(&self.channel, payload)
+            .await
+            .map_err(|e| Box::new(e) as Box<dyn std::error::Error + Send + Sync>)?;
+        Ok(())
+    }
+
     async fn push_heartbeat(&self, node_id: &str, payload: &str, ttl: u64) -> pyo3::PyResult<()> {
         use crate::utils::to_conn_err;
         let mut conn = self.get_conn().await.map_err(to_conn_err)?;
@@ -170,7 +191,7 @@ impl InvalidateBus for RedisPubSubBus {
 
         let res: Result<(), redis::RedisError> = conn.set_ex(key, payload.to_string(), ttl).await;
         if res.is_err() {
-            self.clear_conn().await;
+            self.clear_conn();
         }
         res.map_err(to_conn_err)?;
 
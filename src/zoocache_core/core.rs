@@ -1,7 +1,10 @@
 use crate::bus::InvalidateBus;
 use crate::flight::Flight;
+use crate::lease::FlightLease;
+use crate::near_cache::NearCache;
 use crate::storage::Storage;
 use crate::trie::PrefixTrie;
+use crate::ttl::ReadExtension;
 use crate::utils::FastDashMap as DashMap;
 use crate::worker::TtiState;
 use pyo3::prelude::*;
@@ -15,11 +18,59 @@ pub(crate) struct Core {
     pub(crate) trie: PrefixTrie,
     pub(crate) flights: Arc<DashMap<String, Arc<Flight>>>,
     pub(crate) default_ttl: Option<u64>,
-    pub(crate) max_entries: Option<usize>,
+    pub(crate) ttl_jitter: f64,
+    pub(crate) limits: EvictionLimits,
     pub(crate) tti_state: Option<Arc<TtiState>>,
     pub(crate) flight_timeout: u64,
     pub(crate) silent_errors: Arc<AtomicU64>,
     pub(crate) bus_is_remote: bool,
+    pub(crate) near_cache: Option<Arc<NearCache>>,
+    pub(crate) flight_lease: Option<Arc<dyn FlightLease>>,
+    pub(crate) lease_tokens: Arc<DashMap<String, String>>,
+}
+
+/// Size bounds storage is trimmed back under after writes.
+#[derive(Clone, Copy, Debug, Default)]
+pub(crate) struct EvictionLimits {
+    pub(crate) max_entries: Option<usize>,
+    pub(crate) max_bytes: Option<usize>,
+    /// Leave trimming to the worker instead of the writing call.
+    pub(crate) background: bool,
+}
+
+impl EvictionLimits {
+    pub(crate) fn is_bounded(&self) -> bool {
+        self.max_entries.is_some() || self.max_bytes.is_some()
+    }
+
+    /// How many entries to evict from storage holding `len` entries and
+    /// `bytes` bytes (`None` if untracked): enough to get 10% under each
+    /// exceeded bound. Byte pressure is converted to entries by the current
+    /// average entry size.
+    pub(crate) fn overflow(&self, len: usize, bytes: Option<usize>) -> usize {
+        let mut to_evict = 0;
+        if let Some(max) = self.max_entries
+            && len > max
+        {
+            to_evict = len - max + (max / 10).max(1);
+        }
+        if let (Some(max), Some(bytes)) = (self.max_bytes, bytes)
+            && bytes > max
+            && len > 0
+        {
+            let avg = (bytes / len).max(1);
+            let target = max - max / 10;
+            to_evict = to_evict.max((bytes - target).div_ceil(avg));
+        }
+        to_evict.min(len)
+    }
+
+    /// With background eviction, signals the worker and returns `true` if the
+    /// writer can skip evicting inline. Falls back to inline eviction (`false`)
+    /// when there is no worker or its queue is full.
+    pub(crate) fn defer_to_worker(&self, tti_state: Option<&TtiState>) -> bool {
+        self.background && tti_state.is_some_and(|state| state.request_eviction())
+    }
 }
 
 impl Core {
@@ -28,4 +79,17 @@ impl Core {
             state.touch(key, ttl);
         }
     }
+
+    pub(crate) fn read_extension(&self) -> ReadExtension {
+        ReadExtension {
+            ttl: self.default_ttl,
+            jitter: self.ttl_jitter,
+        }
+    }
+
+    pub(crate) fn near_cache_get(&self, py: Python, key: &str) -> Option<Py<PyAny>> {
+        let entry = self.near_cache.as_ref()?.lookup(py, key, &self.trie)?;
+        self.tti_touch(key, self.read_extension().ttl_for(&entry));
+        Some(entry.value.clone_ref(py))
+    }
 }
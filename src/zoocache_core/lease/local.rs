@@ -0,0 +1,92 @@
+use super::FlightLease;
+use crate::utils::FastDashMap as DashMap;
+use async_trait::async_trait;
+use dashmap::mapref::entry::Entry;
+use once_cell::sync::Lazy;
+use std::sync::Arc;
+use std::time::{Duration, Instant};
+use tokio::sync::Notify;
+
+struct Held {
+    token: String,
+    expires: Instant,
+    released: Notify,
+}
+
+/// In-process lease table. Every `Core` in the process shares one instance, so
+/// several cores can stand in for separate nodes in tests.
+pub(crate) struct LocalLease {
+    held: DashMap<String, Arc<Held>>,
+}
+
+static SHARED: Lazy<Arc<LocalLease>> = Lazy::new(|| {
+    Arc::new(LocalLease {
+        held: DashMap::default(),
+    })
+});
+
+impl LocalLease {
+    pub fn shared() -> Arc<Self> {
+        Arc::clone(&SHARED)
+    }
+}
+
+#[async_trait]
+impl FlightLease for LocalLease {
+    async fn try_acquire(
+        &self,
+        key: &str,
+        ttl_ms: u64,
+    ) -> Result<Option<String>, Box<dyn std::error::Error + Send + Sync>> {
+        let now = Instant::now();
+        let token = super::new_token();
+        let held = Arc::new(Held {
+            token: token.clone(),
+            expires: now + Duration::from_millis(ttl_ms),
+            released: Notify::new(),
+        });
+        match self.held.entry(key.to_string()) {
+            Entry::Occupied(mut slot) => {
+                if slot.get().expires > now {
+                    return Ok(None);
+                }
+                slot.get().released.notify_waiters();
+                slot.insert(held);
+            }
+            Entry::Vacant(slot) => {
+                slot.insert(held);
+            }
+        }
+        Ok(Some(token))
+    }
+
+    async fn release(&self, key: &str, token: &str) {
+        if let Some((_, held)) = self.held.remove_if(key, |_, held| held.token == token) {
+            held.released.notify_waiters();
+        }
+    }
+
+    async fn wait_released(&self, key: &str, timeout: Duration) -> bool {
+        let Some(held) = self.held.get(key).map(|h| Arc::clone(h.value())) else {
+            return true;
+        };
+        let notified = held.released.notified();
+        tokio::pin!(notified);
+        notified.as_mut().enable();
+
+        let still_held = self
+            .held
+            .get(key)
+            .is_some_and(|h| Arc::ptr_eq(h.value(), &held));
+        if !still_held {
+            return true;
+        }
+
+        let until_expiry = held.expires.saturating_duration_since(Instant::now());
+        let _ = tokio::time::timeout(timeout.min(until_expiry), notified).await;
+        !self
+            .held
+            .get(key)
+            .is_some_and(|h| Arc::ptr_eq(h.value(), &held) && h.expires > Instant::now())
+    }
+}
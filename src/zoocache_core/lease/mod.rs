@@ -0,0 +1,30 @@
+mod local;
+mod redis;
+
+pub(crate) use local::LocalLease;
+pub(crate) use redis::RedisLease;
+
+use async_trait::async_trait;
+use std::time::Duration;
+
+/// Cluster-wide counterpart of the in-process flights map: at most one holder
+/// per cache key recomputes a miss, everyone else waits for it to release.
+#[async_trait]
+pub(crate) trait FlightLease: Send + Sync {
+    /// Takes the lease for `key`, returning the token needed to release it, or
+    /// `None` when another holder already has it.
+    async fn try_acquire(
+        &self,
+        key: &str,
+        ttl_ms: u64,
+    ) -> Result<Option<String>, Box<dyn std::error::Error + Send + Sync>>;
+    /// Releases the lease if `token` still owns it and wakes waiters.
+    async fn release(&self, key: &str, token: &str);
+    /// Waits until the lease on `key` is released or expires. Returns `false`
+    /// on timeout.
+    async fn wait_released(&self, key: &str, timeout: Duration) -> bool;
+}
+
+fn new_token() -> String {
+    format!("{:016x}", rand::random::<u64>())
+}
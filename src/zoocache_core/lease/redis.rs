@@ -0,0 +1,206 @@
+use super::FlightLease;
+use crate::redis_conn::{self, RedisConn, RedisConnections};
+use crate::utils::FastDashMap as DashMap;
+use async_trait::async_trait;
+use once_cell::sync::Lazy;
+use redis::cluster::ClusterClient;
+use redis::{AsyncCommands, Client};
+use std::sync::Arc;
+use std::time::{Duration, Instant};
+use tokio::sync::Notify;
+
+/// Deletes the lease only if the caller still owns it, then announces the key
+/// on the done channel so waiting nodes re-read storage right away.
+const RELEASE_SCRIPT: &str = r#"
+    if redis.call('GET', KEYS[1]) == ARGV[1] then
+        redis.call('DEL', KEYS[1])
+        redis.call('PUBLISH', ARGV[2], ARGV[3])
+        return 1
+    end
+    return 0
+"#;
+
+static RELEASE: Lazy<redis::Script> = Lazy::new(|| redis::Script::new(RELEASE_SCRIPT));
+
+/// Upper bound between lease checks while waiting, covering lost pub/sub
+/// messages and holders that die without releasing.
+const POLL_INTERVAL: Duration = Duration::from_millis(250);
+
+pub(crate) struct RedisLease {
+    client: Client,
+    connections: RedisConnections,
+    prefix: String,
+    done_channel: String,
+    waiters: Arc<DashMap<String, Arc<Notify>>>,
+}
+
+impl RedisLease {
+    pub fn new(url: &str, prefix: Option<&str>) -> Result<Self, redis::RedisError> {
+        // On a cluster, lease keys are routed by slot while the done channel is
+        // heard from any one node, since PUBLISH reaches the whole cluster.
+        let (client, connections) = match redis_conn::cluster_nodes(url) {
+            Some(nodes) => (
+                Client::open(nodes[0].as_str())?,
+                RedisConnections::cluster(ClusterClient::new(nodes)?, 1),
+            ),
+            None => {
+                let client = Client::open(url)?;
+                (client.clone(), RedisConnections::new(client, 1))
+            }
+        };
+        let p_str = prefix.unwrap_or("zoocache");
+        let lease = Self {
+            connections,
+            client,
+            prefix: p_str.to_string(),
+            done_channel: format!("{}:flight:done", p_str),
+            waiters: Arc::new(DashMap::default()),
+        };
+        lease.start_listener();
+        Ok(lease)
+    }
+
+    fn lease_key(&self, key: &str) -> String {
+        format!("{}:_flight:{}", self.prefix, key)
+    }
+
+    async fn get_conn(&self) -> Result<RedisConn, redis::RedisError> {
+        self.connections.get().await
+    }
+
+    fn clear_conn(&self) {
+        self.connections.reset();
+    }
+
+    async fn is_held(&self, key: &str) -> bool {
+        let Ok(mut conn) = self.get_conn().await else {
+            return false;
+        };
+        let res: Result<bool, redis::RedisError> = conn.exists(self.lease_key(key)).await;
+        if res.is_err() {
+            self.clear_conn();
+        }
+        res.unwrap_or(false)
+    }
+
+    fn start_listener(&self) {
+        let client = self.client.clone();
+        let channel = self.done_channel.clone();
+        let waiters = Arc::clone(&self.waiters);
+
+        crate::RUNTIME.spawn(async move {
+            let mut backoff_ms = 100;
+
+            loop {
+                let mut pubsub = match client.get_async_pubsub().await {
+                    Ok(p) => p,
+                    Err(e) => {
+                        log::warn!(
+                            "Flight lease listener connection failed: {}. Retrying in {}ms...",
+                            e,
+                            backoff_ms
+                        );
+                        tokio::time::sleep(Duration::from_millis(backoff_ms)).await;
+                        backoff_ms = (backoff_ms * 2).min(5000);
+                        continue;
+                    }
+                };
+
+                if let Err(e) = pubsub.subscribe(&channel).await {
+                    log::warn!("Flight lease subscribe failed: {}. Retrying...", e);
+                    tokio::time::sleep(Duration::from_millis(backoff_ms)).await;
+                    backoff_ms = (backoff_ms * 2).min(5000);
+                    continue;
+                }
+                backoff_ms = 100;
+
+                let mut stream = pubsub.on_message();
+                use futures_util::StreamExt;
+
+                while let Some(msg) = stream.next().await {
+                    if let Ok(key) = msg.get_payload::<String>()
+                        && let Some(notify) = waiters.get(&key)
+                    {
+                        notify.notify_waiters();
+                    }
+                }
+
+                tokio::time::sleep(Duration::from_millis(100)).await;
+            }
+        });
+    }
+}
+
+#[async_trait]
+impl FlightLease for RedisLease {
+    async fn try_acquire(
+        &self,
+        key: &str,
+        ttl_ms: u64,
+    ) -> Result<Option<String>, Box<dyn std::error::Error + Send + Sync>> {
+        let mut conn = self.get_conn().await?;
+        let token = super::new_token();
+        let res: Result<Option<String>, redis::RedisError> = redis::cmd("SET")
+            .arg(self.lease_key(key))
+            .arg(&token)
+            .arg("NX")
+            .arg("PX")
+            .arg(ttl_ms)
+            .query_async(&mut conn)
+            .await;
+        match res {
+            Ok(reply) => Ok(reply.map(|_| token)),
+            Err(e) => {
+                self.clear_conn();
+                Err(Box::new(e))
+            }
+        }
+    }
+
+    async fn release(&self, key: &str, token: &str) {
+        let Ok(mut conn) = self.get_conn().await else {
+            return;
+        };
+        let res: Result<i64, redis::RedisError> = RELEASE
+            .key(self.lease_key(key))
+            .arg(token)
+            .arg(&self.done_channel)
+            .arg(key)
+            .invoke_async(&mut conn)
+            .await;
+        if let Err(e) = res {
+            log::warn!("Failed to release flight lease for '{}': {}", key, e);
+            self.clear_conn();
+        }
+    }
+
+    async fn wait_released(&self, key: &str, timeout: Duration) -> bool {
+        let notify = Arc::clone(
+            self.waiters
+                .entry(key.to_string())
+                .or_insert_with(|| Arc::new(Notify::new()))
+                .value(),
+        );
+        let deadline = Instant::now() + timeout;
+
+        let released = loop {
+            let notified = notify.notified();
+            tokio::pin!(notified);
+            notified.as_mut().enable();
+
+            if !self.is_held(key).await {
+                break true;
+            }
+            let remaining = deadline.saturating_duration_since(Instant::now());
+            if remaining.is_zero() {
+                break false;
+            }
+            let _ = tokio::time::timeout(remaining.min(POLL_INTERVAL), notified).await;
+        };
+
+        drop(notify);
+        self.waiters
+            .remove_if(key, |_, n| Arc::strong_count(n) == 1);
+        released
+    }
+}
@@ -2,8 +2,12 @@ mod bridge;
 mod bus;
 mod core;
 mod flight;
+mod lease;
+mod near_cache;
+mod redis_conn;
 mod storage;
 mod trie;
+mod ttl;
 mod utils;
 mod worker;
 
@@ -0,0 +1,84 @@
+use crate::storage::CacheEntry;
+use crate::trie::PrefixTrie;
+use crate::utils::now_secs;
+use lru::LruCache;
+use pyo3::prelude::*;
+use std::num::NonZeroUsize;
+use std::sync::{Arc, Mutex};
+
+/// Bounded in-process L1 tier holding already materialized entries.
+///
+/// Coherence relies on the same trie checks used for storage hits: an entry is
+/// served only while its root shards saw no invalidation since `trie_version` or its
+/// dependency snapshots still validate against the (bus-synchronized) trie.
+pub(crate) struct NearCache {
+    entries: Mutex<LruCache<String, (Arc<CacheEntry>, Option<u64>)>>,
+}
+
+impl NearCache {
+    pub fn new(capacity: NonZeroUsize) -> Self {
+        Self {
+            entries: Mutex::new(LruCache::new(capacity)),
+        }
+    }
+
+    /// Returns the held entry itself: every hit shares its Python value.
+    pub fn lookup(&self, py: Python, key: &str, trie: &PrefixTrie) -> Option<Arc<CacheEntry>> {
+        let (entry, expires_at) = {
+            let mut entries = self.entries.lock().unwrap();
+            let (entry, expires_at) = entries.get(key)?;
+            (Arc::clone(entry), *expires_at)
+        };
+
+        let now = now_secs();
+        if entry.is_expired(expires_at, now) {
+            self.remove(key);
+            return None;
+        }
+
+        let current_global_version = trie.get_global_version();
+        if !trie.unchanged_since(entry.trie_version, entry.dep_roots) {
+            if !crate::trie::validate_with_handles(trie, &entry.dependencies, &entry.handles, now) {
+                self.remove(key);
+                return None;
+            }
+            let refreshed = Arc::new(entry.with_trie_version(py, current_global_version));
+            self.put(key, refreshed, expires_at);
+        }
+
+        Some(entry)
+    }
+
+    pub fn put(&self, key: &str, entry: Arc<CacheEntry>, expires_at: Option<u64>) {
+        entry.handles.retain();
+        let mut entries = self.entries.lock().unwrap();
+        entries.put(key.to_string(), (entry, expires_at));
+    }
+
+    /// Keeps an entry just written to storage with `ttl` seconds to live.
+    pub fn remember(&self, key: &str, entry: &Arc<CacheEntry>, ttl: Option<u64>) {
+        self.put(
+            key,
+            Arc::clone(entry),
+            ttl.map(|t| now_secs().saturating_add(t)),
+        );
+    }
+
+    /// Drops keys storage no longer holds, e.g. after eviction.
+    pub fn forget(&self, keys: &[String]) {
+        let mut entries = self.entries.lock().unwrap();
+        for key in keys {
+            entries.pop(key);
+        }
+    }
+
+    pub fn remove(&self, key: &str) {
+        let mut entries = self.entries.lock().unwrap();
+        entries.pop(key);
+    }
+
+    pub fn clear(&self) {
+        let mut entries = self.entries.lock().unwrap();
+        entries.clear();
+    }
+}
@@ -0,0 +1,265 @@
+use redis::aio::{ConnectionLike, MultiplexedConnection};
+use redis::cluster::ClusterClient;
+use redis::cluster_async::ClusterConnection;
+use redis::cluster_routing::{RoutingInfo, SingleNodeRoutingInfo};
+use redis::{
+    AsyncConnectionConfig, Client, Cmd, Pipeline, PushInfo, RedisError, RedisFuture, RedisResult,
+    Value,
+};
+use std::sync::RwLock;
+use std::sync::atomic::{AtomicUsize, Ordering};
+
+/// A connection to either a single Redis server or a Redis Cluster. Commands
+/// sent through it are routed by key in cluster mode, so callers only need to
+/// keep multi-key commands and pipelines within one hash slot.
+#[derive(Clone)]
+pub(crate) enum RedisConn {
+    Single(MultiplexedConnection),
+    Cluster(ClusterConnection),
+}
+
+impl ConnectionLike for RedisConn {
+    fn req_packed_command<'a>(&'a mut self, cmd: &'a Cmd) -> RedisFuture<'a, Value> {
+        match self {
+            Self::Single(conn) => conn.req_packed_command(cmd),
+            Self::Cluster(conn) => conn.req_packed_command(cmd),
+        }
+    }
+
+    fn req_packed_commands<'a>(
+        &'a mut self,
+        cmd: &'a Pipeline,
+        offset: usize,
+        count: usize,
+    ) -> RedisFuture<'a, Vec<Value>> {
+        match self {
+            Self::Single(conn) => conn.req_packed_commands(cmd, offset, count),
+            Self::Cluster(conn) => conn.req_packed_commands(cmd, offset, count),
+        }
+    }
+
+    fn get_db(&self) -> i64 {
+        match self {
+            Self::Single(conn) => conn.get_db(),
+            Self::Cluster(conn) => conn.get_db(),
+        }
+    }
+}
+
+/// Where a SCAN runs: the single server, or one cluster master.
+pub(crate) enum ScanTarget {
+    Default,
+    Node { host: String, port: u16 },
+}
+
+impl RedisConn {
+    /// The nodes a keyspace walk has to visit: one for a single server, every
+    /// master for a cluster.
+    pub async fn scan_targets(&mut self) -> RedisResult<Vec<ScanTarget>> {
+        let conn = match self {
+            Self::Single(_) => return Ok(vec![ScanTarget::Default]),
+            Self::Cluster(conn) => conn,
+        };
+        let reply = conn
+            .route_command(
+                redis::cmd("CLUSTER").arg("NODES"),
+                RoutingInfo::SingleNode(SingleNodeRoutingInfo::Random),
+            )
+            .await?;
+        let nodes: String = redis::from_owned_redis_value(reply)?;
+        Ok(parse_masters(&nodes))
+    }
+
+    pub async fn scan_page(
+        &mut self,
+        target: &ScanTarget,
+        cursor: u64,
+        pattern: &str,
+    ) -> RedisResult<(u64, Vec<String>)> {
+        let mut cmd = redis::cmd("SCAN");
+        cmd.arg(cursor)
+            .arg("MATCH")
+            .arg(pattern)
+            .arg("COUNT")
+            .arg(500);
+        match (self, target) {
+            (Self::Cluster(conn), ScanTarget::Node { host, port }) => {
+                let routing = RoutingInfo::SingleNode(SingleNodeRoutingInfo::ByAddress {
+                    host: host.clone(),
+                    port: *port,
+                });
+                redis::from_owned_redis_value(conn.route_command(&cmd, routing).await?)
+            }
+            (conn, _) => cmd.query_async(conn).await,
+        }
+    }
+}
+
+/// Master addresses from a `CLUSTER NODES` reply
+/// (`<id> <ip:port@cport[,hostname]> <flags> ...`).
+fn parse_masters(nodes: &str) -> Vec<ScanTarget> {
+    nodes
+        .lines()
+        .filter_map(|line| {
+            let mut fields = line.split_whitespace();
+            let addr = fields.nth(1)?;
+            let flags = fields.next()?;
+            if !flags.split(',').any(|f| f == "master") || flags.contains("fail") {
+                return None;
+            }
+            let addr = addr.split('@').next()?;
+            let (host, port) = addr.rsplit_once(':')?;
+            Some(ScanTarget::Node {
+                host: host.to_string(),
+                port: port.parse().ok()?,
+            })
+        })
+        .collect()
+}
+
+enum Backend {
+    Single(Client),
+    Cluster(ClusterClient),
+}
+
+/// Cached multiplexed Redis connections shared by every operation.
+///
+/// Reads take a short std `RwLock` read guard and clone the cached handle, so
+/// concurrent operations never queue behind each other; only (re)connecting
+/// is serialized. With more than one slot, operations are spread round-robin
+/// so a single socket's pipeline depth is not the ceiling.
+pub(crate) struct RedisConnections {
+    backend: Backend,
+    slots: Box<[RwLock<Option<RedisConn>>]>,
+    connecting: tokio::sync::Mutex<()>,
+    next: AtomicUsize,
+    tracking: Option<tokio::sync::mpsc::UnboundedSender<PushInfo>>,
+}
+
+impl RedisConnections {
+    pub fn new(client: Client, pool_size: usize) -> Self {
+        Self::with_backend(Backend::Single(client), pool_size)
+    }
+
+    pub fn cluster(client: ClusterClient, pool_size: usize) -> Self {
+        Self::with_backend(Backend::Cluster(client), pool_size)
+    }
+
+    fn with_backend(backend: Backend, pool_size: usize) -> Self {
+        Self {
+            backend,
+            slots: (0..pool_size.max(1)).map(|_| RwLock::new(None)).collect(),
+            connecting: tokio::sync::Mutex::new(()),
+            next: AtomicUsize::new(0),
+            tracking: None,
+        }
+    }
+
+    /// Opens every connection with `CLIENT TRACKING ON OPTIN` and routes its
+    /// RESP3 pushes (invalidations, disconnects) to `pushes`. The client must
+    /// speak RESP3.
+    pub fn with_tracking(mut self, pushes: tokio::sync::mpsc::UnboundedSender<PushInfo>) -> Self {
+        self.tracking = Some(pushes);
+        self
+    }
+
+    pub fn is_cluster(&self) -> bool {
+        matches!(self.backend, Backend::Cluster(_))
+    }
+
+    pub async fn get(&self) -> Result<RedisConn, RedisError> {
+        let idx = match self.slots.len() {
+            1 => 0,
+            n => self.next.fetch_add(1, Ordering::Relaxed) % n,
+        };
+        if let Some(conn) = self.cached(idx) {
+            return Ok(conn);
+        }
+
+        let _guard = self.connecting.lock().await;
+        if let Some(conn) = self.cached(idx) {
+            return Ok(conn);
+        }
+        let conn = match &self.backend {
+            Backend::Single(client) => match &self.tracking {
+                Some(pushes) => {
+                    let config = AsyncConnectionConfig::new().set_push_sender(pushes.clone());
+                    let mut conn = client
+                        .get_multiplexed_async_connection_with_config(&config)
+                        .await?;
+                    redis::cmd("CLIENT")
+                        .arg("TRACKING")
+                        .arg("ON")
+                        .arg("OPTIN")
+                        .query_async::<()>(&mut conn)
+                        .await?;
+                    RedisConn::Single(conn)
+                }
+                None => RedisConn::Single(client.get_multiplexed_async_connection().await?),
+            },
+            Backend::Cluster(client) => RedisConn::Cluster(client.get_async_connection().await?),
+        };
+        *self.slots[idx].write().unwrap() = Some(conn.clone());
+        Ok(conn)
+    }
+
+    /// Drops every cached connection so the next operation reconnects.
+    pub fn reset(&self) {
+        for slot in self.slots.iter() {
+            *slot.write().unwrap() = None;
+        }
+    }
+
+    #[inline]
+    fn cached(&self, idx: usize) -> Option<RedisConn> {
+        self.slots[idx].read().unwrap().clone()
+    }
+}
+
+/// Seed node URLs from `redis+cluster://[user:pass@]host:port[,host:port...][/]`.
+/// Credentials on the first node apply to every seed.
+pub(crate) fn cluster_nodes(url: &str) -> Option<Vec<String>> {
+    let rest = url.strip_prefix("redis+cluster://")?;
+    let rest = rest.trim_end_matches('/');
+    let (auth, hosts) = match rest.rsplit_once('@') {
+        Some((auth, hosts)) => (format!("{}@", auth), hosts),
+        None => (String::new(), rest),
+    };
+    let nodes: Vec<String> = hosts
+        .split(',')
+        .filter(|h| !h.is_empty())
+        .map(|h| format!("redis://{}{}", auth, h))
+        .collect();
+    (!nodes.is_empty()).then_some(nodes)
+}
+
+#[cfg(test)]
+mod tests {
+    use super::*;
+
+    #[test]
+    fn cluster_url_expands_to_seed_nodes() {
+        assert_eq!(
+            cluster_nodes("redis+cluster://:pw@a:7000,b:7001/").unwrap(),
+            vec!["redis://:pw@a:7000", "redis://:pw@b:7001"]
+        );
+        assert!(cluster_nodes("redis+cluster://").is_none());
+    }
+
+    #[test]
+    fn masters_are_parsed_from_cluster_nodes() {
+        let reply = "\
+a1 127.0.0.1:7000@17000 myself,master - 0 0 1 connected 0-5460
+b2 127.0.0.1:7001@17001 master - 0 0 2 connected 5461-10922
+c3 127.0.0.1:7003@17003 slave a1 0 0 1 connected
+d4 127.0.0.1:7002@17002 master,fail - 0 0 3 connected";
+        let ports: Vec<u16> = parse_masters(reply)
+            .into_iter()
+            .map(|t| match t {
+                ScanTarget::Node { port, .. } => port,
+                ScanTarget::Default => 0,
+            })
+            .collect();
+        assert_eq!(ports, vec![7000, 7001]);
+    }
+}
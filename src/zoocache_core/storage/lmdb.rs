@@ -3,13 +3,51 @@ use crate::storage::SyncStorage;
 use crate::storage::{CacheEntry, Storage, StorageResult};
 use crate::utils::{now_nanos, now_secs, to_runtime_err};
 use async_trait::async_trait;
+use crossbeam_channel::{Receiver, Sender};
 use lmdb::{
     Cursor, Database, DatabaseFlags, Environment, EnvironmentFlags, Transaction, WriteFlags,
 };
 use pyo3::prelude::*;
 use std::path::Path;
-use std::sync::Arc;
 use std::sync::atomic::{AtomicUsize, Ordering};
+use std::sync::{Arc, Mutex};
+
+fn is_map_full(e: &PyErr) -> bool {
+    e.to_string().contains("LMDB storage is full")
+}
+
+/// How LMDB records recency for `evict_lru`.
+#[derive(Clone, Copy, Debug, Default, PartialEq, Eq)]
+pub(crate) enum LmdbLruMode {
+    /// Nanosecond stamp per key plus an ordered `lru_index`: exact LRU order,
+    /// three B-tree writes per touch.
+    #[default]
+    Exact,
+    /// Minute bucket per key and no index: a touch writes one 8-byte record,
+    /// and none while the bucket is unchanged. Eviction samples consecutive
+    /// keys from a rotating hand and drops the oldest of the sample.
+    Sampled,
+}
+
+impl LmdbLruMode {
+    pub fn parse(name: &str) -> Option<Self> {
+        match name {
+            "exact" => Some(Self::Exact),
+            "sampled" => Some(Self::Sampled),
+            _ => None,
+        }
+    }
+
+    fn tag(self) -> &'static [u8] {
+        match self {
+            Self::Exact => b"exact",
+            Self::Sampled => b"sampled",
+        }
+    }
+}
+
+const LRU_BUCKET_SECS: u64 = 60;
+const EVICTION_SAMPLE_FACTOR: usize = 5;
 
 pub(crate) struct LmdbStorage {
     env: Arc<Environment>,
@@ -17,49 +55,108 @@ pub(crate) struct LmdbStorage {
     db_ttls: Database,
     db_lru: Database,
     db_lru_index: Database,
+    /// `expires_at (BE) ‖ key` for every entry with a TTL, so expired entries
+    /// can be swept in key order without reading them.
+    db_expiry: Database,
     db_meta: Database,
     count: Arc<AtomicUsize>,
+    /// Serialized bytes of all stored values, persisted as meta `bytes`.
+    bytes: Arc<AtomicUsize>,
+    /// Group-commit writer queue (`lmdb_group_commit`); `None` writes inline.
+    writer: Option<Sender<GroupWrite>>,
+    lru_mode: LmdbLruMode,
+    /// Sampled mode: `db_lru` key the next eviction sample starts from.
+    lru_hand: Arc<Mutex<Vec<u8>>>,
 }
 
-impl SyncStorage for LmdbStorage {
-    fn get(&self, py: Python, key: &str) -> StorageResult {
-        let env = &self.env;
-        let db_main = self.db_main;
-        let db_ttls = self.db_ttls;
+enum WriteOp {
+    Put(String, Vec<u8>, Option<u64>),
+    Remove(String),
+}
 
-        let txn = match env.begin_ro_txn() {
-            Ok(t) => t,
-            Err(_) => return StorageResult::NotFound,
-        };
+/// Writes from one caller, acknowledged once the transaction holding them
+/// has committed.
+struct GroupWrite {
+    ops: Vec<WriteOp>,
+    ack: Sender<PyResult<()>>,
+}
 
-        let expires_at = txn
-            .get(db_ttls, &key)
-            .ok()
-            .and_then(|d| d.try_into().ok().map(u64::from_le_bytes))
-            .filter(|&ts| ts != 0);
+/// Entries and value bytes a write transaction adds and removes, applied to
+/// the persisted counters when it commits.
+#[derive(Default)]
+struct Tally {
+    added: usize,
+    removed: usize,
+    bytes_added: usize,
+    bytes_removed: usize,
+}
 
-        if expires_at.is_some_and(|ts| now_secs() > ts) {
-            return StorageResult::Expired;
+impl Tally {
+    /// `old` is the length of the value being replaced, if any.
+    fn put(&mut self, old: Option<usize>, len: usize) {
+        match old {
+            Some(old) => self.bytes_removed += old,
+            None => self.added += 1,
         }
+        self.bytes_added += len;
+    }
 
-        let data = match txn.get(db_main, &key) {
-            Ok(d) => d,
+    fn remove(&mut self, old: Option<usize>) {
+        if let Some(old) = old {
+            self.removed += 1;
+            self.bytes_removed += old;
+        }
+    }
+}
+
+impl SyncStorage for LmdbStorage {
+    fn get(&self, py: Python, key: &str) -> StorageResult {
+        let txn = match self.env.begin_ro_txn() {
+            Ok(t) => t,
             Err(_) => return StorageResult::NotFound,
         };
+        self.read_entry(py, &txn, key)
+    }
 
-        CacheEntry::deserialize(py, data)
-            .ok()
-            .map(Arc::new)
-            .map(|e| StorageResult::Hit(e, expires_at, Some(data.to_vec())))
-            .unwrap_or(StorageResult::NotFound)
+    fn get_many(&self, py: Python, keys: &[String]) -> Vec<StorageResult> {
+        let txn = match self.env.begin_ro_txn() {
+            Ok(t) => t,
+            Err(_) => return keys.iter().map(|_| StorageResult::NotFound).collect(),
+        };
+        keys.iter()
+            .map(|key| self.read_entry(py, &txn, key))
+            .collect()
     }
 
     fn set(&self, key: String, entry: Arc<CacheEntry>, ttl: Option<u64>) -> PyResult<()> {
         let data = Python::attach(|py| entry.serialize(py))?;
+        if self.writer.is_some() {
+            return self.submit(vec![WriteOp::Put(key, data, ttl)]);
+        }
         self.put_internal(&key, &data, ttl)
     }
 
+    fn set_many(&self, items: Vec<(String, Arc<CacheEntry>, Option<u64>)>) -> PyResult<()> {
+        let serialized = Python::attach(|py| {
+            items
+                .into_iter()
+                .map(|(key, entry, ttl)| Ok((key, entry.serialize(py)?, ttl)))
+                .collect::<PyResult<Vec<_>>>()
+        })?;
+        if self.writer.is_some() {
+            let ops = serialized
+                .into_iter()
+                .map(|(key, data, ttl)| WriteOp::Put(key, data, ttl))
+                .collect();
+            return self.submit(ops);
+        }
+        self.put_batch_internal(&serialized)
+    }
+
     fn set_raw(&self, key: String, data: Vec<u8>, ttl: Option<u64>) -> PyResult<()> {
+        if self.writer.is_some() {
+            return self.submit(vec![WriteOp::Put(key, data, ttl)]);
+        }
         self.put_internal(&key, &data, ttl)
     }
 
@@ -77,23 +174,37 @@ impl SyncStorage for LmdbStorage {
         let now_n = now_nanos();
         let now_s = now_secs();
         let now_le = now_n.to_le_bytes();
+        let bucket_le = (now_s / LRU_BUCKET_SECS).to_le_bytes();
         for (key, ttl) in updates {
-            Self::delete_from_index(&mut txn, dbs.2, dbs.3, &key);
-
-            txn.put(dbs.2, &key, &now_le, WriteFlags::empty())
-                .map_err(Self::to_storage_is_full_err)?;
-            txn.put(
-                dbs.3,
-                &Self::make_index_key(now_n, &key),
-                &[],
-                WriteFlags::empty(),
-            )
-            .map_err(Self::to_storage_is_full_err)?;
+            // A touch queued before the key was evicted or removed must not
+            // leave recency or expiry records behind for it.
+            if txn.get(dbs.0, &key).is_err() {
+                continue;
+            }
+            match self.lru_mode {
+                LmdbLruMode::Exact => {
+                    Self::delete_from_index(&mut txn, dbs.2, dbs.3, &key);
+
+                    txn.put(dbs.2, &key, &now_le, WriteFlags::empty())
+                        .map_err(Self::to_storage_is_full_err)?;
+                    txn.put(
+                        dbs.3,
+                        &Self::make_index_key(now_n, &key),
+                        &[],
+                        WriteFlags::empty(),
+                    )
+                    .map_err(Self::to_storage_is_full_err)?;
+                }
+                LmdbLruMode::Sampled => {
+                    if txn.get(dbs.2, &key).ok() != Some(&bucket_le[..]) {
+                        txn.put(dbs.2, &key, &bucket_le, WriteFlags::empty())
+                            .map_err(Self::to_storage_is_full_err)?;
+                    }
+                }
+            }
 
             if let Some(t) = ttl {
-                let expire_at = now_s.saturating_add(t);
-                txn.put(dbs.1, &key, &expire_at.to_le_bytes(), WriteFlags::empty())
-                    .map_err(Self::to_storage_is_full_err)?;
+                self.set_expiry(&mut txn, &key, Some(now_s.saturating_add(t)))?;
             }
         }
         txn.commit().map_err(Self::to_storage_is_full_err)?;
@@ -101,32 +212,13 @@ impl SyncStorage for LmdbStorage {
     }
 
     fn remove(&self, key: &str) -> PyResult<()> {
-        let env = &self.env;
-        let count_atom = &self.count;
-        let dbs = (
-            self.db_main,
-            self.db_ttls,
-            self.db_lru,
-            self.db_lru_index,
-            self.db_meta,
-        );
-
-        let mut txn = env.begin_rw_txn().map_err(to_runtime_err)?;
-        if Self::remove_internal(&mut txn, &(dbs.0, dbs.1, dbs.2, dbs.3), key) {
-            let current_count = count_atom.load(Ordering::SeqCst);
-            let new_count = current_count.saturating_sub(1);
-            txn.put(
-                dbs.4,
-                b"count",
-                &(new_count as u64).to_le_bytes(),
-                WriteFlags::empty(),
-            )
-            .map_err(Self::to_storage_is_full_err)?;
-
-            txn.commit().map_err(Self::to_storage_is_full_err)?;
-            count_atom.fetch_sub(1, Ordering::SeqCst);
+        if self.writer.is_some() {
+            return self.submit(vec![WriteOp::Remove(key.to_string())]);
         }
-        Ok(())
+        let mut txn = self.env.begin_rw_txn().map_err(to_runtime_err)?;
+        let mut tally = Tally::default();
+        tally.remove(self.remove_internal(&mut txn, key));
+        self.commit_with_count(txn, tally)
     }
 
     fn clear(&self) -> PyResult<()> {
@@ -146,8 +238,10 @@ impl SyncStorage for LmdbStorage {
         let _ = txn.clear_db(dbs.2);
         let _ = txn.clear_db(dbs.3);
         let _ = txn.clear_db(dbs.4);
+        let _ = txn.clear_db(self.db_expiry);
         txn.commit().map_err(Self::to_storage_is_full_err)?;
         count_atom.store(0, Ordering::SeqCst);
+        self.bytes.store(0, Ordering::SeqCst);
         Ok(())
     }
 
@@ -157,7 +251,6 @@ impl SyncStorage for LmdbStorage {
 
     fn evict_lru(&self, count: usize) -> PyResult<Vec<String>> {
         let env = &self.env;
-        let count_atom = &self.count;
         let dbs = (
             self.db_main,
             self.db_ttls,
@@ -169,34 +262,25 @@ impl SyncStorage for LmdbStorage {
         let mut to_evict = Vec::new();
 
         let mut txn = env.begin_rw_txn().map_err(to_runtime_err)?;
-        {
-            let mut cursor = txn.open_ro_cursor(dbs.3).map_err(to_runtime_err)?;
-            for (k, _) in cursor.iter().take(count) {
-                if let Some(key_str) = k.get(8..).and_then(|b| std::str::from_utf8(b).ok()) {
-                    to_evict.push(key_str.to_string());
+        match self.lru_mode {
+            LmdbLruMode::Exact => {
+                let mut cursor = txn.open_ro_cursor(dbs.3).map_err(to_runtime_err)?;
+                for (k, _) in cursor.iter().take(count) {
+                    if let Some(key_str) = k.get(8..).and_then(|b| std::str::from_utf8(b).ok()) {
+                        to_evict.push(key_str.to_string());
+                    }
                 }
             }
+            LmdbLruMode::Sampled => to_evict = self.sample_oldest(&txn, count)?,
         }
 
-        let mut evicted_count = 0;
-        for key in &to_evict {
-            if Self::remove_internal(&mut txn, &(dbs.0, dbs.1, dbs.2, dbs.3), key) {
-                evicted_count += 1;
-            }
-        }
-
-        let current_count = count_atom.load(Ordering::SeqCst);
-        let new_count = current_count.saturating_sub(evicted_count);
-        txn.put(
-            dbs.4,
-            b"count",
-            &(new_count as u64).to_le_bytes(),
-            WriteFlags::empty(),
-        )
-        .map_err(Self::to_storage_is_full_err)?;
-
-        txn.commit().map_err(Self::to_storage_is_full_err)?;
-        count_atom.fetch_sub(evicted_count, Ordering::SeqCst);
+        let mut tally = Tally::default();
+        to_evict.retain(|key| {
+            let old = self.remove_internal(&mut txn, key);
+            tally.remove(old);
+            old.is_some()
+        });
+        self.commit_with_count(txn, tally)?;
 
         Ok(to_evict)
     }
@@ -251,7 +335,12 @@ impl SyncStorage for LmdbStorage {
 }
 
 impl LmdbStorage {
-    pub fn new(path: &str, map_size: Option<usize>) -> PyResult<Self> {
+    pub fn new(
+        path: &str,
+        map_size: Option<usize>,
+        group_commit: Option<usize>,
+        lru_mode: LmdbLruMode,
+    ) -> PyResult<Self> {
         let path = Path::new(path);
         if !path.exists() {
             std::fs::create_dir_all(path)
@@ -261,7 +350,7 @@ impl LmdbStorage {
         let map_size = map_size.unwrap_or(1024 * 1024 * 1024);
 
         let env = Environment::new()
-            .set_max_dbs(5)
+            .set_max_dbs(6)
             .set_map_size(map_size)
             .set_flags(
                 EnvironmentFlags::NO_SYNC
@@ -284,27 +373,370 @@ impl LmdbStorage {
         let db_lru_index = env
             .create_db(Some("lru_index"), DatabaseFlags::empty())
             .map_err(Self::to_storage_is_full_err)?;
+        let db_expiry = env
+            .create_db(Some("expiry"), DatabaseFlags::empty())
+            .map_err(Self::to_storage_is_full_err)?;
         let db_meta = env
             .create_db(Some("meta"), DatabaseFlags::empty())
             .map_err(Self::to_storage_is_full_err)?;
 
-        let count = (|| {
+        let read_meta = |name: &str| {
             let txn = env.begin_ro_txn().ok()?;
-            let data = txn.get(db_meta, b"count").ok()?;
+            let data = txn.get(db_meta, &name).ok()?;
             let bytes: [u8; 8] = data.try_into().ok()?;
-            Some(u64::from_le_bytes(bytes))
-        })()
-        .unwrap_or(0) as usize;
+            Some(u64::from_le_bytes(bytes) as usize)
+        };
+        let count = read_meta("count").unwrap_or(0);
+        let bytes = read_meta("bytes");
 
-        Ok(Self {
+        let mut storage = Self {
             env: Arc::new(env),
             db_main,
             db_ttls,
             db_lru,
             db_lru_index,
+            db_expiry,
             db_meta,
             count: Arc::new(AtomicUsize::new(count)),
-        })
+            bytes: Arc::new(AtomicUsize::new(bytes.unwrap_or(0))),
+            writer: None,
+            lru_mode,
+            lru_hand: Arc::default(),
+        };
+        storage.adopt_lru_mode()?;
+        storage.build_expiry_index()?;
+        if bytes.is_none() {
+            storage.recount_bytes()?;
+        }
+        if let Some(max_ops) = group_commit {
+            storage.writer = Some(storage.spawn_writer(max_ops));
+        }
+        Ok(storage)
+    }
+
+    /// Starts the group-commit thread. It shares the environment and counters
+    /// but writes inline itself; it exits once the storage (and so the last
+    /// sender) is dropped.
+    fn spawn_writer(&self, max_ops: usize) -> Sender<GroupWrite> {
+        let (tx, rx) = crossbeam_channel::unbounded::<GroupWrite>();
+        let inline = Self {
+            env: Arc::clone(&self.env),
+            db_main: self.db_main,
+            db_ttls: self.db_ttls,
+            db_lru: self.db_lru,
+            db_lru_index: self.db_lru_index,
+            db_expiry: self.db_expiry,
+            db_meta: self.db_meta,
+            count: Arc::clone(&self.count),
+            bytes: Arc::clone(&self.bytes),
+            writer: None,
+            lru_mode: self.lru_mode,
+            lru_hand: Arc::clone(&self.lru_hand),
+        };
+        std::thread::spawn(move || inline.run_writer(rx, max_ops));
+        tx
+    }
+
+    /// Drains up to `max_ops` queued writes into one RW transaction and
+    /// acknowledges every caller with the commit's outcome. If the group fails
+    /// for any reason other than a full map, each caller's writes are retried
+    /// in a transaction of their own, so one bad op (e.g. a key over LMDB's
+    /// 511-byte limit) fails only the caller that sent it.
+    fn run_writer(&self, rx: Receiver<GroupWrite>, max_ops: usize) {
+        while let Ok(first) = rx.recv() {
+            let mut queued = first.ops.len();
+            let mut group = vec![first];
+            while queued < max_ops {
+                let Ok(next) = rx.try_recv() else { break };
+                queued += next.ops.len();
+                group.push(next);
+            }
+
+            let ops: Vec<&WriteOp> = group.iter().flat_map(|w| &w.ops).collect();
+            let res = self.with_full_retry(|| self.try_apply_once(&ops));
+            match res {
+                Ok(()) => group.iter().for_each(|w| {
+                    let _ = w.ack.send(Ok(()));
+                }),
+                Err(e) if group.len() > 1 && !is_map_full(&e) => {
+                    for w in &group {
+                        let ops: Vec<&WriteOp> = w.ops.iter().collect();
+                        let _ = w
+                            .ack
+                            .send(self.with_full_retry(|| self.try_apply_once(&ops)));
+                    }
+                }
+                Err(e) => Python::attach(|py| {
+                    for w in &group {
+                        let _ = w.ack.send(Err(e.clone_ref(py)));
+                    }
+                }),
+            }
+        }
+    }
+
+    /// Queues `ops` for the group-commit writer and waits, without the GIL,
+    /// until they are committed.
+    fn submit(&self, ops: Vec<WriteOp>) -> PyResult<()> {
+        let Some(writer) = &self.writer else {
+            return Ok(());
+        };
+        let (ack, done) = crossbeam_channel::bounded(1);
+        writer
+            .send(GroupWrite { ops, ack })
+            .map_err(|_| to_runtime_err("LMDB writer thread is gone"))?;
+        Python::attach(|py| py.detach(|| done.recv()))
+            .map_err(|_| to_runtime_err("LMDB writer thread is gone"))?
+    }
+
+    fn try_apply_once(&self, ops: &[&WriteOp]) -> PyResult<()> {
+        let mut txn = self.env.begin_rw_txn().map_err(to_runtime_err)?;
+        let base_ts = now_nanos();
+        let now_s = now_secs();
+        let mut tally = Tally::default();
+        for (i, op) in ops.iter().enumerate() {
+            match op {
+                WriteOp::Put(key, data, ttl) => {
+                    let ts = base_ts.saturating_add(i as u64);
+                    let old = self.put_in_txn(&mut txn, key, data, *ttl, ts, now_s)?;
+                    tally.put(old, data.len());
+                }
+                WriteOp::Remove(key) => tally.remove(self.remove_internal(&mut txn, key)),
+            }
+        }
+        self.commit_with_count(txn, tally)
+    }
+
+    /// Files written before byte accounting existed get their total summed
+    /// once.
+    fn recount_bytes(&self) -> PyResult<()> {
+        let mut txn = self.env.begin_rw_txn().map_err(to_runtime_err)?;
+        let total: usize = {
+            let mut cursor = txn.open_ro_cursor(self.db_main).map_err(to_runtime_err)?;
+            cursor.iter().map(|(_, v)| v.len()).sum()
+        };
+        txn.put(
+            self.db_meta,
+            b"bytes",
+            &(total as u64).to_le_bytes(),
+            WriteFlags::empty(),
+        )
+        .map_err(Self::to_storage_is_full_err)?;
+        txn.commit().map_err(Self::to_storage_is_full_err)?;
+        self.bytes.store(total, Ordering::SeqCst);
+        Ok(())
+    }
+
+    /// Files written before the expiry index existed get it built from
+    /// `db_ttls` once.
+    fn build_expiry_index(&self) -> PyResult<()> {
+        let mut txn = self.env.begin_rw_txn().map_err(to_runtime_err)?;
+        if txn.get(self.db_meta, b"expiry_index").is_ok() {
+            return Ok(());
+        }
+
+        let stamps: Vec<Vec<u8>> = {
+            let mut cursor = txn.open_ro_cursor(self.db_ttls).map_err(to_runtime_err)?;
+            cursor
+                .iter()
+                .filter_map(|(k, v)| {
+                    let expires_at = u64::from_le_bytes(v.try_into().ok()?);
+                    let key = std::str::from_utf8(k).ok()?;
+                    (expires_at != 0).then(|| Self::make_index_key(expires_at, key))
+                })
+                .collect()
+        };
+        for stamp in &stamps {
+            txn.put(self.db_expiry, stamp, &[], WriteFlags::empty())
+                .map_err(Self::to_storage_is_full_err)?;
+        }
+        txn.put(self.db_meta, b"expiry_index", &[1], WriteFlags::empty())
+            .map_err(Self::to_storage_is_full_err)?;
+        txn.commit().map_err(Self::to_storage_is_full_err)
+    }
+
+    /// Deletes up to `limit` entries whose TTL has passed, oldest expiry
+    /// first, in one write transaction. Returns how many were removed.
+    pub(crate) fn sweep_expired(&self, limit: usize) -> PyResult<usize> {
+        let now_s = now_secs();
+        let mut txn = self.env.begin_rw_txn().map_err(to_runtime_err)?;
+        let expired: Vec<Vec<u8>> = {
+            let mut cursor = txn.open_ro_cursor(self.db_expiry).map_err(to_runtime_err)?;
+            cursor
+                .iter()
+                .map_while(|(k, _)| {
+                    let expires_at = u64::from_be_bytes(k.get(..8)?.try_into().ok()?);
+                    (now_s > expires_at).then(|| k.to_vec())
+                })
+                .take(limit)
+                .collect()
+        };
+        if expired.is_empty() {
+            return Ok(0);
+        }
+
+        let mut tally = Tally::default();
+        for stamp in &expired {
+            if let Ok(key) = std::str::from_utf8(&stamp[8..]) {
+                tally.remove(self.remove_internal(&mut txn, key));
+            }
+            // Drop the stamp itself too, so a stale one cannot stall the sweep.
+            let _ = txn.del(self.db_expiry, stamp, None);
+        }
+        self.commit_with_count(txn, tally)?;
+        Ok(expired.len())
+    }
+
+    /// Recency records of one mode mean nothing to the other, so opening a
+    /// file written under a different `lmdb_lru_mode` restamps every key.
+    fn adopt_lru_mode(&self) -> PyResult<()> {
+        let mut txn = self.env.begin_rw_txn().map_err(to_runtime_err)?;
+        let stored = txn
+            .get(self.db_meta, b"lru_mode")
+            .unwrap_or(LmdbLruMode::Exact.tag());
+        if stored == self.lru_mode.tag() {
+            return Ok(());
+        }
+
+        let keys: Vec<String> = {
+            let mut cursor = txn.open_ro_cursor(self.db_main).map_err(to_runtime_err)?;
+            cursor
+                .iter()
+                .filter_map(|(k, _)| std::str::from_utf8(k).ok().map(str::to_string))
+                .collect()
+        };
+        let _ = txn.clear_db(self.db_lru);
+        let _ = txn.clear_db(self.db_lru_index);
+        let base_ts = now_nanos();
+        let bucket = now_secs() / LRU_BUCKET_SECS;
+        for (i, key) in keys.iter().enumerate() {
+            self.stamp_recency(&mut txn, key, base_ts.saturating_add(i as u64), bucket)?;
+        }
+        txn.put(
+            self.db_meta,
+            b"lru_mode",
+            &self.lru_mode.tag(),
+            WriteFlags::empty(),
+        )
+        .map_err(Self::to_storage_is_full_err)?;
+        txn.commit().map_err(Self::to_storage_is_full_err)
+    }
+
+    fn stamp_recency(
+        &self,
+        txn: &mut lmdb::RwTransaction,
+        key: &str,
+        ts: u64,
+        bucket: u64,
+    ) -> PyResult<()> {
+        match self.lru_mode {
+            LmdbLruMode::Exact => {
+                txn.put(self.db_lru, &key, &ts.to_le_bytes(), WriteFlags::empty())
+                    .map_err(Self::to_storage_is_full_err)?;
+                txn.put(
+                    self.db_lru_index,
+                    &Self::make_index_key(ts, key),
+                    &[],
+                    WriteFlags::empty(),
+                )
+                .map_err(Self::to_storage_is_full_err)
+            }
+            LmdbLruMode::Sampled => txn
+                .put(
+                    self.db_lru,
+                    &key,
+                    &bucket.to_le_bytes(),
+                    WriteFlags::empty(),
+                )
+                .map_err(Self::to_storage_is_full_err),
+        }
+    }
+
+    /// Sampled mode: the `count` oldest of `count * 5` consecutive `db_lru`
+    /// records starting at the hand, wrapping around; the hand then moves
+    /// past the sample.
+    fn sample_oldest<T: Transaction>(&self, txn: &T, count: usize) -> PyResult<Vec<String>> {
+        let sample_size = count.saturating_mul(EVICTION_SAMPLE_FACTOR);
+        let mut hand = self.lru_hand.lock().unwrap();
+        let mut cursor = txn.open_ro_cursor(self.db_lru).map_err(to_runtime_err)?;
+
+        let mut sample: Vec<(u64, &[u8])> = Vec::with_capacity(sample_size);
+        let from_hand = if hand.is_empty() {
+            cursor.iter_start()
+        } else {
+            cursor.iter_from(&hand[..])
+        };
+        for (k, v) in from_hand.take(sample_size) {
+            sample.push((v.try_into().map(u64::from_le_bytes).unwrap_or(0), k));
+        }
+        if sample.len() < sample_size && !hand.is_empty() {
+            let missing = sample_size - sample.len();
+            for (k, v) in cursor.iter_start().take(missing) {
+                if k >= &hand[..] {
+                    break;
+                }
+                sample.push((v.try_into().map(u64::from_le_bytes).unwrap_or(0), k));
+            }
+        }
+
+        *hand = match sample.last() {
+            Some((_, last)) => {
+                let mut next = last.to_vec();
+                next.push(0);
+                next
+            }
+            None => Vec::new(),
+        };
+        sample.sort_by_key(|&(bucket, _)| bucket);
+        Ok(sample
+            .into_iter()
+            .take(count)
+            .filter_map(|(_, k)| std::str::from_utf8(k).ok().map(str::to_string))
+            .collect())
+    }
+
+    fn read_entry<T: Transaction>(&self, py: Python, txn: &T, key: &str) -> StorageResult {
+        let expires_at = txn
+            .get(self.db_ttls, &key)
+            .ok()
+            .and_then(|d| d.try_into().ok().map(u64::from_le_bytes))
+            .filter(|&ts| ts != 0);
+
+        if expires_at.is_some_and(|ts| now_secs() > ts) {
+            return StorageResult::Expired;
+        }
+
+        let data = match txn.get(self.db_main, &key) {
+            Ok(d) => d,
+            Err(_) => return StorageResult::NotFound,
+        };
+
+        CacheEntry::deserialize(py, data)
+            .ok()
+            .map(Arc::new)
+            // No raw copy: a trie-version rewrite is patched in the write
+            // transaction instead (see `restamp_in_place`).
+            .map(|e| StorageResult::Hit(e, expires_at, None))
+            .unwrap_or(StorageResult::NotFound)
+    }
+
+    /// Rewrites only the trie-version header of the stored value, if it still
+    /// carries `read_version`. A key removed or rewritten in the meantime is
+    /// left as it is.
+    fn restamp_in_place(&self, key: &str, read_version: u64, version: u64) -> PyResult<()> {
+        let mut txn = self.env.begin_rw_txn().map_err(to_runtime_err)?;
+        let patched = match txn.get(self.db_main, &key) {
+            Ok(data) if CacheEntry::trie_version_raw(data) == Some(read_version) => {
+                CacheEntry::update_trie_version_raw(data, version)
+            }
+            _ => return Ok(()),
+        };
+        let Ok(patched) = patched else {
+            return Ok(());
+        };
+        txn.put(self.db_main, &key, &patched, WriteFlags::empty())
+            .map_err(Self::to_storage_is_full_err)?;
+        txn.commit().map_err(Self::to_storage_is_full_err)
     }
 
     fn make_index_key(ts: u64, key: &str) -> Vec<u8> {
@@ -330,20 +762,54 @@ impl LmdbStorage {
         }
     }
 
-    fn remove_internal(
+    /// Deletes the key everywhere, including recency and expiry records left
+    /// without a main record; returns the removed value's length, or `None`
+    /// when the key was absent.
+    fn remove_internal(&self, txn: &mut lmdb::RwTransaction, key: &str) -> Option<usize> {
+        Self::delete_from_index(txn, self.db_lru, self.db_lru_index, key);
+        let _ = txn.del(self.db_lru, &key, None);
+        let _ = self.set_expiry(txn, key, None);
+
+        let len = txn.get(self.db_main, &key).ok()?.len();
+        let _ = txn.del(self.db_main, &key, None);
+        Some(len)
+    }
+
+    /// Replaces the key's TTL record and its `db_expiry` entry; `None` clears
+    /// both.
+    fn set_expiry(
+        &self,
         txn: &mut lmdb::RwTransaction,
-        dbs: &(Database, Database, Database, Database),
         key: &str,
-    ) -> bool {
-        Self::delete_from_index(txn, dbs.2, dbs.3, key);
-
-        if txn.get(dbs.0, &key).is_ok() {
-            let _ = txn.del(dbs.0, &key, None);
-            let _ = txn.del(dbs.1, &key, None);
-            let _ = txn.del(dbs.2, &key, None);
-            true
-        } else {
-            false
+        expires_at: Option<u64>,
+    ) -> PyResult<()> {
+        let old = txn
+            .get(self.db_ttls, &key)
+            .ok()
+            .and_then(|d| d.try_into().ok().map(u64::from_le_bytes));
+        if old == expires_at {
+            return Ok(());
+        }
+        if let Some(ts) = old {
+            let _ = txn.del(self.db_expiry, &Self::make_index_key(ts, key), None);
+        }
+
+        match expires_at {
+            Some(ts) => {
+                txn.put(self.db_ttls, &key, &ts.to_le_bytes(), WriteFlags::empty())
+                    .map_err(Self::to_storage_is_full_err)?;
+                txn.put(
+                    self.db_expiry,
+                    &Self::make_index_key(ts, key),
+                    &[],
+                    WriteFlags::empty(),
+                )
+                .map_err(Self::to_storage_is_full_err)
+            }
+            None => {
+                let _ = txn.del(self.db_ttls, &key, None);
+                Ok(())
+            }
         }
     }
 
@@ -360,12 +826,20 @@ impl LmdbStorage {
     }
 
     fn put_internal(&self, key: &str, data: &[u8], ttl: Option<u64>) -> PyResult<()> {
+        self.with_full_retry(|| self.try_put_once(key, data, ttl))
+    }
+
+    fn put_batch_internal(&self, items: &[(String, Vec<u8>, Option<u64>)]) -> PyResult<()> {
+        self.with_full_retry(|| self.try_put_batch_once(items))
+    }
+
+    fn with_full_retry(&self, mut op: impl FnMut() -> PyResult<()>) -> PyResult<()> {
         let max_retries = 2;
         for attempt in 0..=max_retries {
-            match self.try_put_once(key, data, ttl) {
+            match op() {
                 Ok(()) => return Ok(()),
                 Err(e) => {
-                    if e.to_string().contains("LMDB storage is full") && attempt < max_retries {
+                    if is_map_full(&e) && attempt < max_retries {
                         let _ = SyncStorage::evict_lru(self, 1000);
                         continue;
                     }
@@ -377,60 +851,84 @@ impl LmdbStorage {
     }
 
     fn try_put_once(&self, key: &str, data: &[u8], ttl: Option<u64>) -> PyResult<()> {
-        let env = &self.env;
-        let count_atom = &self.count;
-        let dbs = (
-            self.db_main,
-            self.db_ttls,
-            self.db_lru,
-            self.db_lru_index,
-            self.db_meta,
-        );
+        let mut txn = self.env.begin_rw_txn().map_err(to_runtime_err)?;
+        let old = self.put_in_txn(&mut txn, key, data, ttl, now_nanos(), now_secs())?;
+        let mut tally = Tally::default();
+        tally.put(old, data.len());
+        self.commit_with_count(txn, tally)
+    }
 
-        let mut txn = env.begin_rw_txn().map_err(to_runtime_err)?;
-        Self::delete_from_index(&mut txn, dbs.2, dbs.3, key);
+    /// Writes the whole batch in one RW transaction, so a bulk load pays for a
+    /// single commit instead of one per key.
+    fn try_put_batch_once(&self, items: &[(String, Vec<u8>, Option<u64>)]) -> PyResult<()> {
+        let mut txn = self.env.begin_rw_txn().map_err(to_runtime_err)?;
+        let base_ts = now_nanos();
+        let now_s = now_secs();
+        let mut tally = Tally::default();
+        for (i, (key, data, ttl)) in items.iter().enumerate() {
+            // Offset the LRU stamp so every key keeps a distinct index entry.
+            let ts = base_ts.saturating_add(i as u64);
+            let old = self.put_in_txn(&mut txn, key, data, *ttl, ts, now_s)?;
+            tally.put(old, data.len());
+        }
+        self.commit_with_count(txn, tally)
+    }
 
-        let is_new = txn.get(dbs.0, &key).is_err();
-        let new_ts = now_nanos();
+    fn put_in_txn(
+        &self,
+        txn: &mut lmdb::RwTransaction,
+        key: &str,
+        data: &[u8],
+        ttl: Option<u64>,
+        new_ts: u64,
+        now_s: u64,
+    ) -> PyResult<Option<usize>> {
+        if self.lru_mode == LmdbLruMode::Exact {
+            Self::delete_from_index(txn, self.db_lru, self.db_lru_index, key);
+        }
 
-        txn.put(dbs.0, &key, &data, WriteFlags::empty())
-            .map_err(Self::to_storage_is_full_err)?;
-        txn.put(dbs.2, &key, &new_ts.to_le_bytes(), WriteFlags::empty())
+        let old_len = txn.get(self.db_main, &key).ok().map(<[u8]>::len);
+
+        txn.put(self.db_main, &key, &data, WriteFlags::empty())
             .map_err(Self::to_storage_is_full_err)?;
-        txn.put(
-            dbs.3,
-            &Self::make_index_key(new_ts, key),
-            &[],
-            WriteFlags::empty(),
-        )
-        .map_err(Self::to_storage_is_full_err)?;
+        self.stamp_recency(txn, key, new_ts, now_s / LRU_BUCKET_SECS)?;
 
-        if let Some(t) = ttl {
-            let expire_at = now_secs().saturating_add(t);
-            txn.put(dbs.1, &key, &expire_at.to_le_bytes(), WriteFlags::empty())
-                .map_err(Self::to_storage_is_full_err)?;
-        } else {
-            let _ = txn.del(dbs.1, &key, None);
-        }
+        self.set_expiry(txn, key, ttl.map(|t| now_s.saturating_add(t)))?;
 
-        if is_new {
-            let current_count = count_atom.load(Ordering::SeqCst);
-            let new_count = current_count + 1;
-            txn.put(
-                dbs.4,
-                b"count",
-                &(new_count as u64).to_le_bytes(),
-                WriteFlags::empty(),
-            )
-            .map_err(Self::to_storage_is_full_err)?;
+        Ok(old_len)
+    }
+
+    fn commit_with_count(&self, mut txn: lmdb::RwTransaction, tally: Tally) -> PyResult<()> {
+        let counters = [
+            (&self.count, b"count", tally.added, tally.removed),
+            (
+                &self.bytes,
+                b"bytes",
+                tally.bytes_added,
+                tally.bytes_removed,
+            ),
+        ];
+        for (current, name, added, removed) in counters {
+            if added != removed {
+                let new_value = (current.load(Ordering::SeqCst) + added).saturating_sub(removed);
+                txn.put(
+                    self.db_meta,
+                    name,
+                    &(new_value as u64).to_le_bytes(),
+                    WriteFlags::empty(),
+                )
+                .map_err(Self::to_storage_is_full_err)?;
+            }
         }
 
         txn.commit().map_err(Self::to_storage_is_full_err)?;
 
-        if is_new {
-            count_atom.fetch_add(1, Ordering::SeqCst);
+        for (current, _, added, removed) in counters {
+            if added != removed {
+                current.fetch_add(added, Ordering::SeqCst);
+                current.fetch_sub(removed, Ordering::SeqCst);
+            }
         }
-
         Ok(())
     }
 }
@@ -441,18 +939,40 @@ impl Storage for LmdbStorage {
         Python::attach(|py| SyncStorage::get(self, py, key))
     }
 
+    async fn get_many(&self, keys: &[String]) -> Vec<StorageResult> {
+        Python::attach(|py| SyncStorage::get_many(self, py, keys))
+    }
+
     fn try_get_sync(&self, py: Python, key: &str) -> Option<StorageResult> {
         Some(SyncStorage::get(self, py, key))
     }
 
+    fn try_get_many_sync(&self, py: Python, keys: &[String]) -> Option<Vec<StorageResult>> {
+        Some(SyncStorage::get_many(self, py, keys))
+    }
+
     async fn set(&self, key: String, entry: Arc<CacheEntry>, ttl: Option<u64>) -> PyResult<()> {
         SyncStorage::set(self, key, entry, ttl)
     }
 
+    async fn set_many(&self, items: Vec<(String, Arc<CacheEntry>, Option<u64>)>) -> PyResult<()> {
+        SyncStorage::set_many(self, items)
+    }
+
     async fn set_raw(&self, key: String, data: Vec<u8>, ttl: Option<u64>) -> PyResult<()> {
         SyncStorage::set_raw(self, key, data, ttl)
     }
 
+    async fn restamp(
+        &self,
+        key: String,
+        entry: Arc<CacheEntry>,
+        _ttl: Option<u64>,
+        read_version: u64,
+    ) -> PyResult<()> {
+        self.restamp_in_place(&key, read_version, entry.trie_version)
+    }
+
     async fn touch_batch(&self, updates: Vec<(String, Option<u64>)>) -> PyResult<()> {
         SyncStorage::touch_batch(self, updates)
     }
@@ -469,6 +989,10 @@ impl Storage for LmdbStorage {
         SyncStorage::len(self)
     }
 
+    fn size_bytes(&self) -> Option<usize> {
+        Some(self.bytes.load(Ordering::SeqCst))
+    }
+
     async fn evict_lru(&self, count: usize) -> PyResult<Vec<String>> {
         SyncStorage::evict_lru(self, count)
     }
@@ -477,6 +1001,10 @@ impl Storage for LmdbStorage {
         SyncStorage::scan_keys(self, prefix)
     }
 
+    async fn sweep_expired(&self, limit: usize) -> PyResult<usize> {
+        LmdbStorage::sweep_expired(self, limit)
+    }
+
     fn needs_tti_worker(&self) -> bool {
         SyncStorage::needs_tti_worker(self)
     }
@@ -495,6 +1023,14 @@ impl Storage for LmdbStorage {
         SyncStorage::set(self, key, entry, ttl)
     }
 
+    fn try_set_many_sync(
+        &self,
+        _py: Python,
+        items: Vec<(String, Arc<CacheEntry>, Option<u64>)>,
+    ) -> PyResult<()> {
+        SyncStorage::set_many(self, items)
+    }
+
     fn try_remove_sync(&self, key: &str) -> PyResult<()> {
         SyncStorage::remove(self, key)
     }
@@ -1,36 +1,140 @@
 use crate::storage::SyncStorage;
 use crate::utils::now_secs;
 use dashmap::DashMap;
+use pyo3::intern;
 use pyo3::prelude::*;
+use pyo3::types::{PyBool, PyBytes, PyDict, PyFloat, PyInt, PyList, PySet, PyString, PyTuple};
 use rand::seq::IteratorRandom;
-use std::collections::BTreeSet;
-use std::sync::{Arc, RwLock};
+use std::sync::atomic::{AtomicUsize, Ordering};
+use std::sync::{Arc, Mutex};
 
+use super::tinylfu::TinyLfu;
 use super::{CacheEntry, Storage};
 
+/// Entries live only in the sharded map: writers lock one shard, and there is
+/// no second copy of the keys. Eviction samples straight from the map and
+/// `scan_keys` walks it. Only the opt-in W-TinyLFU policy keeps its own
+/// ordered view of the keys.
 pub(crate) struct InMemoryStorage {
-    map: DashMap<String, (Arc<CacheEntry>, Option<u64>, u64)>,
-    keys_index: RwLock<BTreeSet<String>>,
+    /// key -> (entry, expires_at, last_accessed, estimated bytes)
+    map: DashMap<String, (Arc<CacheEntry>, Option<u64>, u64, usize)>,
+    /// `eviction_policy="tinylfu"`; `None` evicts by sampled LRU.
+    tinylfu: Option<Mutex<TinyLfu>>,
+    /// Sum of estimated entry sizes; `None` unless `max_bytes` is set, so
+    /// unbounded caches never pay for the estimate.
+    bytes: Option<AtomicUsize>,
 }
 
 impl InMemoryStorage {
     pub fn new() -> Self {
         Self {
             map: DashMap::new(),
-            keys_index: RwLock::new(BTreeSet::new()),
+            tinylfu: None,
+            bytes: None,
         }
     }
 
+    pub fn with_tinylfu(mut self, capacity: usize) -> Self {
+        self.tinylfu = Some(Mutex::new(TinyLfu::new(capacity)));
+        self
+    }
+
+    pub fn with_size_tracking(mut self) -> Self {
+        self.bytes = Some(AtomicUsize::new(0));
+        self
+    }
+
     fn set_internal(&self, key: String, entry: Arc<CacheEntry>, ttl: Option<u64>) -> PyResult<()> {
         let expires_at = ttl.map(|t| now_secs().saturating_add(t));
         let last_accessed = now_secs();
-        self.map
-            .insert(key.clone(), (entry, expires_at, last_accessed));
-
-        let mut index = self.keys_index.write().unwrap();
-        index.insert(key);
+        let size = match self.bytes {
+            Some(_) => Python::attach(|py| entry_size(py, &key, &entry)),
+            None => 0,
+        };
+        if let Some(policy) = &self.tinylfu {
+            policy.lock().unwrap().on_insert(&key);
+        }
+        self.put(key, (entry, expires_at, last_accessed, size));
         Ok(())
     }
+
+    fn put(&self, key: String, value: (Arc<CacheEntry>, Option<u64>, u64, usize)) {
+        value.0.handles.retain();
+        let size = value.3;
+        let old = self.map.insert(key, value);
+        if let Some(bytes) = &self.bytes {
+            bytes.fetch_add(size, Ordering::Relaxed);
+            if let Some((_, _, _, old_size)) = old {
+                bytes.fetch_sub(old_size, Ordering::Relaxed);
+            }
+        }
+    }
+
+    /// Removes the key from the map and the byte total, not from the policy.
+    fn take(&self, key: &str) -> bool {
+        let Some((_, (_, _, _, size))) = self.map.remove(key) else {
+            return false;
+        };
+        if let Some(bytes) = &self.bytes {
+            bytes.fetch_sub(size, Ordering::Relaxed);
+        }
+        true
+    }
+
+    fn forget_in_policy(&self, key: &str) {
+        if let Some(policy) = &self.tinylfu {
+            policy.lock().unwrap().on_remove(key);
+        }
+    }
+
+    /// `size` consecutive entries (key, last access) starting at a random
+    /// position in the map's shard order, wrapping around. Hash order is
+    /// unrelated to recency, so a window is as good as a scattered sample.
+    fn sample_window(&self, size: usize) -> Vec<(String, u64)> {
+        let start = (0..self.map.len()).choose(&mut rand::rng()).unwrap_or(0);
+        let mut sample: Vec<(String, u64)> = self
+            .map
+            .iter()
+            .skip(start)
+            .take(size)
+            .map(|e| (e.key().clone(), e.value().2))
+            .collect();
+        if sample.len() < size {
+            let missing = (size - sample.len()).min(start);
+            sample.extend(
+                self.map
+                    .iter()
+                    .take(missing)
+                    .map(|e| (e.key().clone(), e.value().2)),
+            );
+        }
+        sample
+    }
+
+    fn evict_sampled(&self, count: usize) -> Vec<String> {
+        let sample_size = count.saturating_mul(5).min(self.map.len());
+
+        let mut oldest_items: Vec<(String, u64)> = Vec::with_capacity(count);
+
+        for (key, ts) in self.sample_window(sample_size) {
+            if oldest_items.len() < count {
+                oldest_items.push((key, ts));
+                oldest_items.sort_unstable_by_key(|&(_, t)| t);
+            } else if ts < oldest_items.last().unwrap().1 {
+                oldest_items.pop();
+                oldest_items.push((key, ts));
+                oldest_items.sort_unstable_by_key(|&(_, t)| t);
+            }
+        }
+
+        let to_evict: Vec<String> = oldest_items.into_iter().map(|(k, _)| k).collect();
+
+        for key in &to_evict {
+            self.take(key);
+        }
+
+        to_evict
+    }
 }
 
 impl SyncStorage for InMemoryStorage {
@@ -40,17 +144,23 @@ impl SyncStorage for InMemoryStorage {
             Some(e) => e,
             None => return super::StorageResult::NotFound,
         };
-        let (val, expires_at, last_accessed) = entry.value_mut();
+        let (val, expires_at, last_accessed, _) = entry.value_mut();
 
         if expires_at.is_some_and(|expires| now_secs() > expires) {
             drop(entry);
-            self.map.remove(key);
-            let mut index = self.keys_index.write().unwrap();
-            index.remove(key);
+            self.take(key);
+            self.forget_in_policy(key);
             return super::StorageResult::Expired;
         }
 
         *last_accessed = now_secs();
+        // Hits are recorded best-effort: under contention one is dropped
+        // rather than making readers queue on the policy lock.
+        if let Some(policy) = &self.tinylfu
+            && let Ok(mut policy) = policy.try_lock()
+        {
+            policy.on_access(key);
+        }
         super::StorageResult::Hit(Arc::clone(val), *expires_at, None)
     }
 
@@ -58,6 +168,28 @@ impl SyncStorage for InMemoryStorage {
         self.set_internal(key, entry, ttl)
     }
 
+    fn set_many(&self, items: Vec<(String, Arc<CacheEntry>, Option<u64>)>) -> PyResult<()> {
+        let now = now_secs();
+        let sizes: Vec<usize> = match self.bytes {
+            Some(_) => Python::attach(|py| {
+                items
+                    .iter()
+                    .map(|(key, entry, _)| entry_size(py, key, entry))
+                    .collect()
+            }),
+            None => vec![0; items.len()],
+        };
+        let mut policy = self.tinylfu.as_ref().map(|p| p.lock().unwrap());
+        for ((key, entry, ttl), size) in items.into_iter().zip(sizes) {
+            let expires_at = ttl.map(|t| now.saturating_add(t));
+            if let Some(policy) = policy.as_mut() {
+                policy.on_insert(&key);
+            }
+            self.put(key, (entry, expires_at, now, size));
+        }
+        Ok(())
+    }
+
     #[inline]
     fn touch_batch(&self, updates: Vec<(String, Option<u64>)>) -> PyResult<()> {
         for (key, ttl) in updates {
@@ -73,17 +205,20 @@ impl SyncStorage for InMemoryStorage {
 
     #[inline]
     fn remove(&self, key: &str) -> PyResult<()> {
-        if self.map.remove(key).is_some() {
-            let mut index = self.keys_index.write().unwrap();
-            index.remove(key);
+        if self.take(key) {
+            self.forget_in_policy(key);
         }
         Ok(())
     }
 
     fn clear(&self) -> PyResult<()> {
         self.map.clear();
-        let mut index = self.keys_index.write().unwrap();
-        index.clear();
+        if let Some(bytes) = &self.bytes {
+            bytes.store(0, Ordering::Relaxed);
+        }
+        if let Some(policy) = &self.tinylfu {
+            policy.lock().unwrap().clear();
+        }
         Ok(())
     }
 
@@ -96,70 +231,103 @@ impl SyncStorage for InMemoryStorage {
             return Ok(Vec::new());
         }
 
-        let sample_size = count.saturating_mul(5).min(self.map.len());
-
-        let mut oldest_items: Vec<(String, u64)> = Vec::with_capacity(count);
-        let mut rng = rand::rng();
-
-        let sample_keys: Vec<String> = {
-            let index = self.keys_index.read().unwrap();
-            index
-                .iter()
-                .sample(&mut rng, sample_size)
-                .into_iter()
-                .cloned()
-                .collect()
-        };
-
-        for key in sample_keys {
-            let ts = if let Some(entry) = self.map.get(&key) {
-                entry.value().2
-            } else {
-                continue;
-            };
-
-            if oldest_items.len() < count {
-                oldest_items.push((key, ts));
-                oldest_items.sort_unstable_by_key(|&(_, t)| t);
-            } else if ts < oldest_items.last().unwrap().1 {
-                oldest_items.pop();
-                oldest_items.push((key, ts));
-                oldest_items.sort_unstable_by_key(|&(_, t)| t);
+        if let Some(policy) = &self.tinylfu {
+            let victims = policy.lock().unwrap().victims(count);
+            let mut evicted: Vec<String> =
+                victims.into_iter().filter(|key| self.take(key)).collect();
+            // Keys the policy lost track of (an insert racing a removal) are
+            // still bounded by falling back to sampled LRU.
+            if evicted.len() < count {
+                evicted.extend(self.evict_sampled(count - evicted.len()));
             }
+            return Ok(evicted);
         }
+        Ok(self.evict_sampled(count))
+    }
 
-        let to_evict: Vec<String> = oldest_items.into_iter().map(|(k, _)| k).collect();
+    fn scan_keys(&self, prefix: &str) -> Vec<(String, Option<u64>)> {
+        // Only used by remote inspection, so a full walk (one shard read
+        // lock at a time) is cheaper overall than keeping an ordered index
+        // up to date on every write.
+        let now = now_secs();
+        let mut results: Vec<(String, Option<u64>)> = self
+            .map
+            .iter()
+            .filter(|e| e.key().starts_with(prefix))
+            .filter(|e| !e.value().1.is_some_and(|expires| now > expires))
+            .map(|e| (e.key().clone(), e.value().1))
+            .collect();
+        results.sort_unstable_by(|a, b| a.0.cmp(&b.0));
+        results
+    }
+}
 
-        let mut index = self.keys_index.write().unwrap();
-        for key in &to_evict {
-            self.map.remove(key);
-            index.remove(key);
-        }
+const ENTRY_OVERHEAD: usize = 128;
+const DEP_OVERHEAD: usize = 96;
+const SIZE_SAMPLE: usize = 64;
+const SIZE_MAX_DEPTH: usize = 8;
+
+/// Estimated resident bytes of one cached entry: its key, its dependency
+/// snapshots and the Python value.
+fn entry_size(py: Python, key: &str, entry: &CacheEntry) -> usize {
+    ENTRY_OVERHEAD
+        + key.len()
+        + entry
+            .dependencies
+            .keys()
+            .map(|tag| DEP_OVERHEAD + tag.len())
+            .sum::<usize>()
+        + py_size(entry.value.bind(py), 0)
+}
 
-        Ok(to_evict)
+/// Approximate size of a Python object after CPython's 64-bit layouts.
+/// Containers longer than `SIZE_SAMPLE` are extrapolated from their first
+/// items; anything deeper than `SIZE_MAX_DEPTH` counts as a small object.
+fn py_size<'py>(obj: &Bound<'py, PyAny>, depth: usize) -> usize {
+    if let Ok(b) = obj.cast::<PyBytes>() {
+        return 33 + b.as_bytes().len();
+    }
+    if obj.is_instance_of::<PyString>() {
+        return 49 + obj.len().unwrap_or(0);
+    }
+    if obj.is_none()
+        || obj.is_instance_of::<PyBool>()
+        || obj.is_instance_of::<PyInt>()
+        || obj.is_instance_of::<PyFloat>()
+    {
+        return 28;
+    }
+    if depth >= SIZE_MAX_DEPTH {
+        return 64;
     }
+    let child = |item: Bound<'py, PyAny>| py_size(&item, depth + 1);
+    if let Ok(list) = obj.cast::<PyList>() {
+        return 56 + 8 * list.len() + sampled(list.iter().map(child), list.len());
+    }
+    if let Ok(tuple) = obj.cast::<PyTuple>() {
+        return 40 + 8 * tuple.len() + sampled(tuple.iter().map(child), tuple.len());
+    }
+    if let Ok(dict) = obj.cast::<PyDict>() {
+        let items = dict.iter().map(|(k, v)| child(k) + child(v));
+        return 64 + 40 * dict.len() + sampled(items, dict.len());
+    }
+    if let Ok(set) = obj.cast::<PySet>() {
+        return 216 + 16 * set.len() + sampled(set.iter().map(child), set.len());
+    }
+    // Plain class instances (dataclasses, models) carry their fields in
+    // `__dict__`.
+    match obj.getattr(intern!(obj.py(), "__dict__")) {
+        Ok(attrs) if attrs.is_instance_of::<PyDict>() => 48 + py_size(&attrs, depth + 1),
+        _ => 64,
+    }
+}
 
-    fn scan_keys(&self, prefix: &str) -> Vec<(String, Option<u64>)> {
-        let mut results = Vec::new();
-        let index = self.keys_index.read().unwrap();
-
-        let it = index.range::<str, _>((
-            std::ops::Bound::Included(prefix),
-            std::ops::Bound::Unbounded,
-        ));
-        for key in it {
-            if !key.starts_with(prefix) {
-                break;
-            }
-            if let Some(entry) = self.map.get(key) {
-                let (_, expires_at, _) = entry.value();
-                let is_expired = expires_at.is_some_and(|expires| now_secs() > expires);
-                if !is_expired {
-                    results.push((key.clone(), *expires_at));
-                }
-            }
-        }
-        results
+fn sampled(sizes: impl Iterator<Item = usize>, len: usize) -> usize {
+    let sum: usize = sizes.take(SIZE_SAMPLE).sum();
+    if len > SIZE_SAMPLE {
+        sum * len / SIZE_SAMPLE
+    } else {
+        sum
     }
 }
 
@@ -172,14 +340,26 @@ impl Storage for InMemoryStorage {
         Python::attach(|py| SyncStorage::get(self, py, key))
     }
 
+    async fn get_many(&self, keys: &[String]) -> Vec<super::StorageResult> {
+        Python::attach(|py| SyncStorage::get_many(self, py, keys))
+    }
+
     fn try_get_sync(&self, py: Python, key: &str) -> Option<super::StorageResult> {
         Some(SyncStorage::get(self, py, key))
     }
 
+    fn try_get_many_sync(&self, py: Python, keys: &[String]) -> Option<Vec<super::StorageResult>> {
+        Some(SyncStorage::get_many(self, py, keys))
+    }
+
     async fn set(&self, key: String, entry: Arc<CacheEntry>, ttl: Option<u64>) -> PyResult<()> {
         SyncStorage::set(self, key, entry, ttl)
     }
 
+    async fn set_many(&self, items: Vec<(String, Arc<CacheEntry>, Option<u64>)>) -> PyResult<()> {
+        SyncStorage::set_many(self, items)
+    }
+
     #[inline]
     async fn touch_batch(&self, updates: Vec<(String, Option<u64>)>) -> PyResult<()> {
         SyncStorage::touch_batch(self, updates)
@@ -198,6 +378,10 @@ impl Storage for InMemoryStorage {
         SyncStorage::len(self)
     }
 
+    fn size_bytes(&self) -> Option<usize> {
+        self.bytes.as_ref().map(|b| b.load(Ordering::Relaxed))
+    }
+
     async fn evict_lru(&self, count: usize) -> PyResult<Vec<String>> {
         SyncStorage::evict_lru(self, count)
     }
@@ -216,6 +400,14 @@ impl Storage for InMemoryStorage {
         SyncStorage::set(self, key, entry, ttl)
     }
 
+    fn try_set_many_sync(
+        &self,
+        _py: Python,
+        items: Vec<(String, Arc<CacheEntry>, Option<u64>)>,
+    ) -> PyResult<()> {
+        SyncStorage::set_many(self, items)
+    }
+
     fn try_remove_sync(&self, key: &str) -> PyResult<()> {
         SyncStorage::remove(self, key)
     }
@@ -1,9 +1,12 @@
 mod lmdb;
 mod memory;
 mod redis;
+mod tinylfu;
+mod tracking;
 
-pub(crate) use self::lmdb::LmdbStorage;
-pub(crate) use self::redis::RedisStorage;
+pub(crate) use self::lmdb::{LmdbLruMode, LmdbStorage};
+pub(crate) use self::redis::{RedisLruMode, RedisReadMode, RedisStorage};
+pub(crate) use self::tinylfu::EvictionPolicy;
 pub(crate) use memory::InMemoryStorage;
 
 use foldhash::HashMap;
@@ -11,6 +14,7 @@ use lz4_flex::block::{compress_prepend_size, decompress_size_prepended};
 use pyo3::prelude::*;
 use pythonize::pythonize;
 use serde::{Deserialize, Serialize};
+use std::borrow::Cow;
 use std::cell::RefCell;
 use std::sync::Arc;
 
@@ -18,7 +22,7 @@ thread_local! {
     static SERIALIZE_BUF: RefCell<Vec<u8>> = RefCell::new(Vec::with_capacity(16 * 1024));
 }
 
-use crate::trie::DepSnapshot;
+use crate::trie::{DepHandles, DepSnapshot};
 use crate::utils::to_runtime_err;
 use std::sync::OnceLock;
 
@@ -33,17 +37,41 @@ fn get_compression_threshold() -> usize {
     *COMPRESSION_THRESHOLD.get_or_init(|| 256)
 }
 
+/// On-disk entry layout. `value` borrows the msgpack buffer in both
+/// directions, so neither encoding nor decoding copies the payload.
 #[derive(Serialize, Deserialize)]
-struct SerializableCacheEntry {
-    #[serde(with = "serde_bytes")]
-    value: Vec<u8>,
-    dependencies: HashMap<String, DepSnapshot>,
+struct SerializableCacheEntry<'a> {
+    #[serde(borrow, with = "serde_bytes")]
+    value: &'a [u8],
+    dependencies: Cow<'a, HashMap<String, DepSnapshot>>,
+    // Trailing and skipped when unset so entries that never record a cost keep
+    // the original two-field layout. Fields are positional, so each one is
+    // written (0 standing for "unset") whenever a later field follows it.
+    #[serde(default, skip_serializing_if = "Option::is_none")]
+    cost_ms: Option<u32>,
+    #[serde(default, skip_serializing_if = "Option::is_none")]
+    max_expires_at: Option<u64>,
+    #[serde(default, skip_serializing_if = "Option::is_none")]
+    stale_window: Option<u64>,
 }
 
 pub(crate) struct CacheEntry {
     pub value: Py<PyAny>,
     pub dependencies: Arc<HashMap<String, DepSnapshot>>,
     pub trie_version: u64,
+    /// Root shards of `dependencies` (see `PrefixTrie::unchanged_since`);
+    /// derived on load, never serialized.
+    pub dep_roots: u64,
+    /// How long the value took to compute, used for early refresh (0 = unknown).
+    pub cost_ms: u32,
+    /// Resolved trie nodes for `dependencies`; shared by re-stamped copies.
+    pub handles: Arc<DepHandles>,
+    /// Latest expiry (epoch seconds) reads may extend the entry to; `None`
+    /// slides without bound (see `ttl::TtlPolicy`).
+    pub max_expires_at: Option<u64>,
+    /// Seconds of stored TTL past the logical expiry, kept for
+    /// stale-while-revalidate readers (0 = none).
+    pub stale_window: u64,
 }
 
 const MAGIC_HEADER: &[u8] = b"ZOO2";
@@ -53,6 +81,33 @@ const VERSION_LEN: usize = 8;
 const HEADER_LEN: usize = MAGIC_LEN + VERSION_LEN;
 
 impl CacheEntry {
+    /// Same value and dependencies, re-stamped with a newer trie version.
+    pub fn with_trie_version(&self, py: Python, trie_version: u64) -> Self {
+        Self {
+            value: self.value.clone_ref(py),
+            dependencies: Arc::clone(&self.dependencies),
+            trie_version,
+            dep_roots: self.dep_roots,
+            cost_ms: self.cost_ms,
+            handles: Arc::clone(&self.handles),
+            max_expires_at: self.max_expires_at,
+            stale_window: self.stale_window,
+        }
+    }
+
+    /// Logical expiry for a stored `expires_at`: the stale-while-revalidate
+    /// window is part of the stored TTL but not of the entry's lifetime.
+    #[inline]
+    pub fn logical_expiry(&self, expires_at: Option<u64>) -> Option<u64> {
+        expires_at.map(|exp| exp.saturating_sub(self.stale_window))
+    }
+
+    /// Past its logical expiry; only stale-while-revalidate reads serve it.
+    #[inline]
+    pub fn is_expired(&self, expires_at: Option<u64>, now: u64) -> bool {
+        self.logical_expiry(expires_at).is_some_and(|exp| now > exp)
+    }
+
     pub fn serialize(&self, py: Python) -> PyResult<Vec<u8>> {
         SERIALIZE_BUF.with(|buf| {
             let mut value_buf = buf.borrow_mut();
@@ -65,8 +120,15 @@ impl CacheEntry {
                 .map_err(|e| PyErr::new::<pyo3::exceptions::PyTypeError, _>(e.to_string()))?;
 
             let entry = SerializableCacheEntry {
-                value: value_buf.clone(),
-                dependencies: self.dependencies.as_ref().clone(),
+                value: &value_buf,
+                dependencies: Cow::Borrowed(self.dependencies.as_ref()),
+                cost_ms: (self.cost_ms != 0
+                    || self.max_expires_at.is_some()
+                    || self.stale_window != 0)
+                    .then_some(self.cost_ms),
+                max_expires_at: (self.max_expires_at.is_some() || self.stale_window != 0)
+                    .then(|| self.max_expires_at.unwrap_or(0)),
+                stale_window: (self.stale_window != 0).then_some(self.stale_window),
             };
 
             let packed = rmp_serde::to_vec(&entry).map_err(to_runtime_err)?;
@@ -112,8 +174,10 @@ impl CacheEntry {
         );
 
         let payload = &data[HEADER_LEN..];
-        let decompressed = if is_compressed {
-            decompress_size_prepended(payload).map_err(to_runtime_err)?
+        // Uncompressed payloads are decoded straight from `data` (for LMDB, the
+        // mmap); only LZ4 payloads need an owned buffer.
+        let decompressed: Cow<[u8]> = if is_compressed {
+            Cow::Owned(decompress_size_prepended(payload).map_err(to_runtime_err)?)
         } else {
             if payload.len() < 4 {
                 return Err(to_runtime_err("Invalid uncompressed data format"));
@@ -126,12 +190,12 @@ impl CacheEntry {
             if payload.len() < 4 + size {
                 return Err(to_runtime_err("Truncated uncompressed data"));
             }
-            payload[4..4 + size].to_vec()
+            Cow::Borrowed(&payload[4..4 + size])
         };
         let entry: SerializableCacheEntry =
             rmp_serde::from_slice(&decompressed).map_err(to_runtime_err)?;
 
-        let mut deserializer = rmp_serde::decode::Deserializer::new(&entry.value[..]);
+        let mut deserializer = rmp_serde::decode::Deserializer::from_read_ref(entry.value);
         let transcoder = serde_transcode::Transcoder::new(&mut deserializer);
 
         let py_val = pythonize(py, &transcoder)
@@ -139,11 +203,24 @@ impl CacheEntry {
 
         Ok(Self {
             value: py_val.into(),
-            dependencies: Arc::new(entry.dependencies),
+            dep_roots: crate::trie::root_mask(&entry.dependencies),
+            dependencies: Arc::new(entry.dependencies.into_owned()),
             trie_version,
+            cost_ms: entry.cost_ms.unwrap_or(0),
+            handles: Default::default(),
+            max_expires_at: entry.max_expires_at.filter(|&at| at != 0),
+            stale_window: entry.stale_window.unwrap_or(0),
         })
     }
 
+    /// The trie version in a serialized entry's header, without decoding it.
+    pub fn trie_version_raw(data: &[u8]) -> Option<u64> {
+        let header = data.get(MAGIC_LEN..HEADER_LEN)?;
+        let magic = &data[..MAGIC_LEN];
+        (magic == MAGIC_HEADER || magic == MAGIC_HEADER_UNCOMPRESSED)
+            .then(|| u64::from_le_bytes(header.try_into().unwrap()))
+    }
+
     pub fn update_trie_version_raw(data: &[u8], new_version: u64) -> PyResult<Vec<u8>> {
         if data.len() < HEADER_LEN {
             return Err(to_runtime_err("Invalid format"));
@@ -172,11 +249,36 @@ pub(crate) enum StorageResult {
     Error,
 }
 
+impl StorageResult {
+    /// Reports a hit past its logical expiry as `NotFound`. The entry is left
+    /// in place: it stays servable to stale-while-revalidate reads until its
+    /// stored TTL runs out.
+    pub fn fresh(self) -> Self {
+        match self {
+            Self::Hit(entry, expires_at, _)
+                if entry.is_expired(expires_at, crate::utils::now_secs()) =>
+            {
+                Self::NotFound
+            }
+            other => other,
+        }
+    }
+}
+
 use async_trait::async_trait;
 
 pub(crate) trait SyncStorage: Send + Sync {
     fn get(&self, py: Python, key: &str) -> StorageResult;
+    fn get_many(&self, py: Python, keys: &[String]) -> Vec<StorageResult> {
+        keys.iter().map(|key| self.get(py, key)).collect()
+    }
     fn set(&self, key: String, entry: Arc<CacheEntry>, ttl: Option<u64>) -> PyResult<()>;
+    fn set_many(&self, items: Vec<(String, Arc<CacheEntry>, Option<u64>)>) -> PyResult<()> {
+        for (key, entry, ttl) in items {
+            self.set(key, entry, ttl)?;
+        }
+        Ok(())
+    }
     fn set_raw(&self, key: String, data: Vec<u8>, ttl: Option<u64>) -> PyResult<()> {
         let entry = Python::attach(|py| CacheEntry::deserialize(py, &data))?;
         self.set(key, Arc::new(entry), ttl)
@@ -195,17 +297,53 @@ pub(crate) trait SyncStorage: Send + Sync {
 #[async_trait]
 pub(crate) trait Storage: Send + Sync {
     async fn get(&self, key: &str) -> StorageResult;
+    async fn get_many(&self, keys: &[String]) -> Vec<StorageResult> {
+        let mut results = Vec::with_capacity(keys.len());
+        for key in keys {
+            results.push(self.get(key).await);
+        }
+        results
+    }
     async fn set(&self, key: String, entry: Arc<CacheEntry>, ttl: Option<u64>) -> PyResult<()>;
+    async fn set_many(&self, items: Vec<(String, Arc<CacheEntry>, Option<u64>)>) -> PyResult<()> {
+        for (key, entry, ttl) in items {
+            self.set(key, entry, ttl).await?;
+        }
+        Ok(())
+    }
     async fn set_raw(&self, key: String, data: Vec<u8>, ttl: Option<u64>) -> PyResult<()> {
         let entry = Python::attach(|py| CacheEntry::deserialize(py, &data))?;
         self.set(key, Arc::new(entry), ttl).await
     }
+    /// Persists `entry` after only its `trie_version` changed from
+    /// `read_version`. Backends that can patch the stored header in place
+    /// override this, and skip the patch if the key was rewritten since.
+    async fn restamp(
+        &self,
+        key: String,
+        entry: Arc<CacheEntry>,
+        ttl: Option<u64>,
+        _read_version: u64,
+    ) -> PyResult<()> {
+        self.set(key, entry, ttl).await
+    }
     async fn touch_batch(&self, updates: Vec<(String, Option<u64>)>) -> PyResult<()>;
     async fn remove(&self, key: &str) -> PyResult<()>;
     async fn clear(&self) -> PyResult<()>;
     async fn len(&self) -> usize;
+    /// Approximate bytes held by all entries, for `max_bytes`; `None` when
+    /// the backend does not track it.
+    fn size_bytes(&self) -> Option<usize> {
+        None
+    }
     async fn evict_lru(&self, count: usize) -> PyResult<Vec<String>>;
     async fn scan_keys(&self, prefix: &str) -> Vec<(String, Option<u64>)>;
+    /// Deletes up to `limit` expired entries and returns how many were found.
+    /// Only backends that keep expired entries until they are read override
+    /// this.
+    async fn sweep_expired(&self, _limit: usize) -> PyResult<usize> {
+        Ok(0)
+    }
     fn needs_tti_worker(&self) -> bool {
         false
     }
@@ -215,6 +353,9 @@ pub(crate) trait Storage: Send + Sync {
     fn try_get_sync(&self, _py: Python, _key: &str) -> Option<StorageResult> {
         None
     }
+    fn try_get_many_sync(&self, _py: Python, _keys: &[String]) -> Option<Vec<StorageResult>> {
+        None
+    }
     fn try_set_sync(
         &self,
         _py: Python,
@@ -226,6 +367,15 @@ pub(crate) trait Storage: Send + Sync {
             "Sync set not supported",
         ))
     }
+    fn try_set_many_sync(
+        &self,
+        _py: Python,
+        _items: Vec<(String, Arc<CacheEntry>, Option<u64>)>,
+    ) -> PyResult<()> {
+        Err(PyErr::new::<pyo3::exceptions::PyRuntimeError, _>(
+            "Sync set not supported",
+        ))
+    }
     fn try_remove_sync(&self, _key: &str) -> PyResult<()> {
         Err(PyErr::new::<pyo3::exceptions::PyRuntimeError, _>(
             "Sync remove not supported",
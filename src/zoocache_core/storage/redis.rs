@@ -1,19 +1,81 @@
+use crate::redis_conn::{self, RedisConn, RedisConnections};
 use crate::utils::now_secs;
 use crate::utils::to_conn_err;
 use async_trait::async_trait;
+use futures_util::future::join_all;
+use once_cell::sync::Lazy;
 use pyo3::prelude::*;
-use redis::aio::MultiplexedConnection;
-use redis::{AsyncCommands, Client};
+use redis::cluster::ClusterClient;
+use redis::{AsyncCommands, Client, FromRedisValue, Pipeline};
+use std::collections::HashMap;
+use std::num::NonZeroUsize;
 use std::sync::Arc;
-use tokio::sync::RwLock;
 
+use super::tracking::TrackedReads;
 use super::{CacheEntry, Storage, StorageResult};
 
+/// How `get` reads an entry.
+#[derive(Clone, Copy, Debug, Default, PartialEq, Eq)]
+pub(crate) enum RedisReadMode {
+    /// One Lua call that reads the value and refreshes its LRU score.
+    #[default]
+    Script,
+    /// Pipelined GET + PTTL; LRU recency is left to the TTI worker's batched
+    /// `touch_batch`, so no Lua runs on the hot read path.
+    Plain,
+}
+
+impl RedisReadMode {
+    pub fn parse(name: &str) -> Option<Self> {
+        match name {
+            "script" => Some(Self::Script),
+            "plain" => Some(Self::Plain),
+            _ => None,
+        }
+    }
+}
+
+/// Where LRU recency is recorded for `max_entries` eviction.
+#[derive(Clone, Copy, Debug, Default, PartialEq, Eq)]
+pub(crate) enum RedisLruMode {
+    /// One `{prefix}:_lru` sorted set.
+    #[default]
+    Global,
+    /// `LRU_SHARDS` sorted sets `{prefix}:_lru:{n}`, picked by key hash, so no
+    /// single index key is hot. Always used on a cluster.
+    Sharded,
+    /// No index at all: eviction is left to Redis `maxmemory-policy`.
+    Off,
+}
+
+impl RedisLruMode {
+    pub fn parse(name: &str) -> Option<Self> {
+        match name {
+            "global" => Some(Self::Global),
+            "sharded" => Some(Self::Sharded),
+            "none" => Some(Self::Off),
+            _ => None,
+        }
+    }
+}
+
+const LRU_SHARDS: u64 = 16;
+
+/// Hash-tag groups on a cluster. Every entry key and the LRU set it is
+/// recorded in carry the same `{n}` tag, so each group lives in one slot and
+/// scripts and pipelines never cross slots; 256 tags keep data spread evenly
+/// over the masters.
+const CLUSTER_SHARDS: u64 = 256;
+
 pub(crate) struct RedisStorage {
-    client: Client,
-    connection: Arc<RwLock<Option<MultiplexedConnection>>>,
+    connections: RedisConnections,
     prefix: String,
     lru_update_interval: u64,
+    read_mode: RedisReadMode,
+    lru_mode: RedisLruMode,
+    cluster: bool,
+    shards: u64,
+    tracked: Option<Arc<TrackedReads>>,
 }
 
 const GET_AND_TOUCH_SCRIPT: &str = r#"
@@ -28,49 +90,417 @@ const GET_AND_TOUCH_SCRIPT: &str = r#"
     return {val, pttl}
 "#;
 
+const GET_MANY_SCRIPT: &str = r#"
+    local vals = {}
+    local pttls = {}
+    for i = 1, #KEYS do
+        vals[i] = redis.call('GET', KEYS[i])
+        pttls[i] = redis.call('PTTL', KEYS[i])
+    end
+    return {vals, pttls}
+"#;
+
+const GET_MANY_AND_TOUCH_SCRIPT: &str = r#"
+    local vals = {}
+    local pttls = {}
+    for i = 1, #KEYS / 2 do
+        local val = redis.call('GET', KEYS[2 * i - 1])
+        vals[i] = val
+        pttls[i] = redis.call('PTTL', KEYS[2 * i - 1])
+        if val then
+            local member = ARGV[i + 2]
+            local current_score = redis.call('ZSCORE', KEYS[2 * i], member)
+            if not current_score or (tonumber(ARGV[1]) - tonumber(current_score) >= tonumber(ARGV[2])) then
+                redis.call('ZADD', KEYS[2 * i], ARGV[1], member)
+            end
+        end
+    end
+    return {vals, pttls}
+"#;
+
+// Prepared once per process: the SHA is computed a single time and calls go
+// out as EVALSHA, loading the body only when the server answers NOSCRIPT.
+static GET_AND_TOUCH: Lazy<redis::Script> = Lazy::new(|| redis::Script::new(GET_AND_TOUCH_SCRIPT));
+static GET_MANY: Lazy<redis::Script> = Lazy::new(|| redis::Script::new(GET_MANY_SCRIPT));
+static GET_MANY_AND_TOUCH: Lazy<redis::Script> =
+    Lazy::new(|| redis::Script::new(GET_MANY_AND_TOUCH_SCRIPT));
+
 impl RedisStorage {
     pub fn new(
         url: &str,
         prefix: Option<&str>,
         lru_update_interval: u64,
+        pool_size: usize,
+        read_mode: RedisReadMode,
+        lru_mode: RedisLruMode,
+        tracking_size: Option<NonZeroUsize>,
     ) -> Result<Self, redis::RedisError> {
-        let client = Client::open(url)?;
+        let mut tracked = None;
+        let connections = match (redis_conn::cluster_nodes(url), tracking_size) {
+            (Some(nodes), _) => RedisConnections::cluster(ClusterClient::new(nodes)?, pool_size),
+            (None, Some(capacity)) => {
+                let (reads, pushes) = TrackedReads::start(capacity);
+                tracked = Some(reads);
+                RedisConnections::new(Client::open(with_resp3(url).as_str())?, pool_size)
+                    .with_tracking(pushes)
+            }
+            (None, None) => RedisConnections::new(Client::open(url)?, pool_size),
+        };
+        let cluster = connections.is_cluster();
+        // A single `_lru` key cannot share a slot with every entry.
+        let lru_mode = match lru_mode {
+            RedisLruMode::Global if cluster => RedisLruMode::Sharded,
+            mode => mode,
+        };
         Ok(Self {
-            client,
-            connection: Arc::new(RwLock::new(None)),
+            connections,
             prefix: prefix.unwrap_or("zoocache").to_string(),
             lru_update_interval,
+            read_mode,
+            lru_mode,
+            cluster,
+            shards: if cluster { CLUSTER_SHARDS } else { LRU_SHARDS },
+            tracked,
         })
     }
 
-    async fn get_conn(&self) -> Result<MultiplexedConnection, redis::RedisError> {
-        let mut conn_guard = self.connection.write().await;
-        if let Some(conn) = &*conn_guard {
-            return Ok(conn.clone());
+    /// Redis reports `EXPIRE` as a change to the key, so extending a key this
+    /// process tracks drops its own local copy. While more than half of `ttl`
+    /// is left on the copy the extension waits, so a hot key goes back to
+    /// Redis at most about once per `ttl / 2` instead of on every flush.
+    fn defer_tracked_expire(&self, key: &str, ttl: u64) -> bool {
+        let Some(tracked) = &self.tracked else {
+            return false;
+        };
+        matches!(
+            tracked.expires_at(&self.full_key(key)),
+            Some(Some(at)) if at.saturating_sub(now_secs()) > ttl / 2
+        )
+    }
+
+    fn forget_tracked(&self, key: &str) {
+        if let Some(tracked) = &self.tracked {
+            tracked.forget(&self.full_key(key));
         }
+    }
 
-        let conn = self.client.get_multiplexed_async_connection().await?;
-        *conn_guard = Some(conn.clone());
-        Ok(conn)
+    async fn get_conn(&self) -> Result<RedisConn, redis::RedisError> {
+        self.connections.get().await
+    }
+
+    fn shard(&self, key: &str) -> u64 {
+        xxhash_rust::xxh3::xxh3_64(key.as_bytes()) % self.shards
     }
 
     fn full_key(&self, key: &str) -> String {
-        format!("{}:{}", self.prefix, key)
+        if self.cluster {
+            format!("{}:{{{}}}:{}", self.prefix, self.shard(key), key)
+        } else {
+            format!("{}:{}", self.prefix, key)
+        }
+    }
+
+    /// Inverse of `full_key` for keys found by SCAN.
+    fn user_key<'a>(&self, full_key: &'a str) -> Option<&'a str> {
+        let rest = full_key.strip_prefix(&self.prefix)?.strip_prefix(':')?;
+        if self.cluster {
+            rest.strip_prefix('{')?.split_once("}:").map(|(_, key)| key)
+        } else {
+            Some(rest)
+        }
+    }
+
+    fn shard_lru_key(&self, shard: u64) -> String {
+        if self.cluster {
+            format!("{}:{{{}}}:_lru", self.prefix, shard)
+        } else {
+            format!("{}:_lru:{}", self.prefix, shard)
+        }
+    }
+
+    /// The LRU index `key` is recorded in, if any.
+    fn lru_key(&self, key: &str) -> Option<String> {
+        match self.lru_mode {
+            RedisLruMode::Global => Some(format!("{}:_lru", self.prefix)),
+            RedisLruMode::Sharded => Some(self.shard_lru_key(self.shard(key))),
+            RedisLruMode::Off => None,
+        }
+    }
+
+    fn lru_keys(&self) -> Vec<String> {
+        match self.lru_mode {
+            RedisLruMode::Global => vec![format!("{}:_lru", self.prefix)],
+            RedisLruMode::Sharded => (0..self.shards).map(|s| self.shard_lru_key(s)).collect(),
+            RedisLruMode::Off => Vec::new(),
+        }
+    }
+
+    /// Indices of `keys` grouped by hash slot group; one group holding every
+    /// key on a plain server.
+    fn slot_groups(&self, keys: &[String]) -> Vec<Vec<usize>> {
+        if !self.cluster {
+            return vec![(0..keys.len()).collect()];
+        }
+        let mut groups: HashMap<u64, Vec<usize>> = HashMap::new();
+        for (i, key) in keys.iter().enumerate() {
+            groups.entry(self.shard(key)).or_default().push(i);
+        }
+        groups.into_values().collect()
+    }
+
+    /// Values and PTTLs for one slot group in a single script call, touching
+    /// LRU scores when an index is kept.
+    async fn fetch_group<'a>(
+        &self,
+        mut conn: RedisConn,
+        keys: impl Iterator<Item = &'a String>,
+    ) -> redis::RedisResult<(Vec<Option<Vec<u8>>>, Vec<i64>)> {
+        let keys: Vec<&String> = keys.collect();
+        let mut invocation = match self.lru_mode {
+            RedisLruMode::Off => {
+                let mut invocation = GET_MANY.prepare_invoke();
+                for key in &keys {
+                    invocation.key(self.full_key(key));
+                }
+                invocation
+            }
+            _ => {
+                let mut invocation = GET_MANY_AND_TOUCH.prepare_invoke();
+                for key in &keys {
+                    invocation
+                        .key(self.full_key(key))
+                        .key(self.lru_key(key).unwrap_or_default());
+                }
+                invocation
+                    .arg(now_secs() as f64)
+                    .arg(self.lru_update_interval);
+                for key in &keys {
+                    invocation.arg(key.as_str());
+                }
+                invocation
+            }
+        };
+        invocation.invoke_async(&mut conn).await
+    }
+
+    /// Splits `items` into one pipeline per hash slot group (a single pipeline
+    /// on a plain server), filled by `fill`.
+    fn grouped_pipelines<T>(
+        &self,
+        items: &[T],
+        key_of: impl Fn(&T) -> &str,
+        mut fill: impl FnMut(&mut Pipeline, &T),
+    ) -> Vec<Pipeline> {
+        if !self.cluster {
+            let mut pipe = redis::pipe();
+            items.iter().for_each(|item| fill(&mut pipe, item));
+            return vec![pipe];
+        }
+        let mut groups: HashMap<u64, Pipeline> = HashMap::new();
+        for item in items {
+            fill(groups.entry(self.shard(key_of(item))).or_default(), item);
+        }
+        groups.into_values().collect()
     }
 
-    fn lru_key(&self) -> String {
-        format!("{}:_lru", self.prefix)
+    async fn run_pipelines(
+        &self,
+        conn: &RedisConn,
+        pipes: Vec<Pipeline>,
+    ) -> redis::RedisResult<()> {
+        let results = join_all(pipes.iter().map(|pipe| {
+            let mut conn = conn.clone();
+            async move { pipe.query_async::<()>(&mut conn).await }
+        }))
+        .await;
+        let res = results.into_iter().collect::<redis::RedisResult<Vec<()>>>();
+        if res.is_err() {
+            self.clear_conn();
+        }
+        res.map(|_| ())
     }
 
-    async fn clear_conn(&self) {
-        let mut conn_guard = self.connection.write().await;
-        *conn_guard = None;
+    /// Runs the single-key command `name` for every key: pipelined on a plain
+    /// server, routed per key on a cluster (SCAN results span slots).
+    async fn per_key<T: FromRedisValue>(
+        &self,
+        conn: &RedisConn,
+        name: &str,
+        keys: &[String],
+    ) -> redis::RedisResult<Vec<T>> {
+        if !self.cluster {
+            let mut pipe = redis::pipe();
+            for key in keys {
+                pipe.cmd(name).arg(key);
+            }
+            return pipe.query_async(&mut conn.clone()).await;
+        }
+        join_all(keys.iter().map(|key| {
+            let mut conn = conn.clone();
+            async move { redis::cmd(name).arg(key).query_async::<T>(&mut conn).await }
+        }))
+        .await
+        .into_iter()
+        .collect()
+    }
+
+    /// Queues `ZADD` of `key` into its LRU index (no-op without one).
+    fn record_lru(&self, pipe: &mut redis::Pipeline, key: &str, now: f64) {
+        if let Some(lru_key) = self.lru_key(key) {
+            pipe.zadd(lru_key, key, now);
+        }
+    }
+
+    fn forget_lru(&self, pipe: &mut redis::Pipeline, key: &str) {
+        if let Some(lru_key) = self.lru_key(key) {
+            pipe.zrem(lru_key, key);
+        }
+    }
+
+    fn clear_conn(&self) {
+        self.connections.reset();
+        // Tracking registrations die with the connection.
+        if let Some(tracked) = &self.tracked {
+            tracked.flush();
+        }
+    }
+
+    /// Oldest `count` keys over all LRU shards: the `count` oldest of each
+    /// shard are candidates, the globally oldest of those are evicted.
+    async fn oldest_across_shards(&self, conn: &RedisConn, count: usize) -> Vec<String> {
+        let per_shard = join_all(self.lru_keys().into_iter().map(|lru_key| {
+            let mut conn = conn.clone();
+            async move {
+                conn.zrange_withscores::<_, Vec<(String, f64)>>(lru_key, 0, count as isize - 1)
+                    .await
+                    .unwrap_or_default()
+            }
+        }))
+        .await;
+
+        let mut candidates: Vec<(f64, String)> = per_shard
+            .into_iter()
+            .flatten()
+            .map(|(k, score)| (score, k))
+            .collect();
+        candidates.sort_by(|a, b| a.0.total_cmp(&b.0));
+        candidates.truncate(count);
+        candidates.into_iter().map(|(_, k)| k).collect()
+    }
+
+    /// Entry count without an index: SCAN over the prefix on every node,
+    /// skipping bookkeeping keys (`_lru`, `_flight:`...).
+    async fn count_entries(&self, conn: &mut RedisConn) -> redis::RedisResult<usize> {
+        let pattern = format!("{}:*", self.prefix);
+        let mut total = 0;
+        for target in conn.scan_targets().await? {
+            let mut cursor: u64 = 0;
+            loop {
+                let (next_cursor, keys) = conn.scan_page(&target, cursor, &pattern).await?;
+                total += keys
+                    .iter()
+                    .filter_map(|k| self.user_key(k))
+                    // `_lru`, `_flight:*` and the bus's `node:{id}` heartbeats.
+                    .filter(|k| !k.starts_with('_') && !k.starts_with("node:"))
+                    .count();
+                cursor = next_cursor;
+                if cursor == 0 {
+                    break;
+                }
+            }
+        }
+        Ok(total)
+    }
+
+    /// Batch read through slot-grouped scripts (no tracking registration).
+    async fn fetch_many(&self, keys: &[String]) -> Vec<StorageResult> {
+        if keys.is_empty() {
+            return Vec::new();
+        }
+
+        let conn = match self.get_conn().await {
+            Ok(c) => c,
+            Err(e) => {
+                log::warn!("Redis connection failed for batch get: {}", e);
+                return keys.iter().map(|_| StorageResult::Error).collect();
+            }
+        };
+
+        let groups = self.slot_groups(keys);
+        let replies = join_all(
+            groups
+                .iter()
+                .map(|idx| self.fetch_group(conn.clone(), idx.iter().map(|&i| &keys[i]))),
+        )
+        .await;
+
+        let mut values = vec![None; keys.len()];
+        let mut pttls = vec![-2; keys.len()];
+        for (idx, reply) in groups.iter().zip(replies) {
+            let Ok((group_values, group_pttls)) = reply else {
+                self.clear_conn();
+                return keys.iter().map(|_| StorageResult::NotFound).collect();
+            };
+            for ((&i, value), pttl) in idx.iter().zip(group_values).zip(group_pttls) {
+                values[i] = value;
+                pttls[i] = pttl;
+            }
+        }
+
+        let now = now_secs();
+        let mut corrupted = Vec::new();
+        let results = Python::attach(|py| {
+            keys.iter()
+                .zip(values)
+                .zip(pttls)
+                .map(|((key, data), pttl)| {
+                    let Some(data) = data else {
+                        return StorageResult::NotFound;
+                    };
+                    let expires_at = if pttl > 0 {
+                        Some(now.saturating_add(pttl as u64 / 1000))
+                    } else {
+                        None
+                    };
+                    match CacheEntry::deserialize(py, &data) {
+                        Ok(entry) => StorageResult::Hit(Arc::new(entry), expires_at, Some(data)),
+                        Err(_) => {
+                            ::log::error!("Cache deserialization failed for key '{}'", key);
+                            corrupted.push(key.as_str());
+                            StorageResult::NotFound
+                        }
+                    }
+                })
+                .collect::<Vec<_>>()
+        });
+
+        if !corrupted.is_empty() {
+            let pipes = self.grouped_pipelines(
+                &corrupted,
+                |k| *k,
+                |pipe, key| {
+                    pipe.del(self.full_key(key));
+                    self.forget_lru(pipe, key);
+                },
+            );
+            let _ = self.run_pipelines(&conn, pipes).await;
+        }
+
+        results
     }
 }
 
 #[async_trait]
 impl Storage for RedisStorage {
     async fn get(&self, key: &str) -> StorageResult {
+        let full_key = self.full_key(key);
+        if let Some(tracked) = &self.tracked
+            && let Some((entry, expires_at)) = tracked.lookup(&full_key, now_secs())
+        {
+            return StorageResult::Hit(entry, expires_at, None);
+        }
+        let generation = self.tracked.as_ref().map(|t| t.generation());
+
         let mut conn = match self.get_conn().await {
             Ok(c) => c,
             Err(e) => {
@@ -79,24 +509,45 @@ impl Storage for RedisStorage {
             }
         };
 
-        let now = now_secs() as f64;
-        let script = redis::Script::new(GET_AND_TOUCH_SCRIPT);
-        let res: Result<(Vec<u8>, i64), _> = script
-            .key(self.full_key(key))
-            .key(self.lru_key())
-            .arg(now)
-            .arg(key)
-            .arg(self.lru_update_interval)
-            .invoke_async(&mut conn)
-            .await;
+        let res: Result<(Option<Vec<u8>>, i64), _> = match (self.read_mode, self.lru_key(key)) {
+            // OPTIN tracking registers only the command right after CACHING.
+            _ if self.tracked.is_some() => {
+                redis::pipe()
+                    .cmd("CLIENT")
+                    .arg("CACHING")
+                    .arg("yes")
+                    .ignore()
+                    .get(&full_key)
+                    .pttl(&full_key)
+                    .query_async(&mut conn)
+                    .await
+            }
+            (RedisReadMode::Script, Some(lru_key)) => {
+                GET_AND_TOUCH
+                    .key(&full_key)
+                    .key(lru_key)
+                    .arg(now_secs() as f64)
+                    .arg(key)
+                    .arg(self.lru_update_interval)
+                    .invoke_async(&mut conn)
+                    .await
+            }
+            _ => {
+                redis::pipe()
+                    .get(&full_key)
+                    .pttl(&full_key)
+                    .query_async(&mut conn)
+                    .await
+            }
+        };
 
         if res.is_err() {
-            self.clear_conn().await;
+            self.clear_conn();
         }
 
         let (data, pttl) = match res {
-            Ok(r) => r,
-            Err(_) => return StorageResult::NotFound,
+            Ok((Some(data), pttl)) => (data, pttl),
+            _ => return StorageResult::NotFound,
         };
 
         let expires_at = if pttl > 0 {
@@ -106,21 +557,51 @@ impl Storage for RedisStorage {
         };
 
         match Python::attach(|py| CacheEntry::deserialize(py, &data).ok().map(Arc::new)) {
-            Some(entry) => StorageResult::Hit(entry, expires_at, Some(data)),
+            Some(entry) => {
+                if let (Some(tracked), Some(generation)) = (&self.tracked, generation) {
+                    tracked.insert(full_key, generation, Arc::clone(&entry), expires_at);
+                }
+                StorageResult::Hit(entry, expires_at, Some(data))
+            }
             None => {
                 ::log::error!("Cache deserialization failed for key '{}'", key);
-                let _: () = redis::pipe()
-                    .del(self.full_key(key))
-                    .zrem(self.lru_key(), key)
-                    .query_async(&mut conn)
-                    .await
-                    .unwrap_or_default();
+                let mut pipe = redis::pipe();
+                pipe.del(self.full_key(key));
+                self.forget_lru(&mut pipe, key);
+                let _: () = pipe.query_async(&mut conn).await.unwrap_or_default();
                 StorageResult::NotFound
             }
         }
     }
 
+    async fn get_many(&self, keys: &[String]) -> Vec<StorageResult> {
+        let Some(tracked) = &self.tracked else {
+            return self.fetch_many(keys).await;
+        };
+        let now = now_secs();
+        let local: Vec<Option<StorageResult>> = keys
+            .iter()
+            .map(|key| {
+                let (entry, expires_at) = tracked.lookup(&self.full_key(key), now)?;
+                Some(StorageResult::Hit(entry, expires_at, None))
+            })
+            .collect();
+        let pending: Vec<String> = keys
+            .iter()
+            .zip(&local)
+            .filter(|(_, hit)| hit.is_none())
+            .map(|(key, _)| key.clone())
+            .collect();
+
+        let mut fetched = self.fetch_many(&pending).await.into_iter();
+        local
+            .into_iter()
+            .map(|hit| hit.unwrap_or_else(|| fetched.next().unwrap_or(StorageResult::NotFound)))
+            .collect()
+    }
+
     async fn set(&self, key: String, entry: Arc<CacheEntry>, ttl: Option<u64>) -> PyResult<()> {
+        self.forget_tracked(&key);
         let mut conn = self.get_conn().await.map_err(to_conn_err)?;
 
         if let Some(data) = Python::attach(|py| entry.serialize(py).ok()) {
@@ -131,17 +612,49 @@ impl Storage for RedisStorage {
                 Some(t) => pipe.set_ex(&full_key, data, t),
                 None => pipe.set(&full_key, data),
             };
-            pipe.zadd(self.lru_key(), &key, now_secs() as f64);
+            self.record_lru(&mut pipe, &key, now_secs() as f64);
             let res: Result<(), redis::RedisError> = pipe.query_async(&mut conn).await;
             if res.is_err() {
-                self.clear_conn().await;
+                self.clear_conn();
             }
             res.map_err(to_conn_err)?;
         }
         Ok(())
     }
 
+    async fn set_many(&self, items: Vec<(String, Arc<CacheEntry>, Option<u64>)>) -> PyResult<()> {
+        if items.is_empty() {
+            return Ok(());
+        }
+        for (key, _, _) in &items {
+            self.forget_tracked(key);
+        }
+        let serialized = Python::attach(|py| {
+            items
+                .into_iter()
+                .map(|(key, entry, ttl)| Ok((key, entry.serialize(py)?, ttl)))
+                .collect::<PyResult<Vec<_>>>()
+        })?;
+
+        let conn = self.get_conn().await.map_err(to_conn_err)?;
+        let now = now_secs() as f64;
+        let pipes = self.grouped_pipelines(
+            &serialized,
+            |(key, _, _)| key.as_str(),
+            |pipe, (key, data, ttl)| {
+                let full_key = self.full_key(key);
+                match ttl {
+                    Some(t) => pipe.set_ex(&full_key, data, *t),
+                    None => pipe.set(&full_key, data),
+                };
+                self.record_lru(pipe, key, now);
+            },
+        );
+        self.run_pipelines(&conn, pipes).await.map_err(to_conn_err)
+    }
+
     async fn set_raw(&self, key: String, data: Vec<u8>, ttl: Option<u64>) -> PyResult<()> {
+        self.forget_tracked(&key);
         let mut conn = self.get_conn().await.map_err(to_conn_err)?;
         let full_key = self.full_key(&key);
         let mut pipe = redis::pipe();
@@ -150,75 +663,70 @@ impl Storage for RedisStorage {
             Some(t) => pipe.set_ex(&full_key, data, t),
             None => pipe.set(&full_key, data),
         };
-        pipe.zadd(self.lru_key(), &key, now_secs() as f64);
+        self.record_lru(&mut pipe, &key, now_secs() as f64);
         let res: Result<(), redis::RedisError> = pipe.query_async(&mut conn).await;
         if res.is_err() {
-            self.clear_conn().await;
+            self.clear_conn();
         }
         res.map_err(to_conn_err)?;
         Ok(())
     }
 
     async fn touch_batch(&self, updates: Vec<(String, Option<u64>)>) -> PyResult<()> {
-        let mut conn = self.get_conn().await.map_err(to_conn_err)?;
+        let conn = self.get_conn().await.map_err(to_conn_err)?;
         let now = now_secs() as f64;
-        let mut pipe = redis::pipe();
-
-        for (key, ttl) in updates {
-            if let Some(t) = ttl {
-                pipe.expire(self.full_key(&key), t as i64);
-            }
-            pipe.zadd(self.lru_key(), &key, now);
-        }
-        let res: Result<(), redis::RedisError> = pipe.query_async(&mut conn).await;
-        if res.is_err() {
-            self.clear_conn().await;
-        }
-        res.map_err(to_conn_err)?;
-        Ok(())
+        let pipes = self.grouped_pipelines(
+            &updates,
+            |(key, _)| key.as_str(),
+            |pipe, (key, ttl)| {
+                if let Some(t) = ttl
+                    && !self.defer_tracked_expire(key, *t)
+                {
+                    pipe.expire(self.full_key(key), *t as i64);
+                }
+                self.record_lru(pipe, key, now);
+            },
+        );
+        self.run_pipelines(&conn, pipes).await.map_err(to_conn_err)
     }
 
     async fn remove(&self, key: &str) -> PyResult<()> {
+        self.forget_tracked(key);
         let mut conn = self.get_conn().await.map_err(to_conn_err)?;
-        let res: Result<(), redis::RedisError> = redis::pipe()
-            .del(self.full_key(key))
-            .zrem(self.lru_key(), key)
-            .query_async(&mut conn)
-            .await;
+        let mut pipe = redis::pipe();
+        pipe.del(self.full_key(key));
+        self.forget_lru(&mut pipe, key);
+        let res: Result<(), redis::RedisError> = pipe.query_async(&mut conn).await;
         if res.is_err() {
-            self.clear_conn().await;
+            self.clear_conn();
         }
         res.map_err(to_conn_err)?;
         Ok(())
     }
 
     async fn clear(&self) -> PyResult<()> {
+        if let Some(tracked) = &self.tracked {
+            tracked.flush();
+        }
         let mut conn = self.get_conn().await.map_err(to_conn_err)?;
         let pattern = format!("{}:*", self.prefix);
-        let mut cursor: u64 = 0;
-
-        loop {
-            let res: Result<(u64, Vec<String>), _> = redis::cmd("SCAN")
-                .arg(cursor)
-                .arg("MATCH")
-                .arg(&pattern)
-                .arg("COUNT")
-                .arg(500)
-                .query_async(&mut conn)
-                .await;
-
-            match res {
-                Ok((next_cursor, keys)) => {
-                    if !keys.is_empty() {
+
+        for target in conn.scan_targets().await.map_err(to_conn_err)? {
+            let mut cursor: u64 = 0;
+            while let Ok((next_cursor, keys)) = conn.scan_page(&target, cursor, &pattern).await {
+                if !keys.is_empty() {
+                    if self.cluster {
+                        let _: redis::RedisResult<Vec<i64>> =
+                            self.per_key(&conn, "UNLINK", &keys).await;
+                    } else {
                         let _: redis::RedisResult<()> =
                             redis::cmd("UNLINK").arg(&keys).query_async(&mut conn).await;
                     }
-                    cursor = next_cursor;
-                    if cursor == 0 {
-                        break;
-                    }
                 }
-                Err(_) => break,
+                cursor = next_cursor;
+                if cursor == 0 {
+                    break;
+                }
             }
         }
         Ok(())
@@ -229,10 +737,18 @@ impl Storage for RedisStorage {
             Ok(c) => c,
             Err(_) => return 0,
         };
-        let count: redis::RedisResult<usize> =
-            redis::AsyncCommands::zcard(&mut conn, self.lru_key()).await;
+        let count: redis::RedisResult<usize> = match self.lru_mode {
+            RedisLruMode::Off => self.count_entries(&mut conn).await,
+            _ => join_all(self.lru_keys().into_iter().map(|lru_key| {
+                let mut conn = conn.clone();
+                async move { conn.zcard::<_, usize>(lru_key).await }
+            }))
+            .await
+            .into_iter()
+            .sum(),
+        };
         if count.is_err() {
-            self.clear_conn().await;
+            self.clear_conn();
         }
         count.unwrap_or(0)
     }
@@ -240,18 +756,35 @@ impl Storage for RedisStorage {
     async fn evict_lru(&self, count: usize) -> PyResult<Vec<String>> {
         let mut conn = self.get_conn().await.map_err(to_conn_err)?;
 
-        let items: Vec<(String, f64)> = conn
-            .zpopmin(self.lru_key(), count as isize)
-            .await
-            .unwrap_or_default();
+        // Popped from the global set directly; shard candidates are dropped
+        // from their set together with the entry below.
 
-        let to_evict: Vec<String> = items.into_iter().map(|(k, _)| k).collect();
+        let to_evict: Vec<String> = match self.lru_mode {
+            RedisLruMode::Global => {
+                let items: Vec<(String, f64)> = conn
+                    .zpopmin(format!("{}:_lru", self.prefix), count as isize)
+                    .await
+                    .unwrap_or_default();
+                items.into_iter().map(|(k, _)| k).collect()
+            }
+            RedisLruMode::Sharded => self.oldest_across_shards(&conn, count).await,
+            RedisLruMode::Off => Vec::new(),
+        };
 
         if !to_evict.is_empty() {
-            let full_keys: Vec<String> = to_evict.iter().map(|k| self.full_key(k)).collect();
-            let _: () = redis::pipe()
-                .del(&full_keys)
-                .query_async(&mut conn)
+            to_evict.iter().for_each(|key| self.forget_tracked(key));
+            let sharded = self.lru_mode == RedisLruMode::Sharded;
+            let pipes = self.grouped_pipelines(
+                &to_evict,
+                |k| k.as_str(),
+                |pipe, key| {
+                    pipe.del(self.full_key(key));
+                    if sharded {
+                        self.forget_lru(pipe, key);
+                    }
+                },
+            );
+            self.run_pipelines(&conn, pipes)
                 .await
                 .map_err(to_conn_err)?;
         }
@@ -265,58 +798,57 @@ impl Storage for RedisStorage {
             Ok(c) => c,
             Err(_) => return results,
         };
+        let Ok(targets) = conn.scan_targets().await else {
+            return results;
+        };
 
-        let pattern = format!("{}:{}*", self.prefix, prefix);
-        let mut cursor: u64 = 0;
-
-        loop {
-            let res: Result<(u64, Vec<String>), _> = redis::cmd("SCAN")
-                .arg(cursor)
-                .arg("MATCH")
-                .arg(&pattern)
-                .arg("COUNT")
-                .arg(500)
-                .query_async(&mut conn)
-                .await;
-
-            match res {
-                Ok((next_cursor, keys)) => {
-                    if !keys.is_empty() {
-                        let mut pipe = redis::pipe();
-                        for k in &keys {
-                            pipe.cmd("PTTL").arg(k);
-                        }
+        let pattern = if self.cluster {
+            format!("{}:{{*}}:{}*", self.prefix, prefix)
+        } else {
+            format!("{}:{}*", self.prefix, prefix)
+        };
 
-                        if let Ok(pttls) = pipe.query_async::<Vec<i64>>(&mut conn).await {
-                            for (full_key, pttl) in keys.into_iter().zip(pttls.into_iter()) {
-                                if pttl == -2 {
-                                    continue;
-                                }
-
-                                let original_key = full_key
-                                    .strip_prefix(&format!("{}:", self.prefix))
-                                    .unwrap_or(&full_key)
-                                    .to_string();
-
-                                let expires_at = if pttl > 0 {
-                                    Some(now_secs().saturating_add(pttl as u64 / 1000))
-                                } else {
-                                    None
-                                };
-
-                                results.push((original_key, expires_at));
-                            }
+        for target in targets {
+            let mut cursor: u64 = 0;
+            while let Ok((next_cursor, keys)) = conn.scan_page(&target, cursor, &pattern).await {
+                if !keys.is_empty()
+                    && let Ok(pttls) = self.per_key::<i64>(&conn, "PTTL", &keys).await
+                {
+                    for (full_key, pttl) in keys.iter().zip(pttls) {
+                        if pttl == -2 {
+                            continue;
                         }
+                        let Some(original_key) = self.user_key(full_key) else {
+                            continue;
+                        };
+
+                        let expires_at = if pttl > 0 {
+                            Some(now_secs().saturating_add(pttl as u64 / 1000))
+                        } else {
+                            None
+                        };
+
+                        results.push((original_key.to_string(), expires_at));
                     }
-                    cursor = next_cursor;
-                    if cursor == 0 {
-                        break;
-                    }
                 }
-                Err(_) => break,
+                cursor = next_cursor;
+                if cursor == 0 {
+                    break;
+                }
             }
         }
 
         results
     }
 }
+
+/// Client-side tracking needs RESP3 push messages on the connection.
+fn with_resp3(url: &str) -> String {
+    if url.contains("protocol=") {
+        url.to_string()
+    } else if url.contains('?') {
+        format!("{}&protocol=resp3", url)
+    } else {
+        format!("{}?protocol=resp3", url)
+    }
+}
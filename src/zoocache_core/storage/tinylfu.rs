@@ -0,0 +1,269 @@
+use foldhash::fast::FixedState;
+use lru::LruCache;
+use std::hash::BuildHasher;
+
+/// Which entries `InMemoryStorage::evict_lru` gives up.
+#[derive(Clone, Copy, Debug, Default, PartialEq, Eq)]
+pub(crate) enum EvictionPolicy {
+    /// Oldest `last_accessed` among a random sample.
+    #[default]
+    Lru,
+    /// W-TinyLFU: new keys must out-score the main region's victim on a
+    /// frequency sketch to stay, so one-off scans cannot flush hot keys.
+    TinyLfu,
+}
+
+impl EvictionPolicy {
+    pub fn parse(name: &str) -> Option<Self> {
+        match name {
+            "lru" => Some(Self::Lru),
+            "tinylfu" => Some(Self::TinyLfu),
+            _ => None,
+        }
+    }
+}
+
+const SKETCH_DEPTH: usize = 4;
+const MAX_COUNT: u8 = 15;
+/// Row seeds, one per sketch row (the same odd constants Caffeine uses).
+const SEEDS: [u64; SKETCH_DEPTH] = [
+    0xc3a5_c85c_97cb_3127,
+    0xb492_b66f_be98_f273,
+    0x9ae1_6a3b_2f90_404f,
+    0xcbf2_9ce4_8422_2325,
+];
+
+/// Count-min sketch of 4-bit-range counters. All counters are halved once
+/// `10 * width` increments were recorded, so old popularity fades.
+struct FrequencySketch {
+    table: Vec<u8>,
+    mask: usize,
+    additions: usize,
+    sample_size: usize,
+    hasher: FixedState,
+}
+
+impl FrequencySketch {
+    fn new(capacity: usize) -> Self {
+        let width = capacity.max(16).next_power_of_two();
+        Self {
+            table: vec![0; width * SKETCH_DEPTH],
+            mask: width - 1,
+            additions: 0,
+            sample_size: width.saturating_mul(10),
+            hasher: FixedState::default(),
+        }
+    }
+
+    #[inline]
+    fn slots(&self, key: &str) -> [usize; SKETCH_DEPTH] {
+        let hash = self.hasher.hash_one(key);
+        let width = self.mask + 1;
+        std::array::from_fn(|row| {
+            let h = hash.wrapping_mul(SEEDS[row]);
+            row * width + ((h ^ (h >> 32)) as usize & self.mask)
+        })
+    }
+
+    fn frequency(&self, key: &str) -> u8 {
+        self.slots(key)
+            .iter()
+            .map(|&i| self.table[i])
+            .min()
+            .unwrap_or(0)
+    }
+
+    fn increment(&mut self, key: &str) {
+        let mut added = false;
+        for i in self.slots(key) {
+            if self.table[i] < MAX_COUNT {
+                self.table[i] += 1;
+                added = true;
+            }
+        }
+        if added {
+            self.additions += 1;
+            if self.additions >= self.sample_size {
+                self.table.iter_mut().for_each(|c| *c >>= 1);
+                self.additions /= 2;
+            }
+        }
+    }
+
+    fn clear(&mut self) {
+        self.table.fill(0);
+        self.additions = 0;
+    }
+}
+
+/// W-TinyLFU bookkeeping over the keys of a bounded cache: a small LRU window
+/// (1% of capacity) in front of a segmented LRU main region (20% probation,
+/// 80% protected). The policy does not own entries; the storage reports
+/// inserts, hits and removals and asks for victims when it overflows.
+pub(crate) struct TinyLfu {
+    sketch: FrequencySketch,
+    window: LruCache<String, ()>,
+    probation: LruCache<String, ()>,
+    protected: LruCache<String, ()>,
+    window_cap: usize,
+    main_cap: usize,
+    protected_cap: usize,
+}
+
+impl TinyLfu {
+    pub fn new(capacity: usize) -> Self {
+        let capacity = capacity.max(1);
+        let window_cap = (capacity / 100).max(1);
+        let main_cap = capacity.saturating_sub(window_cap).max(1);
+        Self {
+            sketch: FrequencySketch::new(capacity),
+            window: LruCache::unbounded(),
+            probation: LruCache::unbounded(),
+            protected: LruCache::unbounded(),
+            window_cap,
+            main_cap,
+            protected_cap: main_cap * 4 / 5,
+        }
+    }
+
+    pub fn on_insert(&mut self, key: &str) {
+        if self.touch(key) {
+            return;
+        }
+        self.sketch.increment(key);
+        self.window.put(key.to_string(), ());
+    }
+
+    pub fn on_access(&mut self, key: &str) {
+        self.touch(key);
+    }
+
+    pub fn on_remove(&mut self, key: &str) {
+        if self.window.pop(key).is_none() && self.probation.pop(key).is_none() {
+            self.protected.pop(key);
+        }
+    }
+
+    pub fn clear(&mut self) {
+        self.sketch.clear();
+        self.window.clear();
+        self.probation.clear();
+        self.protected.clear();
+    }
+
+    /// Picks `count` keys to drop. Keys leaving the window enter probation
+    /// while the main region has room; after that each one must out-score
+    /// main's LRU victim on the sketch, and whichever loses is evicted. Once
+    /// the window is back within its share, the newest probation keys duel
+    /// main's victim the same way.
+    pub fn victims(&mut self, count: usize) -> Vec<String> {
+        let mut victims = Vec::with_capacity(count);
+        while victims.len() < count {
+            if self.window.len() > self.window_cap
+                && let Some((candidate, _)) = self.window.pop_lru()
+            {
+                if self.main_len() < self.main_cap {
+                    self.probation.put(candidate, ());
+                } else {
+                    victims.push(self.admit(candidate));
+                }
+                continue;
+            }
+            let candidate = match self.probation.pop_mru() {
+                Some((candidate, _)) => candidate,
+                None => match self.protected.pop_lru().or_else(|| self.window.pop_lru()) {
+                    Some((victim, _)) => {
+                        victims.push(victim);
+                        continue;
+                    }
+                    None => break,
+                },
+            };
+            victims.push(self.admit(candidate));
+        }
+        victims
+    }
+
+    /// Duels `candidate` against main's LRU victim; the winner stays in
+    /// probation and the loser is returned.
+    fn admit(&mut self, candidate: String) -> String {
+        let Some(victim) = self.main_victim() else {
+            return candidate;
+        };
+        if self.sketch.frequency(&candidate) > self.sketch.frequency(&victim) {
+            self.on_remove(&victim);
+            self.probation.put(candidate, ());
+            victim
+        } else {
+            candidate
+        }
+    }
+
+    fn main_len(&self) -> usize {
+        self.probation.len() + self.protected.len()
+    }
+
+    fn main_victim(&self) -> Option<String> {
+        self.probation
+            .peek_lru()
+            .or_else(|| self.protected.peek_lru())
+            .map(|(k, _)| k.clone())
+    }
+
+    /// Records a hit on a tracked key; `false` when the key is unknown.
+    fn touch(&mut self, key: &str) -> bool {
+        if self.window.get(key).is_some() || self.protected.get(key).is_some() {
+            self.sketch.increment(key);
+            return true;
+        }
+        let Some((key, _)) = self.probation.pop_entry(key) else {
+            return false;
+        };
+        self.sketch.increment(&key);
+        self.protected.put(key, ());
+        while self.protected.len() > self.protected_cap {
+            let Some((demoted, _)) = self.protected.pop_lru() else {
+                break;
+            };
+            self.probation.put(demoted, ());
+        }
+        true
+    }
+}
+
+#[cfg(test)]
+mod tests {
+    use super::*;
+
+    #[test]
+    fn frequent_keys_survive_a_scan() {
+        let mut policy = TinyLfu::new(100);
+        for _ in 0..5 {
+            for i in 0..80 {
+                policy.on_insert(&format!("hot:{}", i));
+            }
+        }
+        for i in 0..1000 {
+            policy.on_insert(&format!("scan:{}", i));
+            let overflow = policy.window.len() + policy.main_len();
+            if overflow > 100 {
+                for victim in policy.victims(overflow - 100) {
+                    assert!(victim.starts_with("scan:"), "evicted {}", victim);
+                }
+            }
+        }
+    }
+
+    #[test]
+    fn sketch_counts_saturate_and_age() {
+        let mut sketch = FrequencySketch::new(16);
+        for _ in 0..40 {
+            sketch.increment("k");
+        }
+        assert_eq!(sketch.frequency("k"), MAX_COUNT);
+        for i in 0..sketch.sample_size {
+            sketch.increment(&i.to_string());
+        }
+        assert!(sketch.frequency("k") < MAX_COUNT);
+    }
+}
@@ -0,0 +1,110 @@
+use super::CacheEntry;
+use lru::LruCache;
+use redis::{PushInfo, PushKind, Value};
+use std::num::NonZeroUsize;
+use std::sync::atomic::{AtomicU64, Ordering};
+use std::sync::{Arc, Mutex};
+use tokio::sync::mpsc;
+
+/// Local copies of entries read with Redis client-side tracking
+/// (RESP3 `CLIENT TRACKING ON OPTIN`), keyed by full Redis key.
+///
+/// Redis pushes an invalidation once a tracked key is overwritten, deleted,
+/// expired or evicted, on any node, and the listener drops the copy, so repeat
+/// reads are served without a round trip until the key actually changes.
+pub(crate) struct TrackedReads {
+    entries: Mutex<LruCache<String, (Arc<CacheEntry>, Option<u64>)>>,
+    /// Bumped by every invalidation; a read only keeps its copy when no
+    /// invalidation was processed while it was in flight.
+    generation: AtomicU64,
+}
+
+impl TrackedReads {
+    /// Creates the cache and spawns the task applying pushed invalidations;
+    /// the returned sender goes to every tracked connection.
+    pub fn start(capacity: NonZeroUsize) -> (Arc<Self>, mpsc::UnboundedSender<PushInfo>) {
+        let reads = Arc::new(Self {
+            entries: Mutex::new(LruCache::new(capacity)),
+            generation: AtomicU64::new(0),
+        });
+        let (tx, mut rx) = mpsc::unbounded_channel::<PushInfo>();
+
+        let listener = Arc::clone(&reads);
+        crate::RUNTIME.spawn(async move {
+            while let Some(push) = rx.recv().await {
+                listener.on_push(push);
+            }
+        });
+        (reads, tx)
+    }
+
+    #[inline]
+    pub fn generation(&self) -> u64 {
+        self.generation.load(Ordering::Acquire)
+    }
+
+    /// Returns the held entry itself: every hit shares its Python value.
+    pub fn lookup(&self, full_key: &str, now: u64) -> Option<(Arc<CacheEntry>, Option<u64>)> {
+        let mut entries = self.entries.lock().unwrap();
+        let (entry, expires_at) = entries.get(full_key)?;
+        if expires_at.is_some_and(|exp| now > exp) {
+            entries.pop(full_key);
+            return None;
+        }
+        Some((Arc::clone(entry), *expires_at))
+    }
+
+    /// Stored expiry of the local copy of `full_key`, if there is one; does
+    /// not count as a use.
+    pub fn expires_at(&self, full_key: &str) -> Option<Option<u64>> {
+        let entries = self.entries.lock().unwrap();
+        entries.peek(full_key).map(|(_, expires_at)| *expires_at)
+    }
+
+    /// Keeps a copy read while the generation was `generation`.
+    pub fn insert(
+        &self,
+        full_key: String,
+        generation: u64,
+        entry: Arc<CacheEntry>,
+        expires_at: Option<u64>,
+    ) {
+        let mut entries = self.entries.lock().unwrap();
+        if self.generation() == generation {
+            entry.handles.retain();
+            entries.put(full_key, (entry, expires_at));
+        }
+    }
+
+    pub fn forget(&self, full_key: &str) {
+        self.generation.fetch_add(1, Ordering::AcqRel);
+        self.entries.lock().unwrap().pop(full_key);
+    }
+
+    /// Drops every copy, e.g. when the connection holding the tracking
+    /// registrations is gone.
+    pub fn flush(&self) {
+        self.generation.fetch_add(1, Ordering::AcqRel);
+        self.entries.lock().unwrap().clear();
+    }
+
+    fn on_push(&self, push: PushInfo) {
+        match push.kind {
+            PushKind::Invalidate => match push.data.first() {
+                Some(Value::Array(keys)) => {
+                    self.generation.fetch_add(1, Ordering::AcqRel);
+                    let mut entries = self.entries.lock().unwrap();
+                    for key in keys {
+                        if let Value::BulkString(bytes) = key {
+                            entries.pop(String::from_utf8_lossy(bytes).as_ref());
+                        }
+                    }
+                }
+                // A nil key list means FLUSHALL / FLUSHDB.
+                _ => self.flush(),
+            },
+            PushKind::Disconnection => self.flush(),
+            _ => {}
+        }
+    }
+}
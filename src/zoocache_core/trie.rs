@@ -2,17 +2,192 @@ use crate::utils::{FastDashMap as DashMap, now_nanos, now_secs};
 use foldhash::HashMap;
 use serde::{Deserialize, Serialize};
 use smallvec::SmallVec;
-use std::sync::Arc;
-use std::sync::atomic::{AtomicU64, Ordering};
+use std::sync::atomic::{AtomicBool, AtomicU64, Ordering};
+use std::sync::{Arc, RwLock, Weak};
+
+/// Number of hashed top-level-segment version counters. Entries record which
+/// of them their dependencies fall under, so an invalidation elsewhere in the
+/// tag space leaves their O(1) fast path intact.
+const ROOT_SHARDS: usize = 64;
+
+/// Stamps keep a random per-process epoch above this bit. Counters restart
+/// at zero in every process, so a stamp read back from shared storage is
+/// only comparable with local counters when its epoch is ours.
+const EPOCH_SHIFT: u32 = 40;
+
+/// Compact child lists are scanned linearly up to this size, then promoted to
+/// a hash map (and demoted again by pruning once they shrink to half of it).
+const COMPACT_PROMOTE_AT: usize = 16;
+
+/// How trie nodes store their children.
+///
+/// `Sharded` gives every node its own `DashMap`, which keeps writers on
+/// different children of a hot parent apart at the cost of a full shard array
+/// per node. `Compact` keeps a small inline vector behind one `RwLock` and
+/// shares interned segment strings, which is far smaller for high-cardinality
+/// tags such as `tenant:X:user:Y` where most nodes have zero or one child.
+#[derive(Clone, Copy, Debug, Default, PartialEq, Eq)]
+pub(crate) enum TrieLayout {
+    #[default]
+    Sharded,
+    Compact,
+}
+
+impl TrieLayout {
+    pub fn parse(name: &str) -> Option<Self> {
+        match name {
+            "sharded" => Some(Self::Sharded),
+            "compact" => Some(Self::Compact),
+            _ => None,
+        }
+    }
+}
+
+enum ChildList {
+    Inline(SmallVec<[(Arc<str>, Arc<TrieNode>); 4]>),
+    Map(HashMap<Arc<str>, Arc<TrieNode>>),
+}
+
+impl ChildList {
+    fn get(&self, part: &str) -> Option<&Arc<TrieNode>> {
+        match self {
+            Self::Inline(list) => list.iter().find(|(k, _)| &**k == part).map(|(_, n)| n),
+            Self::Map(map) => map.get(part),
+        }
+    }
+
+    fn insert(&mut self, key: Arc<str>, node: Arc<TrieNode>) {
+        match self {
+            Self::Inline(list) if list.len() < COMPACT_PROMOTE_AT => list.push((key, node)),
+            Self::Inline(list) => {
+                let mut map: HashMap<_, _> = list.drain(..).collect();
+                map.insert(key, node);
+                *self = Self::Map(map);
+            }
+            Self::Map(map) => {
+                map.insert(key, node);
+            }
+        }
+    }
+
+    fn retain(&mut self, mut keep: impl FnMut(&Arc<TrieNode>) -> bool) {
+        match self {
+            Self::Inline(list) => list.retain(|(_, n)| keep(n)),
+            Self::Map(map) => {
+                map.retain(|_, n| keep(n));
+                if map.len() <= COMPACT_PROMOTE_AT / 2 {
+                    *self = Self::Inline(map.drain().collect());
+                }
+            }
+        }
+    }
+
+    fn len(&self) -> usize {
+        match self {
+            Self::Inline(list) => list.len(),
+            Self::Map(map) => map.len(),
+        }
+    }
+}
+
+enum Children {
+    Sharded(DashMap<String, Arc<TrieNode>>),
+    Compact(RwLock<ChildList>),
+}
+
+impl Children {
+    fn new(layout: TrieLayout) -> Self {
+        match layout {
+            TrieLayout::Sharded => Self::Sharded(DashMap::default()),
+            TrieLayout::Compact => Self::Compact(RwLock::new(ChildList::Inline(SmallVec::new()))),
+        }
+    }
+
+    #[inline]
+    fn get(&self, part: &str) -> Option<Arc<TrieNode>> {
+        match self {
+            Self::Sharded(map) => map.get(part).map(|n| Arc::clone(n.value())),
+            Self::Compact(list) => list.read().unwrap().get(part).cloned(),
+        }
+    }
+
+    fn get_or_insert(
+        &self,
+        part: &str,
+        intern: impl FnOnce() -> Arc<str>,
+        layout: TrieLayout,
+    ) -> Arc<TrieNode> {
+        if let Some(node) = self.get(part) {
+            return node;
+        }
+        match self {
+            Self::Sharded(map) => Arc::clone(
+                map.entry(part.to_string())
+                    .or_insert_with(|| Arc::new(TrieNode::new(layout)))
+                    .value(),
+            ),
+            Self::Compact(list) => {
+                let mut list = list.write().unwrap();
+                if let Some(node) = list.get(part) {
+                    return Arc::clone(node);
+                }
+                let node = Arc::new(TrieNode::new(layout));
+                list.insert(intern(), Arc::clone(&node));
+                node
+            }
+        }
+    }
+
+    fn retain(&self, mut keep: impl FnMut(&Arc<TrieNode>) -> bool) {
+        match self {
+            Self::Sharded(map) => map.retain(|_, n| keep(n)),
+            Self::Compact(list) => list.write().unwrap().retain(keep),
+        }
+    }
+
+    fn clear(&self) {
+        match self {
+            Self::Sharded(map) => map.clear(),
+            Self::Compact(list) => *list.write().unwrap() = ChildList::Inline(SmallVec::new()),
+        }
+    }
+
+    fn len(&self) -> usize {
+        match self {
+            Self::Sharded(map) => map.len(),
+            Self::Compact(list) => list.read().unwrap().len(),
+        }
+    }
+
+    fn is_empty(&self) -> bool {
+        self.len() == 0
+    }
+
+    #[cfg(test)]
+    fn contains_key(&self, part: &str) -> bool {
+        self.get(part).is_some()
+    }
+}
 
-#[derive(Default)]
 pub(crate) struct TrieNode {
     version: AtomicU64,
     last_accessed: AtomicU64,
-    children: DashMap<String, Arc<TrieNode>>,
+    /// Set once the node is unlinked by prune/clear, so outstanding
+    /// `DepHandles` stop trusting it.
+    detached: AtomicBool,
+    children: Children,
 }
 
 impl TrieNode {
+    fn new(layout: TrieLayout) -> Self {
+        Self {
+            version: AtomicU64::new(0),
+            last_accessed: AtomicU64::new(0),
+            detached: AtomicBool::new(false),
+            children: Children::new(layout),
+        }
+    }
+
     fn touch(&self, now: u64) {
         self.last_accessed.store(now, Ordering::Relaxed);
     }
@@ -22,21 +197,67 @@ impl TrieNode {
 pub(crate) struct PrefixTrie {
     root: Arc<TrieNode>,
     global_version: Arc<AtomicU64>,
+    /// Global sequence number of the latest invalidation per root shard.
+    root_versions: Arc<[AtomicU64; ROOT_SHARDS]>,
     min_pruned_version: Arc<AtomicU64>,
+    layout: TrieLayout,
+    /// Segment strings shared by every compact node (unused when sharded).
+    segments: Arc<DashMap<Arc<str>, ()>>,
 }
 
 impl PrefixTrie {
+    #[cfg(test)]
     pub fn new() -> Self {
+        Self::with_layout(TrieLayout::default())
+    }
+
+    pub fn with_layout(layout: TrieLayout) -> Self {
+        let epoch = rand::random_range(1..1u64 << (64 - EPOCH_SHIFT)) << EPOCH_SHIFT;
         Self {
-            root: Arc::new(TrieNode::default()),
-            global_version: Arc::new(AtomicU64::new(0)),
+            root: Arc::new(TrieNode::new(layout)),
+            global_version: Arc::new(AtomicU64::new(epoch)),
+            root_versions: Arc::new(std::array::from_fn(|_| AtomicU64::new(epoch))),
             min_pruned_version: Arc::new(AtomicU64::new(0)),
+            layout,
+            segments: Arc::new(DashMap::default()),
         }
     }
 
+    // Node versions move before the global counter, so an entry stamped with
+    // global version G has snapshotted every invalidation numbered <= G.
     #[inline]
     pub fn invalidate(&self, tag: &str) -> u64 {
-        self.global_version.fetch_add(1, Ordering::SeqCst);
+        let version = self.bump_node(tag);
+        self.bump_global(&[tag]);
+        version
+    }
+
+    /// Invalidates every tag, moving the global counter once for the batch.
+    pub fn invalidate_many<S: AsRef<str>>(&self, tags: &[S]) -> Vec<u64> {
+        let versions = tags
+            .iter()
+            .map(|tag| self.bump_node(tag.as_ref()))
+            .collect();
+        self.bump_global(tags);
+        versions
+    }
+
+    #[cfg(test)]
+    pub fn set_min_version(&self, tag: &str, version: u64) {
+        self.set_min_versions(&[(tag, version)]);
+    }
+
+    pub fn set_min_versions(&self, items: &[(&str, u64)]) {
+        let now_s = now_secs();
+        for (tag, version) in items {
+            let current = self.traverse_and_touch(tag, now_s);
+            current.version.fetch_max(*version, Ordering::SeqCst);
+        }
+        let tags: SmallVec<[&str; 8]> = items.iter().map(|(tag, _)| *tag).collect();
+        self.bump_global(&tags);
+    }
+
+    fn bump_node(&self, tag: &str) -> u64 {
         let now_s = now_secs();
         let current = self.traverse_and_touch(tag, now_s);
 
@@ -53,12 +274,44 @@ impl PrefixTrie {
         prev.max(now_n).max(prev + 1)
     }
 
+    fn bump_global<S: AsRef<str>>(&self, tags: &[S]) {
+        let seq = self.global_version.fetch_add(1, Ordering::SeqCst) + 1;
+        for tag in tags {
+            match tag.as_ref().split(':').find(|s| !s.is_empty()) {
+                Some(root) => {
+                    self.root_versions[root_shard(root)].fetch_max(seq, Ordering::SeqCst);
+                }
+                None => {
+                    for shard in self.root_versions.iter() {
+                        shard.fetch_max(seq, Ordering::SeqCst);
+                    }
+                }
+            }
+        }
+    }
+
+    /// O(1)-per-shard fast path: `true` when no invalidation under the root
+    /// shards in `roots` happened after the entry was stamped with `stamp`.
+    /// Stamps from another process (or an earlier run) never pass, so their
+    /// entries are validated against their dependency snapshots.
     #[inline]
-    pub fn set_min_version(&self, tag: &str, version: u64) {
-        self.global_version.fetch_add(1, Ordering::SeqCst);
-        let now_s = now_secs();
-        let current = self.traverse_and_touch(tag, now_s);
-        current.version.fetch_max(version, Ordering::SeqCst);
+    pub fn unchanged_since(&self, stamp: u64, roots: u64) -> bool {
+        let current = self.get_global_version();
+        if stamp == current {
+            return true;
+        }
+        if !same_epoch(stamp, current) {
+            return false;
+        }
+        let mut bits = roots;
+        while bits != 0 {
+            let shard = bits.trailing_zeros() as usize;
+            if self.root_versions[shard].load(Ordering::SeqCst) > stamp {
+                return false;
+            }
+            bits &= bits - 1;
+        }
+        true
     }
 
     pub fn get_path_versions<S: AsRef<str>>(&self, parts: &[S], now: u64) -> SmallVec<[u64; 8]> {
@@ -69,7 +322,7 @@ impl PrefixTrie {
 
         for part in parts {
             let next = match current.children.get(part.as_ref()) {
-                Some(n) => Arc::clone(n.value()),
+                Some(n) => n,
                 None => break,
             };
             current = next;
@@ -103,7 +356,7 @@ impl PrefixTrie {
         for (i, part) in parts.iter().enumerate() {
             let next_node = if !create && is_valid {
                 match current.children.get(part.as_ref()) {
-                    Some(n) => Arc::clone(n.value()),
+                    Some(n) => n,
                     None => {
                         let min_p = self.min_pruned_version.load(Ordering::SeqCst);
                         for v in &snapshot_versions[i + 1..] {
@@ -142,8 +395,22 @@ impl PrefixTrie {
         self.global_version.load(Ordering::SeqCst)
     }
 
+    /// Whether an entry stamped `stamp` that passed full validation should be
+    /// re-stamped with the current version. Only older stamps of this process
+    /// are: re-stamping foreign ones would make processes sharing storage
+    /// rewrite each other's entries on every read.
+    #[inline]
+    pub fn needs_restamp(&self, stamp: u64) -> bool {
+        let current = self.get_global_version();
+        stamp < current && same_epoch(stamp, current)
+    }
+
     pub fn clear(&self) {
-        self.root.children.clear();
+        self.root.children.retain(|node| {
+            node.detached.store(true, Ordering::SeqCst);
+            false
+        });
+        self.segments.clear();
         self.root.version.store(0, Ordering::SeqCst);
         self.global_version.fetch_add(1, Ordering::SeqCst);
         self.root.touch(now_secs());
@@ -151,16 +418,18 @@ impl PrefixTrie {
 
     pub fn prune(&self, max_age_secs: u64) {
         let now = now_secs();
-        self.root.children.retain(|_, node| {
-            !Self::should_prune(node, now, max_age_secs, &self.min_pruned_version)
-        });
+        self.root
+            .children
+            .retain(|node| !Self::should_prune(node, now, max_age_secs, &self.min_pruned_version));
+        self.segments
+            .retain(|segment, _| Arc::strong_count(segment) > 1);
     }
 
     #[cfg(test)]
     pub fn force_prune_all(&self) {
         self.root
             .children
-            .retain(|_, node| !Self::should_prune(node, u64::MAX, 0, &self.min_pruned_version));
+            .retain(|node| !Self::should_prune(node, u64::MAX, 0, &self.min_pruned_version));
     }
 
     fn should_prune(
@@ -170,7 +439,7 @@ impl PrefixTrie {
         min_pruned: &AtomicU64,
     ) -> bool {
         node.children
-            .retain(|_, child| !Self::should_prune(child, now, max_age_secs, min_pruned));
+            .retain(|child| !Self::should_prune(child, now, max_age_secs, min_pruned));
 
         let last = node.last_accessed.load(Ordering::Relaxed);
         let age = now.saturating_sub(last);
@@ -180,12 +449,37 @@ impl PrefixTrie {
             if version > 0 {
                 min_pruned.fetch_max(version, Ordering::SeqCst);
             }
+            node.detached.store(true, Ordering::SeqCst);
             true
         } else {
             false
         }
     }
 
+    /// Collects handles to every node on the dependency paths, paired with the
+    /// snapshot version each must not exceed. `None` if a path is incomplete.
+    fn resolve_handles(&self, deps: &HashMap<String, DepSnapshot>) -> Option<Vec<NodeHandle>> {
+        let root_snapshot = deps.values().map(|s| s.path_versions[0]).min()?;
+        let mut handles =
+            Vec::with_capacity(1 + deps.values().map(|s| s.parts.len()).sum::<usize>());
+        handles.push(NodeHandle {
+            node: Arc::downgrade(&self.root),
+            snapshot: root_snapshot,
+        });
+
+        for snapshot in deps.values() {
+            let mut current = Arc::clone(&self.root);
+            for (part, version) in snapshot.parts.iter().zip(&snapshot.path_versions[1..]) {
+                current = current.children.get(part)?;
+                handles.push(NodeHandle {
+                    node: Arc::downgrade(&current),
+                    snapshot: *version,
+                });
+            }
+        }
+        Some(handles)
+    }
+
     #[inline]
     fn traverse_and_touch(&self, tag: &str, now: u64) -> Arc<TrieNode> {
         let mut current = Arc::clone(&self.root);
@@ -201,16 +495,60 @@ impl PrefixTrie {
     }
 
     fn get_or_create_child(&self, parent: &Arc<TrieNode>, part: &str) -> Arc<TrieNode> {
-        if let Some(n) = parent.children.get(part) {
-            Arc::clone(n.value())
-        } else {
-            let entry = parent
-                .children
-                .entry(part.to_string())
-                .or_insert_with(|| Arc::new(TrieNode::default()));
-            Arc::clone(entry.value())
+        parent
+            .children
+            .get_or_insert(part, || self.intern(part), self.layout)
+    }
+
+    fn intern(&self, part: &str) -> Arc<str> {
+        if let Some(segment) = self.segments.get(part) {
+            return Arc::clone(segment.key());
+        }
+        Arc::clone(self.segments.entry(Arc::from(part)).or_insert(()).key())
+    }
+}
+
+/// Sorts and dedupes `tags`, dropping any tag already covered by a prefix tag
+/// in the same batch (invalidating `user` also invalidates `user:1`).
+pub(crate) fn collapse_covered(mut tags: Vec<String>) -> Vec<String> {
+    fn segments(tag: &str) -> SmallVec<[&str; 8]> {
+        tag.split(':').filter(|s| !s.is_empty()).collect()
+    }
+
+    tags.sort_by(|a, b| segments(a).cmp(&segments(b)));
+    let mut kept: Vec<String> = Vec::with_capacity(tags.len());
+    for tag in tags {
+        if let Some(last) = kept.last()
+            && segments(&tag).starts_with(&segments(last))
+        {
+            continue;
+        }
+        kept.push(tag);
+    }
+    kept
+}
+
+#[inline]
+fn same_epoch(a: u64, b: u64) -> bool {
+    a >> EPOCH_SHIFT == b >> EPOCH_SHIFT
+}
+
+#[inline]
+fn root_shard(segment: &str) -> usize {
+    (xxhash_rust::xxh3::xxh3_64(segment.as_bytes()) as usize) % ROOT_SHARDS
+}
+
+/// Bit set of the root shards `deps` live under (all of them for a root-level
+/// dependency).
+pub(crate) fn root_mask(deps: &HashMap<String, DepSnapshot>) -> u64 {
+    let mut mask = 0u64;
+    for snapshot in deps.values() {
+        match snapshot.parts.first() {
+            Some(root) => mask |= 1 << root_shard(root),
+            None => return u64::MAX,
         }
     }
+    mask
 }
 
 #[derive(Serialize, Deserialize, Clone)]
@@ -219,6 +557,77 @@ pub(crate) struct DepSnapshot {
     pub path_versions: SmallVec<[u64; 8]>,
 }
 
+struct NodeHandle {
+    node: Weak<TrieNode>,
+    snapshot: u64,
+}
+
+/// Pre-resolved trie nodes for one cache entry's dependencies. Validation
+/// becomes a flat scan of their versions instead of a walk from the root per
+/// dependency; a pruned node sends it back to the walk, which re-resolves.
+/// Only entries marked `retain`ed are resolved: one decoded for a single read
+/// would pay for a second walk it never uses.
+#[derive(Default)]
+pub(crate) struct DepHandles {
+    resolved: RwLock<Option<Vec<NodeHandle>>>,
+    retained: AtomicBool,
+}
+
+impl DepHandles {
+    /// `Some(valid)` when every handle is still linked into the trie.
+    #[inline]
+    fn check(&self, now: u64) -> Option<bool> {
+        let resolved = self.resolved.read().unwrap();
+        for handle in resolved.as_ref()? {
+            let node = handle.node.upgrade()?;
+            if node.detached.load(Ordering::SeqCst) {
+                return None;
+            }
+            node.touch(now);
+            if node.version.load(Ordering::SeqCst) > handle.snapshot {
+                return Some(false);
+            }
+        }
+        Some(true)
+    }
+
+    /// Marks the entry as held across reads (in-memory storage, near cache,
+    /// tracked Redis reads), so the next successful walk resolves handles.
+    #[inline]
+    pub fn retain(&self) {
+        self.retained.store(true, Ordering::Relaxed);
+    }
+
+    fn resolve(&self, trie: &PrefixTrie, deps: &HashMap<String, DepSnapshot>) {
+        if let Some(handles) = trie.resolve_handles(deps) {
+            *self.resolved.write().unwrap() = Some(handles);
+        }
+    }
+}
+
+/// Same answer as `validate_dependencies`, served from `handles` when they are
+/// resolved and still attached. A retained entry resolves them after a
+/// successful walk.
+#[inline]
+pub(crate) fn validate_with_handles(
+    trie: &PrefixTrie,
+    deps: &HashMap<String, DepSnapshot>,
+    handles: &DepHandles,
+    now: u64,
+) -> bool {
+    if deps.is_empty() {
+        return true;
+    }
+    if let Some(valid) = handles.check(now) {
+        return valid;
+    }
+    let valid = validate_dependencies(trie, deps, now);
+    if valid && handles.retained.load(Ordering::Relaxed) {
+        handles.resolve(trie, deps);
+    }
+    valid
+}
+
 #[inline]
 pub(crate) fn validate_dependencies(
     trie: &PrefixTrie,
@@ -236,6 +645,34 @@ pub(crate) fn validate_dependencies(
     true
 }
 
+/// Returns the version (HLC nanos) of the newest invalidation that broke `deps`,
+/// or `None` while they are still valid. Dependencies lost to pruning report 0,
+/// i.e. "invalidated too long ago to tell".
+pub(crate) fn invalidated_at(
+    trie: &PrefixTrie,
+    deps: &HashMap<String, DepSnapshot>,
+    handles: &DepHandles,
+    now: u64,
+) -> Option<u64> {
+    if validate_with_handles(trie, deps, handles, now) {
+        return None;
+    }
+    let newest = deps
+        .values()
+        .flat_map(|snapshot| {
+            let current = trie.get_path_versions(&snapshot.parts, now);
+            current
+                .into_iter()
+                .zip(snapshot.path_versions.iter().copied())
+                .filter(|(cur, snap)| cur > snap)
+                .map(|(cur, _)| cur)
+                .collect::<SmallVec<[u64; 8]>>()
+        })
+        .max()
+        .unwrap_or(0);
+    Some(newest)
+}
+
 #[inline]
 pub(crate) fn build_dependency_snapshots(
     trie: &PrefixTrie,
@@ -374,6 +811,154 @@ mod tests {
         assert!(!validate_dependencies(&trie, &deps, now));
     }
 
+    #[test]
+    fn test_invalidated_at() {
+        let trie = PrefixTrie::new();
+        let deps = build_dependency_snapshots(&trie, vec!["user:1".to_string()], 0);
+        let handles = DepHandles::default();
+        assert_eq!(invalidated_at(&trie, &deps, &handles, 0), None);
+
+        let ver = trie.invalidate("user");
+        assert_eq!(invalidated_at(&trie, &deps, &handles, 0), Some(ver));
+    }
+
+    #[test]
+    fn test_handles_track_invalidation() {
+        let trie = PrefixTrie::new();
+        let now = now_secs();
+        let deps = build_dependency_snapshots(
+            &trie,
+            vec!["org:1:user:5".to_string(), "org:2".to_string()],
+            now,
+        );
+        let handles = DepHandles::default();
+        handles.retain();
+
+        assert_eq!(handles.check(now), None);
+        assert!(validate_with_handles(&trie, &deps, &handles, now));
+        assert_eq!(handles.check(now), Some(true));
+
+        trie.invalidate("org:1");
+        assert_eq!(handles.check(now), Some(false));
+        assert!(!validate_with_handles(&trie, &deps, &handles, now));
+    }
+
+    #[test]
+    fn test_unretained_handles_stay_unresolved() {
+        let trie = PrefixTrie::new();
+        let now = now_secs();
+        let deps = build_dependency_snapshots(&trie, vec!["user:1".to_string()], now);
+        let handles = DepHandles::default();
+
+        assert!(validate_with_handles(&trie, &deps, &handles, now));
+        assert_eq!(handles.check(now), None);
+    }
+
+    #[test]
+    fn test_handles_fall_back_after_prune() {
+        let trie = PrefixTrie::new();
+        let now = now_secs();
+        let deps = build_dependency_snapshots(&trie, vec!["user:1".to_string()], now);
+        let handles = DepHandles::default();
+        handles.retain();
+        assert!(validate_with_handles(&trie, &deps, &handles, now));
+
+        trie.force_prune_all();
+        assert_eq!(handles.check(now), None);
+        assert!(validate_with_handles(&trie, &deps, &handles, now));
+        assert_eq!(handles.check(now), Some(true));
+
+        trie.clear();
+        assert_eq!(handles.check(now), None);
+    }
+
+    #[test]
+    fn test_unchanged_since_ignores_other_roots() {
+        let trie = PrefixTrie::new();
+        let now = now_secs();
+        let stamp = trie.get_global_version();
+        let deps = build_dependency_snapshots(&trie, vec!["tenant:a:user:1".to_string()], now);
+        let roots = root_mask(&deps);
+        assert_eq!(roots.count_ones(), 1);
+
+        let other = (0..)
+            .map(|i| format!("other{}", i))
+            .find(|tag| root_shard(tag) != root_shard("tenant"))
+            .unwrap();
+        trie.invalidate(&other);
+        assert_ne!(stamp, trie.get_global_version());
+        assert!(trie.unchanged_since(stamp, roots));
+
+        trie.invalidate("tenant:b");
+        assert!(!trie.unchanged_since(stamp, roots));
+        assert!(trie.unchanged_since(trie.get_global_version(), roots));
+    }
+
+    #[test]
+    fn test_foreign_stamps_take_the_slow_path() {
+        let writer = PrefixTrie::new();
+        let reader = PrefixTrie::new();
+        for _ in 0..10 {
+            writer.invalidate("user:2");
+        }
+        let deps = build_dependency_snapshots(&writer, vec!["user:1".to_string()], now_secs());
+        let stamp = writer.get_global_version();
+
+        assert!(!reader.unchanged_since(stamp, root_mask(&deps)));
+        assert!(!reader.needs_restamp(stamp));
+        assert!(!reader.unchanged_since(0, root_mask(&deps)));
+    }
+
+    #[test]
+    fn test_root_level_dependency_spans_every_shard() {
+        let trie = PrefixTrie::new();
+        let deps = build_dependency_snapshots(&trie, vec![String::new()], now_secs());
+        assert_eq!(root_mask(&deps), u64::MAX);
+
+        let stamp = trie.get_global_version();
+        let roots = root_mask(&build_dependency_snapshots(
+            &trie,
+            vec!["user:1".to_string()],
+            now_secs(),
+        ));
+        trie.invalidate("");
+        assert!(!trie.unchanged_since(stamp, roots));
+    }
+
+    #[test]
+    fn test_collapse_covered() {
+        let tags = [
+            "user:1",
+            "org:1:team",
+            "user",
+            "org:1",
+            "user:1",
+            "org:10",
+            "orgs",
+        ]
+        .map(String::from)
+        .to_vec();
+        assert_eq!(
+            collapse_covered(tags),
+            vec!["org:1", "org:10", "orgs", "user"]
+        );
+    }
+
+    #[test]
+    fn test_invalidate_many_bumps_global_once() {
+        let trie = PrefixTrie::new();
+        let now = now_secs();
+        let deps = build_dependency_snapshots(&trie, vec!["user:1".to_string()], now);
+        let before = trie.get_global_version();
+
+        let versions = trie.invalidate_many(&["user:1", "user:2", "org:1"]);
+        assert_eq!(versions.len(), 3);
+        assert!(versions.iter().all(|v| *v > 0));
+        assert_eq!(trie.get_global_version(), before + 1);
+        assert!(!validate_dependencies(&trie, &deps, now));
+        assert_eq!(trie.get_tag_version("org:1"), versions[2]);
+    }
+
     #[test]
     fn test_build_dependency_snapshots() {
         let trie = PrefixTrie::new();
@@ -516,6 +1101,64 @@ mod tests {
         );
     }
 
+    #[test]
+    fn test_compact_layout_invalidation() {
+        let trie = PrefixTrie::with_layout(TrieLayout::Compact);
+        let parts = vec!["org", "1", "user", "1"];
+        let now = now_secs();
+
+        let v0 = trie.get_path_versions(&parts, now);
+        assert!(trie.check_and_catch_up(&parts, &v0, now, false));
+
+        trie.invalidate("org:1");
+        assert!(!trie.check_and_catch_up(&parts, &v0, now, false));
+
+        let v1 = trie.get_path_versions(&parts, now);
+        assert!(trie.check_and_catch_up(&parts, &v1, now, false));
+    }
+
+    #[test]
+    fn test_compact_layout_promotes_and_demotes() {
+        let trie = PrefixTrie::with_layout(TrieLayout::Compact);
+        let many = COMPACT_PROMOTE_AT * 2;
+        for i in 0..many {
+            trie.invalidate(&format!("user:{}", i));
+        }
+
+        let user = trie.root.children.get("user").unwrap();
+        assert_eq!(user.children.len(), many);
+        match &user.children {
+            Children::Compact(list) => assert!(matches!(*list.read().unwrap(), ChildList::Map(_))),
+            Children::Sharded(_) => unreachable!(),
+        }
+        assert!(trie.get_tag_version(&format!("user:{}", many - 1)) > 0);
+
+        user.children.retain(|_| false);
+        match &user.children {
+            Children::Compact(list) => {
+                assert!(matches!(*list.read().unwrap(), ChildList::Inline(_)))
+            }
+            Children::Sharded(_) => unreachable!(),
+        }
+    }
+
+    #[test]
+    fn test_compact_layout_interns_segments() {
+        let trie = PrefixTrie::with_layout(TrieLayout::Compact);
+        trie.invalidate("tenant:a:user:1");
+        trie.invalidate("tenant:b:user:1");
+
+        let tenant = trie.root.children.get("tenant").unwrap();
+        assert_eq!(tenant.children.len(), 2);
+        assert_eq!(trie.segments.len(), 5);
+        drop(tenant);
+
+        trie.force_prune_all();
+        trie.prune(u64::MAX);
+        assert!(trie.root.children.is_empty());
+        assert_eq!(trie.segments.len(), 0);
+    }
+
     #[test]
     fn test_prune_barrier_security() {
         let trie = PrefixTrie::new();
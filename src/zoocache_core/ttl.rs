@@ -0,0 +1,122 @@
+use crate::storage::CacheEntry;
+use crate::utils::now_secs;
+use pyo3::prelude::*;
+
+/// How reads may move an entry's expiry once it is written.
+#[derive(Clone, Copy, Debug, Default, PartialEq, Eq)]
+pub(crate) enum TtlPolicy {
+    /// Every hit pushes expiry to `default_ttl` from now.
+    #[default]
+    Sliding,
+    /// Expiry stays where the write put it.
+    Absolute,
+    /// Sliding, but never past this many seconds after the write.
+    Capped(u64),
+}
+
+impl TtlPolicy {
+    pub fn parse(name: &str, max_lifetime: Option<u64>) -> PyResult<Self> {
+        match (name, max_lifetime) {
+            ("sliding", None) => Ok(Self::Sliding),
+            ("absolute", None) => Ok(Self::Absolute),
+            ("capped", Some(lifetime)) if lifetime > 0 => Ok(Self::Capped(lifetime)),
+            ("capped", _) => Err(PyErr::new::<pyo3::exceptions::PyValueError, _>(
+                "ttl_policy='capped' needs max_lifetime >= 1",
+            )),
+            ("sliding" | "absolute", Some(_)) => {
+                Err(PyErr::new::<pyo3::exceptions::PyValueError, _>(
+                    "max_lifetime only applies to ttl_policy='capped'",
+                ))
+            }
+            _ => Err(PyErr::new::<pyo3::exceptions::PyValueError, _>(format!(
+                "Unknown ttl_policy '{}': expected 'sliding', 'absolute' or 'capped'",
+                name
+            ))),
+        }
+    }
+
+    /// Physical TTL for a write and the `max_expires_at` stored on the entry.
+    /// `window` is the stale-while-revalidate tail already included in `ttl`.
+    /// Absolute entries are capped at the write time itself, so no read
+    /// extends them; capped entries never get a TTL past their lifetime.
+    pub fn apply(&self, now: u64, ttl: Option<u64>, window: u64) -> (Option<u64>, Option<u64>) {
+        match *self {
+            Self::Sliding => (ttl, None),
+            Self::Absolute => (ttl, Some(now)),
+            Self::Capped(lifetime) => {
+                let limit = lifetime.saturating_add(window);
+                (
+                    Some(ttl.map_or(limit, |t| t.min(limit))),
+                    Some(now.saturating_add(limit)),
+                )
+            }
+        }
+    }
+}
+
+/// Spreads `ttl` uniformly over `ttl ± fraction * ttl` so keys written or
+/// read together do not all expire in the same second.
+pub(crate) fn jitter(ttl: u64, fraction: f64) -> u64 {
+    if fraction <= 0.0 || ttl == 0 {
+        return ttl;
+    }
+    let offset = (rand::random::<f64>() * 2.0 - 1.0) * fraction * ttl as f64;
+    ((ttl as f64 + offset).round() as u64).max(1)
+}
+
+/// The TTL a cache hit extends its entry by: `ttl`, jittered, plus the
+/// entry's stale-while-revalidate window, and clipped to its `max_expires_at`.
+#[derive(Clone, Copy, Debug, Default)]
+pub(crate) struct ReadExtension {
+    pub(crate) ttl: Option<u64>,
+    pub(crate) jitter: f64,
+}
+
+impl ReadExtension {
+    /// TTL to hand to `touch`; `None` refreshes recency only.
+    pub fn ttl_for(&self, entry: &CacheEntry) -> Option<u64> {
+        let ttl = jitter(self.ttl?, self.jitter).saturating_add(entry.stale_window);
+        match entry.max_expires_at {
+            None => Some(ttl),
+            Some(cap) => {
+                let left = cap.saturating_sub(now_secs());
+                (left > 0).then(|| ttl.min(left))
+            }
+        }
+    }
+}
+
+#[cfg(test)]
+mod tests {
+    use super::*;
+
+    #[test]
+    fn jitter_stays_within_fraction() {
+        for _ in 0..1000 {
+            let t = jitter(100, 0.1);
+            assert!((90..=110).contains(&t), "{}", t);
+        }
+        assert_eq!(jitter(100, 0.0), 100);
+        assert!(jitter(1, 1.0) >= 1);
+    }
+
+    #[test]
+    fn capped_policy_bounds_the_write_ttl() {
+        assert_eq!(
+            TtlPolicy::Capped(60).apply(1000, Some(300), 0),
+            (Some(60), Some(1060))
+        );
+        assert_eq!(
+            TtlPolicy::Capped(60).apply(1000, None, 5),
+            (Some(65), Some(1065))
+        );
+        assert_eq!(
+            TtlPolicy::Absolute.apply(1000, Some(300), 0),
+            (Some(300), Some(1000))
+        );
+        assert_eq!(
+            TtlPolicy::Sliding.apply(1000, Some(300), 0),
+            (Some(300), None)
+        );
+    }
+}
@@ -1,4 +1,6 @@
 use crate::bus::InvalidateBus;
+use crate::core::EvictionLimits;
+use crate::near_cache::NearCache;
 use crate::storage::{CacheEntry, Storage};
 use crate::trie::PrefixTrie;
 use crossbeam_channel::{self, RecvTimeoutError, Sender};
@@ -6,22 +8,33 @@ use foldhash::HashMap;
 use std::num::NonZeroUsize;
 use std::panic::AssertUnwindSafe;
 use std::sync::Arc;
-use std::sync::atomic::{AtomicU64, Ordering};
+use std::sync::atomic::{AtomicBool, AtomicU64, Ordering};
 use std::thread;
 use std::time::{Duration, Instant};
 
+/// Expired entries removed per write transaction by the expiry sweep.
+const SWEEP_CHUNK: usize = 1000;
+/// Entries removed per `evict_lru` call by background eviction.
+const EVICT_CHUNK: usize = 256;
+
 pub(crate) enum WorkerMsg {
     Touch(String, Option<u64>),
     Prune(u64),
     Delete(String),
     Update(String, Vec<u8>, Option<u64>),
-    UpdateEntry(String, Arc<CacheEntry>, Option<u64>),
+    /// Re-stamped entry, its TTL, and the trie version it was read with.
+    UpdateEntry(String, Arc<CacheEntry>, Option<u64>, u64),
     FlushMetrics(HashMap<String, f64>),
+    /// Storage passed a size limit; trim it back under the low watermark.
+    Evict,
 }
 
 pub(crate) struct TtiState {
     pub(crate) tx: Sender<WorkerMsg>,
     pub(crate) dropped: AtomicU64,
+    /// Set while a `WorkerMsg::Evict` is queued, so a burst of writes sends
+    /// one.
+    pub(crate) eviction_pending: Arc<AtomicBool>,
 }
 
 impl TtiState {
@@ -34,6 +47,19 @@ impl TtiState {
             self.dropped.fetch_add(1, Ordering::Relaxed);
         }
     }
+
+    /// Hands eviction to the worker. Returns `false` when its queue is full,
+    /// in which case the caller evicts inline so storage stays bounded.
+    pub(crate) fn request_eviction(&self) -> bool {
+        if self.eviction_pending.swap(true, Ordering::AcqRel) {
+            return true;
+        }
+        if self.tx.try_send(WorkerMsg::Evict).is_err() {
+            self.eviction_pending.store(false, Ordering::Release);
+            return false;
+        }
+        true
+    }
 }
 
 #[allow(clippy::too_many_arguments)]
@@ -44,9 +70,13 @@ pub(crate) fn spawn_worker(
     node_id: String,
     flights: Arc<crate::utils::FastDashMap<String, Arc<crate::flight::Flight>>>,
     silent_errors: Arc<AtomicU64>,
+    limits: EvictionLimits,
+    near_cache: Option<Arc<NearCache>>,
+    eviction_pending: Arc<AtomicBool>,
     tti_flush_secs: u64,
     auto_prune_secs: Option<u64>,
     auto_prune_interval: Option<u64>,
+    expiry_sweep_interval: u64,
     bus_is_remote: bool,
     lru_update_interval: u64,
     flight_timeout: u64,
@@ -65,6 +95,8 @@ pub(crate) fn spawn_worker(
             let node_id = node_id.clone();
             let flights = Arc::clone(&flights);
             let silent_errors = Arc::clone(&silent_errors);
+            let near_cache = near_cache.clone();
+            let eviction_pending = Arc::clone(&eviction_pending);
             let rx = rx.clone();
 
             let rt = tokio::runtime::Builder::new_current_thread()
@@ -84,6 +116,8 @@ pub(crate) fn spawn_worker(
                     let mut batch = HashMap::<String, Option<u64>>::default();
                     let mut last_flush = Instant::now();
                     let mut last_auto_prune = Instant::now();
+                    let mut last_sweep = Instant::now();
+                    let sweep_interval = Duration::from_secs(expiry_sweep_interval);
                     let flush_duration = Duration::from_secs(tti_flush_secs);
                     let prune_interval = Duration::from_secs(auto_prune_interval.unwrap_or(3600));
                     let prune_age = auto_prune_secs.unwrap_or(3600);
@@ -129,8 +163,10 @@ pub(crate) fn spawn_worker(
                                         log::warn!("Background Prune failed for {}: {}", key, e);
                                     }
                                 }
-                                WorkerMsg::UpdateEntry(key, entry, ttl) => {
-                                    if let Err(e) = storage.set(key.clone(), entry, ttl).await {
+                                WorkerMsg::UpdateEntry(key, entry, ttl, read_version) => {
+                                    if let Err(e) =
+                                        storage.restamp(key.clone(), entry, ttl, read_version).await
+                                    {
                                         silent_errors.fetch_add(1, Ordering::Relaxed);
                                         log::warn!(
                                             "Background UpdateEntry failed for {}: {}",
@@ -150,6 +186,23 @@ pub(crate) fn spawn_worker(
                                         *local_metrics.entry(k).or_insert(0.0) += v;
                                     }
                                 }
+                                WorkerMsg::Evict => {
+                                    eviction_pending.store(false, Ordering::Release);
+                                    let evicted = evict_in_chunks(
+                                        storage.as_ref(),
+                                        limits,
+                                        near_cache.as_deref(),
+                                    )
+                                    .await;
+                                    match evicted {
+                                        Ok(0) => {}
+                                        Ok(_) => trie.prune(0),
+                                        Err(e) => {
+                                            silent_errors.fetch_add(1, Ordering::Relaxed);
+                                            log::warn!("Background eviction failed: {}", e);
+                                        }
+                                    }
+                                }
                             }
                         }
 
@@ -168,6 +221,23 @@ pub(crate) fn spawn_worker(
                             last_auto_prune = now;
                         }
 
+                        if !sweep_interval.is_zero()
+                            && now.duration_since(last_sweep) > sweep_interval
+                        {
+                            loop {
+                                match storage.sweep_expired(SWEEP_CHUNK).await {
+                                    Ok(n) if n == SWEEP_CHUNK => continue,
+                                    Ok(_) => break,
+                                    Err(e) => {
+                                        silent_errors.fetch_add(1, Ordering::Relaxed);
+                                        log::warn!("Background expiry sweep failed: {}", e);
+                                        break;
+                                    }
+                                }
+                            }
+                            last_sweep = now;
+                        }
+
                         if now.duration_since(last_heartbeat) > Duration::from_secs(1) {
                             crate::flight::cleanup_stale_flights(&flights, flight_timeout);
 
@@ -220,3 +290,27 @@ pub(crate) fn spawn_worker(
 
     tx_clone
 }
+
+/// Trims storage from above the high watermark (the configured limit) to the
+/// low one (10% under it), `EVICT_CHUNK` entries per call, so on LMDB every
+/// chunk is its own short write transaction. Returns how many were evicted.
+async fn evict_in_chunks(
+    storage: &dyn Storage,
+    limits: EvictionLimits,
+    near_cache: Option<&NearCache>,
+) -> pyo3::PyResult<usize> {
+    let mut remaining = limits.overflow(storage.len().await, storage.size_bytes());
+    let mut total = 0;
+    while remaining > 0 {
+        let evicted = storage.evict_lru(remaining.min(EVICT_CHUNK)).await?;
+        if evicted.is_empty() {
+            break;
+        }
+        if let Some(near) = near_cache {
+            near.forget(&evicted);
+        }
+        total += evicted.len();
+        remaining = remaining.saturating_sub(evicted.len());
+    }
+    Ok(total)
+}
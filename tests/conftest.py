@@ -1,3 +1,5 @@
+import time
+
 import pytest
 
 import zoocache
@@ -8,3 +10,16 @@ def clear_cache():
     """Clear the Rust cache store and Trie before each test."""
     zoocache.clear()
     yield
+
+
+@pytest.fixture
+def wait_for():
+    """Poll ``predicate`` until it holds or ``timeout`` seconds pass."""
+
+    def wait(predicate, timeout=2.0):
+        deadline = time.monotonic() + timeout
+        while not predicate() and time.monotonic() < deadline:
+            time.sleep(0.01)
+        return predicate()
+
+    return wait
@@ -0,0 +1,49 @@
+from zoocache._zoocache import Core
+
+CLUSTER_URL = "redis+cluster://127.0.0.1:7000,127.0.0.1:7001,127.0.0.1:7002"
+
+
+def make_core(**kwargs):
+    core = Core(storage_url=CLUSTER_URL, prefix="cluster_test", **kwargs)
+    core.clear()
+    return core
+
+
+def test_cluster_round_trip_and_batches():
+    core = make_core()
+
+    core.set("single", {"v": 1}, ["tag:single"], ttl=60)
+    core.set_many([(f"k{i}", i, [f"tag:{i}"], None) for i in range(50)])
+
+    assert core.get("single") == {"v": 1}
+    assert core.get_many([f"k{i}" for i in range(50)]) == list(range(50))
+    assert core.len() == 51
+
+    core.invalidate("tag:3")
+    assert core.get("k3") is None
+    core.clear()
+
+
+def test_cluster_clear_and_scan_fan_out_to_every_master():
+    core = make_core()
+    core.set_many([(f"user:{i}", i, [], None) for i in range(100)])
+
+    assert core.len() == 100
+    core.clear()
+    assert core.len() == 0
+    assert core.get("user:1") is None
+
+
+def test_cluster_evicts_oldest_across_shards():
+    import time
+
+    core = make_core(max_entries=20)
+    for i in range(60):
+        core.set(f"e{i}", i, [])
+
+    deadline = time.monotonic() + 2
+    while core.len() > 20 and time.monotonic() < deadline:
+        time.sleep(0.05)
+
+    assert core.len() <= 20
+    core.clear()
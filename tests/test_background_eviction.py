@@ -0,0 +1,35 @@
+import time
+
+from zoocache._zoocache import Core
+
+
+def wait_for_len(core, limit, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while core.len() > limit and time.monotonic() < deadline:
+        time.sleep(0.05)
+    return core.len()
+
+
+def test_worker_trims_memory_storage_to_low_watermark():
+    core = Core(max_entries=100, background_eviction=True)
+    for i in range(1000):
+        core.set(f"k{i}", i, [f"item:{i}"])
+    assert wait_for_len(core, 90) <= 90
+    assert core.get("k999") == 999
+
+
+def test_worker_trims_lmdb_storage(tmp_path):
+    core = Core(
+        storage_url=f"lmdb://{tmp_path / 'bg'}",
+        max_entries=100,
+        background_eviction=True,
+    )
+    for i in range(1000):
+        core.set(f"k{i}", i, [])
+    assert wait_for_len(core, 100) <= 100
+
+
+def test_set_many_defers_to_worker():
+    core = Core(max_entries=50, background_eviction=True)
+    core.set_many([(f"k{i}", i, [], None) for i in range(500)])
+    assert wait_for_len(core, 50) <= 50
@@ -0,0 +1,184 @@
+import os
+import shutil
+import tempfile
+
+import pytest
+
+from zoocache import (
+    InvalidTag,
+    add_deps,
+    cacheable_many,
+    configure,
+    get_many,
+    get_many_async,
+    invalidate,
+    reset,
+    set as set_cache,
+    set_many,
+    set_many_async,
+)
+
+
+def test_get_many_mixed_hits_and_misses():
+    reset()
+    set_cache("batch:a", {"id": "a"}, deps=["batch:a"])
+    set_cache("batch:c", [1, 2, 3])
+
+    assert get_many(["batch:a", "batch:b", "batch:c"]) == [{"id": "a"}, None, [1, 2, 3]]
+
+
+def test_get_many_respects_invalidation():
+    reset()
+    set_cache("batch:x", "x", deps=["group:1:item:x"])
+    set_cache("batch:y", "y", deps=["group:2:item:y"])
+
+    invalidate("group:1")
+
+    assert get_many(["batch:x", "batch:y"]) == [None, "y"]
+
+
+def test_get_many_empty():
+    reset()
+    assert get_many([]) == []
+
+
+def test_get_many_lmdb():
+    reset()
+    temp_dir = tempfile.mkdtemp()
+    try:
+        configure(storage_url=f"lmdb://{os.path.join(temp_dir, 'batch_db')}")
+        set_cache("lmdb:1", 1, deps=["lmdb:1"])
+        set_cache("lmdb:2", 2, deps=["lmdb:2"])
+
+        assert get_many(["lmdb:1", "lmdb:2", "lmdb:3"]) == [1, 2, None]
+
+        invalidate("lmdb:2")
+        assert get_many(["lmdb:1", "lmdb:2"]) == [1, None]
+    finally:
+        reset()
+        shutil.rmtree(temp_dir, ignore_errors=True)
+
+
+@pytest.mark.asyncio
+async def test_get_many_async():
+    reset()
+    set_cache("async_batch:1", "one")
+
+    assert await get_many_async(["async_batch:1", "async_batch:2"]) == ["one", None]
+
+
+def test_cacheable_many_fills_only_misses():
+    reset()
+    calls = []
+
+    @cacheable_many(namespace="users", deps=lambda user_id: [f"user:{user_id}"])
+    def load_users(user_ids):
+        calls.append(list(user_ids))
+        return {user_id: {"id": user_id} for user_id in user_ids}
+
+    assert load_users([1, 2]) == {1: {"id": 1}, 2: {"id": 2}}
+    assert load_users([1, 2, 3]) == {1: {"id": 1}, 2: {"id": 2}, 3: {"id": 3}}
+    assert calls == [[1, 2], [3]]
+
+    invalidate("user:2")
+    assert load_users([1, 2, 3]) == {1: {"id": 1}, 2: {"id": 2}, 3: {"id": 3}}
+    assert calls == [[1, 2], [3], [2]]
+
+
+def test_cacheable_many_invalidates_items_independently():
+    reset()
+    calls = []
+
+    @cacheable_many(deps=lambda i: [f"indep:{i}"])
+    def load_items(ids):
+        calls.append(list(ids))
+        return {i: i for i in ids}
+
+    load_items([1, 2, 3])
+    invalidate("indep:2")
+    assert load_items([1, 2, 3]) == {1: 1, 2: 2, 3: 3}
+    assert calls == [[1, 2, 3], [2]]
+
+
+def test_cacheable_many_rejects_add_deps():
+    reset()
+
+    @cacheable_many
+    def load_items(ids):
+        for i in ids:
+            add_deps([f"tracked:{i}"])
+        return {i: i for i in ids}
+
+    with pytest.raises(RuntimeError, match=r"add_deps\(\) cannot be used inside a cacheable_many"):
+        load_items([1, 2])
+
+
+def test_cacheable_many_skips_missing_results():
+    reset()
+    calls = []
+
+    @cacheable_many
+    def load_items(ids):
+        calls.append(list(ids))
+        return {i: i * 10 for i in ids if i != 2}
+
+    assert load_items([1, 2]) == {1: 10}
+    assert load_items([1, 2]) == {1: 10}
+    assert calls == [[1, 2], [2]]
+
+
+@pytest.mark.asyncio
+async def test_cacheable_many_async():
+    reset()
+    calls = []
+
+    @cacheable_many(deps=lambda i: [f"async_item:{i}"])
+    async def load_items(ids):
+        calls.append(list(ids))
+        return {i: str(i) for i in ids}
+
+    assert await load_items([1, 2]) == {1: "1", 2: "2"}
+    assert await load_items([2, 1]) == {2: "2", 1: "1"}
+    assert calls == [[1, 2]]
+
+
+def test_set_many_roundtrip():
+    reset()
+    set_many([("bulk:1", 1, ["bulk:1"]), ("bulk:2", {"v": 2}), ("bulk:3", [3], ["bulk:3"], 60)])
+
+    assert get_many(["bulk:1", "bulk:2", "bulk:3"]) == [1, {"v": 2}, [3]]
+
+    invalidate("bulk:1")
+    assert get_many(["bulk:1", "bulk:3"]) == [None, [3]]
+
+
+def test_set_many_rejects_whole_batch_on_invalid_tag():
+    reset()
+    with pytest.raises(InvalidTag):
+        set_many([("bulk:ok", 1, ["fine"]), ("bulk:bad", 2, ["not valid!"])])
+
+    assert get_many(["bulk:ok", "bulk:bad"]) == [None, None]
+
+
+def test_set_many_lmdb_enforces_max_entries():
+    reset()
+    temp_dir = tempfile.mkdtemp()
+    try:
+        configure(storage_url=f"lmdb://{os.path.join(temp_dir, 'bulk_db')}", max_entries=50)
+        set_many([(f"bulk:{i}", i, [f"bulk:{i}"]) for i in range(200)])
+
+        cached = get_many([f"bulk:{i}" for i in range(200)])
+        assert sum(v is not None for v in cached) <= 50
+        assert cached[-1] == 199
+    finally:
+        reset()
+        shutil.rmtree(temp_dir, ignore_errors=True)
+
+
+@pytest.mark.asyncio
+async def test_set_many_async():
+    reset()
+    await set_many_async([("abulk:1", "a", ["abulk:1"]), ("abulk:2", "b")])
+
+    assert await get_many_async(["abulk:1", "abulk:2"]) == ["a", "b"]
+
@@ -0,0 +1,80 @@
+import threading
+import time
+
+from zoocache._zoocache import Core
+
+
+def make_node(**kwargs):
+    return Core(distributed_flights=True, flight_timeout=5, **kwargs)
+
+
+def test_second_node_waits_for_lease_holder():
+    node_a, node_b = make_node(), make_node()
+    key = "lease:wait"
+
+    assert node_a.get_or_entry(key) == (None, True, False)
+
+    result = {}
+
+    def follower():
+        result["value"] = node_b.get_or_entry(key)
+        result["at"] = time.monotonic()
+
+    t = threading.Thread(target=follower)
+    t.start()
+    time.sleep(0.2)
+    assert "value" not in result
+
+    node_a.set(key, "computed", [])
+    released_at = time.monotonic()
+    node_a.finish_flight(key, False)
+    t.join(timeout=5)
+
+    assert result["at"] >= released_at
+    # Separate in-memory stores: node B sees no value and takes over the lease.
+    assert result["value"] == (None, True, False)
+    node_b.finish_flight(key, False)
+
+
+def test_lease_is_released_after_flight():
+    node = make_node()
+    key = "lease:release"
+
+    assert node.get_or_entry(key) == (None, True, False)
+    node.finish_flight(key, True)
+    time.sleep(0.05)
+
+    assert node.get_or_entry(key) == (None, True, False)
+    node.finish_flight(key, False)
+
+
+def test_nodes_without_distributed_flights_do_not_coordinate():
+    node_a, node_b = Core(), Core()
+    key = "lease:off"
+
+    assert node_a.get_or_entry(key) == (None, True, False)
+    assert node_b.get_or_entry(key) == (None, True, False)
+    node_a.finish_flight(key, False)
+    node_b.finish_flight(key, False)
+
+
+def test_redis_lease_serves_value_written_by_holder():
+    redis_url = "redis://127.0.0.1:6379/0"
+    node_a = make_node(storage_url=redis_url)
+    node_b = make_node(storage_url=redis_url)
+    node_a.clear()
+    key = "lease:redis"
+
+    assert node_a.get_or_entry(key) == (None, True, False)
+
+    result = {}
+    t = threading.Thread(target=lambda: result.setdefault("value", node_b.get_or_entry(key)))
+    t.start()
+    time.sleep(0.2)
+    assert "value" not in result
+
+    node_a.set(key, {"v": 1}, [])
+    node_a.finish_flight(key, False)
+    t.join(timeout=5)
+
+    assert result["value"] == ({"v": 1}, False, True)
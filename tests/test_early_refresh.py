@@ -0,0 +1,73 @@
+import asyncio
+import time
+
+import pytest
+
+from zoocache import cacheable, reset
+
+
+def test_early_refresh_serves_cached_value_and_refreshes_before_expiry(wait_for):
+    reset()
+    calls = {"n": 0}
+
+    # A huge beta makes the XFetch draw fire on every read.
+    @cacheable(ttl=60, early_refresh=1e9)
+    def report():
+        calls["n"] += 1
+        time.sleep(0.01)
+        return calls["n"]
+
+    assert report() == 1
+    assert report() == 1
+    assert wait_for(lambda: calls["n"] >= 2)
+
+
+def test_early_refresh_is_inert_without_ttl():
+    reset()
+    calls = {"n": 0}
+
+    @cacheable(early_refresh=1e9)
+    def forever():
+        calls["n"] += 1
+        time.sleep(0.01)
+        return calls["n"]
+
+    assert forever() == 1
+    for _ in range(10):
+        assert forever() == 1
+    time.sleep(0.1)
+    assert calls["n"] == 1
+
+
+def test_small_beta_keeps_fresh_entries():
+    reset()
+    calls = {"n": 0}
+
+    @cacheable(ttl=3600, early_refresh=1.0)
+    def cheap():
+        calls["n"] += 1
+        return calls["n"]
+
+    assert cheap() == 1
+    for _ in range(50):
+        assert cheap() == 1
+    assert calls["n"] == 1
+
+
+@pytest.mark.asyncio
+async def test_async_early_refresh():
+    reset()
+    calls = {"n": 0}
+
+    @cacheable(ttl=60, early_refresh=1e9)
+    async def fetch():
+        calls["n"] += 1
+        return calls["n"]
+
+    assert await fetch() == 1
+    assert await fetch() == 1
+    for _ in range(100):
+        if calls["n"] >= 2:
+            break
+        await asyncio.sleep(0.01)
+    assert calls["n"] >= 2
@@ -0,0 +1,41 @@
+import pytest
+
+from zoocache._zoocache import Core
+
+
+def test_tinylfu_keeps_hot_keys_through_a_scan():
+    core = Core(max_entries=100, eviction_policy="tinylfu")
+    for i in range(50):
+        core.set(f"hot:{i}", i, [])
+    for _ in range(5):
+        for i in range(50):
+            assert core.get(f"hot:{i}") == i
+
+    for i in range(1000):
+        core.set(f"scan:{i}", i, [])
+
+    assert core.len() <= 100
+    kept = sum(core.get(f"hot:{i}") is not None for i in range(50))
+    assert kept >= 45
+
+
+def test_tinylfu_removal_and_clear():
+    core = Core(max_entries=10, eviction_policy="tinylfu")
+    core.set("a", 1, ["tag:a"])
+    core.set("b", 2, ["tag:b"])
+    core.invalidate("tag:a")
+    assert core.get("a") is None
+
+    core.clear()
+    for i in range(30):
+        core.set(f"k{i}", i, [])
+    assert core.len() <= 10
+
+
+def test_tinylfu_requires_in_memory_bounded_storage(tmp_path):
+    with pytest.raises(ValueError, match="needs in-memory storage and max_entries"):
+        Core(eviction_policy="tinylfu")
+    with pytest.raises(ValueError, match="needs in-memory storage and max_entries"):
+        Core(storage_url=f"lmdb://{tmp_path / 'db'}", max_entries=10, eviction_policy="tinylfu")
+    with pytest.raises(ValueError, match="Unsupported eviction_policy"):
+        Core(max_entries=10, eviction_policy="arc")
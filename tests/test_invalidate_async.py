@@ -1,6 +1,6 @@
 import pytest
 
-from zoocache import configure, invalidate, invalidate_async, reset, set as set_cache
+from zoocache import configure, invalidate, invalidate_async, invalidate_many_async, reset, set as set_cache
 
 
 @pytest.mark.asyncio
@@ -66,3 +66,21 @@ def test_invalidate_with_prefix():
 
     assert get_cache("key1") is None
     assert get_cache("key2") == "value2"
+
+
+@pytest.mark.asyncio
+async def test_invalidate_many_async():
+    reset()
+    configure()
+
+    set_cache("key1", "value1", deps=["tag1:a"])
+    set_cache("key2", "value2", deps=["tag2"])
+    set_cache("key3", "value3", deps=["tag3"])
+
+    await invalidate_many_async(["tag1", "tag2"])
+
+    from zoocache import get as get_cache
+
+    assert get_cache("key1") is None
+    assert get_cache("key2") is None
+    assert get_cache("key3") == "value3"
@@ -1,4 +1,9 @@
-from zoocache import add_deps, cacheable, invalidate
+import time
+
+import pytest
+
+from zoocache import InvalidTag, add_deps, cacheable, invalidate, invalidate_many
+from zoocache._zoocache import Core
 
 
 def test_basic_invalidation():
@@ -84,3 +89,94 @@ def test_nested_cacheable_independent():
     parent()
     assert calls["parent"] == 1
     assert calls["child"] == 1
+
+
+def test_invalidate_many():
+    calls = []
+
+    @cacheable(deps=lambda tag: [tag])
+    def load(tag):
+        calls.append(tag)
+        return tag
+
+    tags = ["user:1", "user:2", "org:1:team", "other"]
+    for tag in tags:
+        load(tag)
+    assert len(calls) == 4
+
+    invalidate_many(["user:1", "user:2", "user:1", "org:1"])
+
+    for tag in tags:
+        load(tag)
+    assert calls[4:] == ["user:1", "user:2", "org:1:team"]
+
+
+def test_invalidate_many_validates_before_invalidating():
+    calls = []
+
+    @cacheable(deps=["batch:ok"])
+    def load():
+        calls.append(1)
+        return 1
+
+    load()
+    with pytest.raises(InvalidTag):
+        invalidate_many(["batch:ok", "bad tag"])
+
+    load()
+    assert len(calls) == 1
+
+
+def test_invalidate_many_single_bus_message():
+    import redis
+
+    redis_url = "redis://127.0.0.1:6379/0"
+    node_a = Core(bus_url=redis_url, prefix="batch_bus", node_id="a")
+    node_b = Core(bus_url=redis_url, prefix="batch_bus", node_id="b")
+    listener = redis.Redis.from_url(redis_url).pubsub(ignore_subscribe_messages=True)
+    listener.subscribe("batch_bus:invalidate")
+    time.sleep(0.2)
+
+    node_a.invalidate_many(["tenant:1", "tenant:1:user:5", "tenant:2"])
+
+    messages = []
+    deadline = time.monotonic() + 0.5
+    while time.monotonic() < deadline:
+        msg = listener.get_message(timeout=0.05)
+        if msg is not None:
+            messages.append(msg["data"].decode())
+    listener.close()
+
+    # The covered child tag is collapsed into its parent before publishing.
+    assert len(messages) == 1
+    assert sorted(messages[0].split("\n")) == [
+        f"tenant:1|{node_a.get_tag_version('tenant:1')}",
+        f"tenant:2|{node_a.get_tag_version('tenant:2')}",
+    ]
+
+    deadline = time.monotonic() + 2
+    while time.monotonic() < deadline and node_b.get_tag_version("tenant:2") == 0:
+        time.sleep(0.02)
+
+    assert node_b.get_tag_version("tenant:1") == node_a.get_tag_version("tenant:1")
+    assert node_b.get_tag_version("tenant:2") == node_a.get_tag_version("tenant:2")
+    assert node_b.get_tag_version("tenant:1:user:5") == 0
+
+
+def test_coalesced_bus_keeps_latest_version_per_tag():
+    redis_url = "redis://127.0.0.1:6379/0"
+    node_a = Core(bus_url=redis_url, prefix="coalesce_bus", node_id="a", bus_coalesce_ms=20)
+    node_b = Core(bus_url=redis_url, prefix="coalesce_bus", node_id="b")
+    time.sleep(0.2)
+
+    for _ in range(50):
+        node_a.invalidate("hot:1")
+    node_a.invalidate("hot:2")
+
+    latest = node_a.get_tag_version("hot:1")
+    deadline = time.monotonic() + 2
+    while time.monotonic() < deadline and node_b.get_tag_version("hot:1") < latest:
+        time.sleep(0.02)
+
+    assert node_b.get_tag_version("hot:1") == latest
+    assert node_b.get_tag_version("hot:2") == node_a.get_tag_version("hot:2")
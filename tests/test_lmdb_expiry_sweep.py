@@ -0,0 +1,28 @@
+import time
+
+from zoocache._zoocache import Core
+
+
+def test_expired_entries_are_swept_without_reads(tmp_path):
+    core = Core(storage_url=f"lmdb://{tmp_path / 'sweep'}", expiry_sweep_interval=1)
+    core.set_many([(f"short:{i}", i, [], 1) for i in range(50)])
+    core.set("long", "kept", [], 3600)
+    core.set("forever", "kept", [])
+    assert core.len() == 52
+
+    deadline = time.time() + 10
+    while core.len() > 2 and time.time() < deadline:
+        time.sleep(0.2)
+
+    assert core.len() == 2
+    assert core.get("long") == "kept"
+    assert core.get("forever") == "kept"
+
+
+def test_sweep_can_be_disabled(tmp_path):
+    core = Core(storage_url=f"lmdb://{tmp_path / 'no_sweep'}", expiry_sweep_interval=0)
+    core.set("short", 1, [], 1)
+
+    time.sleep(2.5)
+    assert core.len() == 1
+    assert core.get("short") is None
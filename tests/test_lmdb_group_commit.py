@@ -0,0 +1,75 @@
+import threading
+
+import pytest
+
+from zoocache._zoocache import Core
+
+
+def test_concurrent_writes_are_committed(tmp_path):
+    core = Core(storage_url=f"lmdb://{tmp_path / 'group'}", lmdb_group_commit=64)
+
+    def writer(t):
+        for i in range(100):
+            core.set(f"t{t}:k{i}", {"t": t, "i": i}, [f"writer:{t}"])
+
+    threads = [threading.Thread(target=writer, args=(t,)) for t in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert core.len() == 800
+    assert core.get("t3:k42") == {"t": 3, "i": 42}
+
+    core.set_many([(f"bulk:{i}", i, [], None) for i in range(50)])
+    assert core.len() == 850
+    assert core.get("bulk:49") == 49
+
+
+def test_bad_key_fails_only_its_own_writer(tmp_path):
+    core = Core(storage_url=f"lmdb://{tmp_path / 'group_bad'}", lmdb_group_commit=64)
+    errors = []
+    barrier = threading.Barrier(9)
+
+    def writer(t):
+        barrier.wait()
+        for i in range(50):
+            try:
+                core.set(f"t{t}:k{i}", i, [])
+            except Exception as e:
+                errors.append((t, e))
+
+    def bad_writer():
+        barrier.wait()
+        for _ in range(5):
+            try:
+                core.set("x" * 600, "too long", [])
+            except Exception as e:
+                errors.append(("bad", e))
+
+    threads = [threading.Thread(target=writer, args=(t,)) for t in range(8)]
+    threads.append(threading.Thread(target=bad_writer))
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert [t for t, _ in errors] == ["bad"] * 5
+    assert core.len() == 400
+    assert core.get("t7:k49") == 49
+
+
+def test_removals_go_through_the_writer(tmp_path):
+    core = Core(storage_url=f"lmdb://{tmp_path / 'group_rm'}", lmdb_group_commit=16)
+    core.set("a", 1, ["tag:a"])
+    core.set("b", 2, ["tag:b"])
+
+    core.invalidate("tag:a")
+    assert core.get("a") is None
+    assert core.get("b") == 2
+    assert core.len() == 1
+
+
+def test_group_commit_must_be_positive(tmp_path):
+    with pytest.raises(ValueError, match="lmdb_group_commit must be >= 1"):
+        Core(storage_url=f"lmdb://{tmp_path / 'bad'}", lmdb_group_commit=0)
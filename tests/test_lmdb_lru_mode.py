@@ -0,0 +1,51 @@
+import time
+
+import pytest
+
+from zoocache._zoocache import Core
+
+
+def test_sampled_mode_bounds_entries(tmp_path):
+    core = Core(
+        storage_url=f"lmdb://{tmp_path / 'sampled'}",
+        max_entries=20,
+        lmdb_lru_mode="sampled",
+    )
+    for i in range(100):
+        core.set(f"k{i}", i, [f"item:{i}"])
+        assert core.get(f"k{i}") == i
+
+    assert core.len() <= 20
+    assert core.get("k99") == 99
+
+
+def test_sampled_mode_supports_removal(tmp_path):
+    core = Core(storage_url=f"lmdb://{tmp_path / 'sampled_rm'}", lmdb_lru_mode="sampled")
+    core.set_many([(f"k{i}", i, [f"item:{i}"], None) for i in range(10)])
+
+    core.invalidate("item:3")
+    assert core.get("k3") is None
+    assert core.len() == 9
+
+
+def test_late_touches_leave_no_orphans_for_eviction(tmp_path):
+    core = Core(
+        storage_url=f"lmdb://{tmp_path / 'sampled_orphans'}",
+        max_entries=20,
+        lmdb_lru_mode="sampled",
+        tti_flush_secs=1,
+    )
+    # Touches for these keys are flushed after most of them were evicted.
+    for i in range(200):
+        core.set(f"old{i}", i, [])
+        core.get(f"old{i}")
+    time.sleep(1.5)
+
+    for i in range(200):
+        core.set(f"new{i}", i, [])
+        assert core.len() <= 20
+
+
+def test_unknown_lmdb_lru_mode_is_rejected(tmp_path):
+    with pytest.raises(ValueError, match="Unsupported lmdb_lru_mode"):
+        Core(storage_url=f"lmdb://{tmp_path / 'bad'}", lmdb_lru_mode="clock")
@@ -79,3 +79,23 @@ def test_eviction_with_lmdb():
 
     if os.path.exists(path):
         shutil.rmtree(path)
+
+
+def test_concurrent_writers_respect_max_entries():
+    import threading
+
+    from zoocache._zoocache import Core
+
+    core = Core(max_entries=100)
+
+    def writer(t):
+        for i in range(500):
+            core.set(f"t{t}:k{i}", i, [f"writer:{t}"])
+
+    threads = [threading.Thread(target=writer, args=(t,)) for t in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert core.len() <= 100
@@ -0,0 +1,39 @@
+import os
+
+import pytest
+
+from zoocache._zoocache import Core
+
+# Incompressible, so LMDB stores roughly the full 10 KB per entry.
+PAYLOAD = os.urandom(10_000)
+
+
+def fill(core, n=100):
+    for i in range(n):
+        core.set(f"k{i}", PAYLOAD, [f"item:{i}"])
+
+
+def test_memory_storage_evicts_by_bytes():
+    core = Core(max_bytes=200_000)
+    fill(core)
+    assert 0 < core.len() <= 20
+    assert core.get("k99") == PAYLOAD
+
+
+def test_lmdb_storage_evicts_by_bytes(tmp_path):
+    core = Core(storage_url=f"lmdb://{tmp_path / 'bytes'}", max_bytes=200_000)
+    fill(core)
+    assert 0 < core.len() <= 20
+    assert core.get("k99") == PAYLOAD
+
+
+def test_small_values_stay_under_an_entry_limit_too():
+    core = Core(max_bytes=10_000_000, max_entries=50)
+    for i in range(200):
+        core.set(f"k{i}", i, [])
+    assert core.len() <= 50
+
+
+def test_max_bytes_is_rejected_for_redis():
+    with pytest.raises(ValueError, match="max_bytes is not supported with Redis storage"):
+        Core(storage_url="redis://127.0.0.1:6379/0", max_bytes=1_000_000)
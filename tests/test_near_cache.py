@@ -0,0 +1,134 @@
+import os
+import shutil
+import tempfile
+
+import pytest
+
+from zoocache import cacheable, configure, invalidate, reset
+from zoocache.core import _manager
+
+
+@pytest.fixture
+def lmdb_near_cache():
+    reset()
+    temp_dir = tempfile.mkdtemp()
+    configure(storage_url=f"lmdb://{os.path.join(temp_dir, 'near_db')}", near_cache_size=100)
+    yield
+    reset()
+    shutil.rmtree(temp_dir, ignore_errors=True)
+
+
+def test_near_cache_serves_hits(lmdb_near_cache):
+    calls = {"count": 0}
+
+    @cacheable(deps=["near:1"])
+    def get_value():
+        calls["count"] += 1
+        return {"value": calls["count"]}
+
+    assert get_value() == {"value": 1}
+    assert get_value() == {"value": 1}
+    assert calls["count"] == 1
+
+
+def test_near_cache_respects_invalidation(lmdb_near_cache):
+    calls = {"count": 0}
+
+    @cacheable(deps=["near:2"])
+    def get_value():
+        calls["count"] += 1
+        return calls["count"]
+
+    assert get_value() == 1
+    invalidate("near:2")
+    assert get_value() == 2
+    assert get_value() == 2
+
+
+def test_near_cache_respects_prefix_invalidation(lmdb_near_cache):
+    calls = {"count": 0}
+
+    @cacheable(deps=["org:1:user:1"])
+    def get_value():
+        calls["count"] += 1
+        return calls["count"]
+
+    assert get_value() == 1
+    invalidate("org:1")
+    assert get_value() == 2
+
+
+def test_near_cache_cleared_with_storage(lmdb_near_cache):
+    core = _manager.get_core()
+    core.set("near_key", "value", ["near:3"])
+    assert core.get("near_key") == "value"
+
+    core.clear()
+    assert core.get("near_key") is None
+
+
+def test_near_cache_size_zero_is_rejected():
+    reset()
+    try:
+        configure(storage_url="lmdb://./unused_near_db", near_cache_size=0)
+        with pytest.raises(ValueError, match="near_cache_size must be >= 1"):
+            _manager.get_core()
+    finally:
+        reset()
+
+
+def test_near_cache_hits_share_one_object(tmp_path):
+    from zoocache._zoocache import Core
+
+    with pytest.warns(UserWarning, match="same Python object"):
+        core = Core(storage_url=f"lmdb://{tmp_path / 'near_shared'}", near_cache_size=10)
+    core.set("k", {"items": [1]}, [])
+
+    first = core.get("k")
+    assert core.get("k") is first
+    assert core.get("k") == {"items": [1]}
+
+
+def test_near_cache_disabled_does_not_warn(tmp_path, recwarn):
+    from zoocache._zoocache import Core
+
+    Core(storage_url=f"lmdb://{tmp_path / 'near_off'}")
+    assert not [w for w in recwarn if issubclass(w.category, UserWarning)]
+
+
+def test_near_cache_hits_from_get_many_keep_the_key_recent(tmp_path):
+    import time
+
+    from zoocache._zoocache import Core
+
+    with pytest.warns(UserWarning):
+        core = Core(
+            storage_url=f"lmdb://{tmp_path / 'near_many'}",
+            near_cache_size=100,
+            max_entries=10,
+            tti_flush_secs=1,
+        )
+    core.set("hot", "v", [])
+    for i in range(9):
+        core.set(f"k{i}", i, [])
+
+    assert core.get_many(["hot"]) == ["v"]
+    time.sleep(1.5)
+    for i in range(5):
+        core.set(f"n{i}", i, [])
+
+    assert core.get("hot") == "v"
+
+
+@pytest.mark.asyncio
+async def test_async_reads_are_served_by_the_near_cache(tmp_path):
+    from zoocache._zoocache import Core
+
+    with pytest.warns(UserWarning):
+        core = Core(storage_url=f"lmdb://{tmp_path / 'near_async'}", near_cache_size=10)
+    core.set("k", {"items": [1]}, [])
+
+    first, is_leader, is_hit = await core.get_or_entry_async("k")
+    assert (is_leader, is_hit) == (False, True)
+    assert (await core.get_or_entry_async("k"))[0] is first
+    assert await core.get_async("k") is first
@@ -0,0 +1,61 @@
+import time
+
+import pytest
+
+from zoocache._zoocache import Core
+
+REDIS_URL = "redis://127.0.0.1:6379/0"
+
+
+@pytest.mark.parametrize("mode", ["global", "sharded", "none"])
+def test_lru_modes_round_trip(mode):
+    core = Core(storage_url=REDIS_URL, prefix=f"lru_mode_{mode}", redis_lru_mode=mode)
+    core.clear()
+
+    core.set("a", 1, ["tag:a"])
+    core.set_many([("b", 2, ["tag:b"]), ("c", 3, ["tag:c"])])
+    assert core.get("a") == 1
+    assert core.get_many(["b", "c", "missing"]) == [2, 3, None]
+    assert core.len() == 3
+
+    core.invalidate("tag:a")
+    assert core.get("a") is None
+    core.clear()
+
+
+def test_none_mode_len_ignores_node_heartbeats():
+    import redis
+
+    core = Core(storage_url=REDIS_URL, prefix="lru_mode_hb", redis_lru_mode="none")
+    core.clear()
+    client = redis.Redis.from_url(REDIS_URL)
+    client.set("lru_mode_hb:node:abc123", "{}", ex=5)
+
+    core.set("a", 1, [])
+    assert core.len() == 1
+    client.delete("lru_mode_hb:node:abc123")
+    core.clear()
+
+
+def test_sharded_lru_evicts_oldest_across_shards():
+    core = Core(storage_url=REDIS_URL, prefix="lru_mode_evict", redis_lru_mode="sharded", max_entries=5)
+    core.clear()
+
+    for i in range(10):
+        core.set(f"k{i}", i, [])
+    deadline = time.monotonic() + 2
+    while core.len() > 5 and time.monotonic() < deadline:
+        time.sleep(0.05)
+
+    assert core.len() <= 5
+    core.clear()
+
+
+def test_none_mode_rejects_max_entries():
+    with pytest.raises(ValueError, match="max_entries needs an LRU index"):
+        Core(storage_url=REDIS_URL, redis_lru_mode="none", max_entries=10)
+
+
+def test_unknown_lru_mode_is_rejected():
+    with pytest.raises(ValueError, match="Unsupported redis_lru_mode"):
+        Core(storage_url=REDIS_URL, redis_lru_mode="random")
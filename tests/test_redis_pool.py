@@ -0,0 +1,24 @@
+import asyncio
+
+import pytest
+
+from zoocache._zoocache import Core
+
+REDIS_URL = "redis://127.0.0.1:6379/0"
+
+
+@pytest.mark.asyncio
+async def test_pooled_connections_serve_concurrent_ops():
+    core = Core(storage_url=REDIS_URL, prefix="pool_test", redis_pool_size=4)
+    core.clear()
+
+    await asyncio.gather(*(core.set_async(f"k{i}", i, []) for i in range(64)))
+    values = await asyncio.gather(*(core.get_async(f"k{i}") for i in range(64)))
+
+    assert values == list(range(64))
+    core.clear()
+
+
+def test_pool_size_zero_is_rejected():
+    with pytest.raises(ValueError, match="redis_pool_size must be >= 1"):
+        Core(storage_url=REDIS_URL, redis_pool_size=0)
@@ -0,0 +1,24 @@
+import pytest
+
+from zoocache._zoocache import Core
+
+REDIS_URL = "redis://127.0.0.1:6379/0"
+
+
+@pytest.mark.parametrize("mode", ["script", "plain"])
+def test_read_modes_round_trip(mode):
+    core = Core(storage_url=REDIS_URL, prefix=f"read_mode_{mode}", redis_read_mode=mode)
+    core.clear()
+
+    core.set("k", {"v": 1}, ["tag:1"], ttl=60)
+    assert core.get("k") == {"v": 1}
+    assert core.get("missing") is None
+
+    core.invalidate("tag")
+    assert core.get("k") is None
+    core.clear()
+
+
+def test_unknown_read_mode_is_rejected():
+    with pytest.raises(ValueError, match="Unsupported redis_read_mode"):
+        Core(storage_url=REDIS_URL, redis_read_mode="lua")
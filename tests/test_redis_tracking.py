@@ -0,0 +1,72 @@
+import time
+
+import pytest
+
+from zoocache._zoocache import Core
+
+REDIS_URL = "redis://127.0.0.1:6379/0"
+
+
+def test_tracked_reads_see_overwrites_from_other_nodes(wait_for):
+    tracked = Core(storage_url=REDIS_URL, prefix="tracking", redis_tracking_size=100)
+    other = Core(storage_url=REDIS_URL, prefix="tracking")
+    tracked.clear()
+
+    other.set("k", "v1", [])
+    assert tracked.get("k") == "v1"
+    assert tracked.get("k") == "v1"
+
+    other.set("k", "v2", [])
+    assert wait_for(lambda: tracked.get("k") == "v2")
+
+    other.clear()
+    assert wait_for(lambda: tracked.get("k") is None)
+
+
+def test_tracked_reads_follow_local_writes_and_batches():
+    core = Core(storage_url=REDIS_URL, prefix="tracking_local", redis_tracking_size=100)
+    core.clear()
+
+    core.set("a", 1, ["tag:a"])
+    core.set("b", 2, [])
+    assert core.get("a") == 1
+
+    core.set("a", 10, ["tag:a"])
+    assert core.get("a") == 10
+    assert core.get_many(["a", "b", "missing"]) == [10, 2, None]
+
+    core.invalidate("tag:a")
+    assert core.get("a") is None
+    core.clear()
+
+
+def test_tracked_reads_share_one_object_and_warn():
+    with pytest.warns(UserWarning, match="same Python object"):
+        tracked = Core(storage_url=REDIS_URL, prefix="tracking", redis_tracking_size=100)
+    tracked.clear()
+
+    tracked.set("k", {"items": [1]}, [])
+    first = tracked.get("k")
+    assert tracked.get("k") is first
+    tracked.clear()
+
+
+def test_tracked_key_survives_a_touch_flush():
+    with pytest.warns(UserWarning):
+        tracked = Core(
+            storage_url=REDIS_URL,
+            prefix="tracking",
+            redis_tracking_size=100,
+            default_ttl=600,
+            tti_flush_secs=1,
+        )
+    tracked.clear()
+
+    tracked.set("k", {"items": [1]}, [])
+    first = tracked.get("k")
+    assert tracked.get("k") is first
+    time.sleep(1.5)
+
+    # The flushed read extension did not send EXPIRE, so the copy is still local.
+    assert tracked.get("k") is first
+    tracked.clear()
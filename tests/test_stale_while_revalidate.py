@@ -0,0 +1,163 @@
+import asyncio
+import threading
+import time
+
+import pytest
+
+from zoocache import cacheable, invalidate, reset
+
+
+def test_serves_stale_after_invalidation_and_refreshes_in_background(wait_for):
+    reset()
+    calls = {"n": 0}
+
+    @cacheable(deps=lambda uid: [f"swr:user:{uid}"], stale_while_revalidate=30)
+    def profile(uid):
+        calls["n"] += 1
+        return calls["n"]
+
+    assert profile(1) == 1
+    invalidate("swr:user:1")
+
+    assert profile(1) == 1
+    assert wait_for(lambda: calls["n"] == 2)
+    assert wait_for(lambda: profile(1) == 2)
+
+
+def test_single_background_refresh_for_concurrent_stale_reads(wait_for):
+    reset()
+    calls = {"n": 0}
+    release = threading.Event()
+
+    @cacheable(deps=["swr:hot"], stale_while_revalidate=30)
+    def hot():
+        calls["n"] += 1
+        if calls["n"] > 1:
+            release.wait(2)
+        return calls["n"]
+
+    assert hot() == 1
+    invalidate("swr:hot")
+
+    assert [hot() for _ in range(20)] == [1] * 20
+    release.set()
+    assert wait_for(lambda: hot() == 2)
+    assert calls["n"] == 2
+
+
+def test_sync_refreshes_share_a_bounded_pool(wait_for):
+    from zoocache.core import REFRESH_WORKERS
+
+    reset()
+    running = set()
+    peak = {"n": 0}
+    names = set()
+    lock = threading.Lock()
+    release = threading.Event()
+
+    @cacheable(deps=lambda i: [f"swr:pool:{i}"], stale_while_revalidate=30)
+    def item(i):
+        with lock:
+            running.add(i)
+            peak["n"] = max(peak["n"], len(running))
+            names.add(threading.current_thread().name)
+        if threading.current_thread() is not threading.main_thread():
+            release.wait(2)
+        with lock:
+            running.discard(i)
+        return i
+
+    keys = range(REFRESH_WORKERS * 3)
+    for i in keys:
+        item(i)
+    names.clear()
+    for i in keys:
+        invalidate(f"swr:pool:{i}")
+        item(i)
+
+    assert wait_for(lambda: len(running) == REFRESH_WORKERS)
+    time.sleep(0.1)
+    assert peak["n"] == REFRESH_WORKERS
+    release.set()
+    assert wait_for(lambda: not running)
+    assert all(name.startswith("zoocache-refresh") for name in names)
+
+
+def test_recomputes_inline_once_window_has_passed():
+    reset()
+    calls = {"n": 0}
+
+    @cacheable(deps=["swr:short"], stale_while_revalidate=1)
+    def short():
+        calls["n"] += 1
+        return calls["n"]
+
+    assert short() == 1
+    invalidate("swr:short")
+    time.sleep(1.2)
+
+    assert short() == 2
+
+
+def test_serves_stale_after_ttl_expiry(wait_for):
+    reset()
+    calls = {"n": 0}
+
+    @cacheable(ttl=1, stale_while_revalidate=30)
+    def expiring():
+        calls["n"] += 1
+        return calls["n"]
+
+    assert expiring() == 1
+    time.sleep(2.1)
+
+    assert expiring() == 1
+    assert wait_for(lambda: expiring() == 2)
+
+
+@pytest.mark.parametrize("near_cache_size", [None, 10])
+def test_plain_reads_honor_the_logical_expiry(tmp_path, near_cache_size):
+    from zoocache._zoocache import Core
+
+    core = Core(storage_url=f"lmdb://{tmp_path / 'swr_logical'}", near_cache_size=near_cache_size)
+    core.set("k", "v", [], ttl=1, stale_ttl=30)
+    assert core.get("k") == "v"
+    time.sleep(2.1)
+
+    assert core.get("k") is None
+    assert core.get_many(["k"]) == [None]
+    assert core.get_or_stale("k", 30) == ("v", True, True)
+    core.finish_flight("k", False)
+
+
+def test_read_extension_keeps_the_stale_window(tmp_path):
+    from zoocache._zoocache import Core
+
+    core = Core(storage_url=f"lmdb://{tmp_path / 'swr_touch'}", default_ttl=2, tti_flush_secs=1)
+    core.set("k", "v", [], stale_ttl=30)
+    assert core.get("k") == "v"
+    time.sleep(1.5)
+
+    # The touch flushed by now extended the entry by default_ttl plus its window.
+    assert core.get_or_stale("k", 30) == ("v", False, True)
+
+
+@pytest.mark.asyncio
+async def test_async_serves_stale_and_refreshes():
+    reset()
+    calls = {"n": 0}
+
+    @cacheable(deps=["swr:async"], stale_while_revalidate=30)
+    async def fetch():
+        calls["n"] += 1
+        return calls["n"]
+
+    assert await fetch() == 1
+    invalidate("swr:async")
+
+    assert await fetch() == 1
+    for _ in range(100):
+        if await fetch() == 2:
+            break
+        await asyncio.sleep(0.01)
+    assert await fetch() == 2
@@ -100,3 +100,61 @@ def test_lmdb_counter_consistency():
         reset()
         if os.path.exists(temp_dir):
             shutil.rmtree(temp_dir)
+
+
+def test_lmdb_large_payload_survives_trie_version_rewrite():
+    """
+    LMDB hits carry no raw copy; the trie-version rewrite after an unrelated
+    invalidation patches the stored header in place.
+    """
+    import time
+
+    from zoocache._zoocache import Core
+
+    temp_dir = tempfile.mkdtemp()
+    try:
+        core = Core(storage_url=f"lmdb://{os.path.join(temp_dir, 'restamp_db')}")
+        payload = {"rows": [{"id": i, "name": f"row-{i}" * 4} for i in range(2000)]}
+        core.set("big", payload, ["table:rows"])
+        core.set("small", "x", ["table:other"])
+
+        core.invalidate("unrelated")
+        assert core.get("big") == payload
+        assert core.get("small") == "x"
+        time.sleep(0.3)
+
+        assert core.get("big") == payload
+        core.invalidate("table:rows")
+        assert core.get("big") is None
+        assert core.get("small") == "x"
+    finally:
+        if os.path.exists(temp_dir):
+            shutil.rmtree(temp_dir)
+
+
+def test_lmdb_trie_version_rewrite_skips_rewritten_keys():
+    """
+    A rewrite queued by a read must not touch a value set after that read.
+    """
+    import time
+
+    from zoocache._zoocache import Core
+
+    temp_dir = tempfile.mkdtemp()
+    try:
+        core = Core(storage_url=f"lmdb://{os.path.join(temp_dir, 'restamp_race_db')}")
+        for i in range(50):
+            core.set(f"k{i}", "old", ["table:rows"])
+
+        core.invalidate("unrelated")
+        for i in range(50):
+            assert core.get(f"k{i}") == "old"
+            core.set(f"k{i}", "new", ["table:rows"])
+        time.sleep(0.3)
+
+        assert all(core.get(f"k{i}") == "new" for i in range(50))
+        core.invalidate("table:rows")
+        assert all(core.get(f"k{i}") is None for i in range(50))
+    finally:
+        if os.path.exists(temp_dir):
+            shutil.rmtree(temp_dir)
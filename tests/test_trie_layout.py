@@ -0,0 +1,47 @@
+import pytest
+
+from zoocache import cacheable, configure, invalidate, reset
+from zoocache.core import _manager
+
+
+@pytest.fixture
+def compact_trie():
+    reset()
+    configure(trie_layout="compact")
+    yield
+    reset()
+
+
+def test_compact_trie_invalidates_by_prefix(compact_trie):
+    calls = []
+
+    @cacheable(deps=lambda t, u: [f"tenant:{t}:user:{u}"])
+    def load(t, u):
+        calls.append((t, u))
+        return t, u
+
+    for u in range(40):
+        load(1, u)
+        load(2, u)
+    assert len(calls) == 80
+
+    invalidate("tenant:1:user:7")
+    load(1, 7)
+    load(2, 7)
+    assert len(calls) == 81
+
+    invalidate("tenant:2")
+    for u in range(40):
+        load(1, u)
+        load(2, u)
+    assert len(calls) == 121
+
+
+def test_unknown_trie_layout_is_rejected():
+    reset()
+    try:
+        configure(trie_layout="arena")
+        with pytest.raises(ValueError, match="Unsupported trie_layout"):
+            _manager.get_core()
+    finally:
+        reset()
@@ -0,0 +1,36 @@
+import pytest
+
+from zoocache._zoocache import Core
+
+REDIS_URL = "redis://127.0.0.1:6379/0"
+
+
+def test_lmdb_entries_from_a_previous_run_are_revalidated(tmp_path):
+    url = f"lmdb://{tmp_path / 'stamps'}"
+    first = Core(storage_url=url)
+    # Push the first run's counter well past anything the next run reaches.
+    for i in range(500):
+        first.invalidate(f"other:{i}")
+    first.set("k", "v", ["user:1"])
+    del first
+
+    second = Core(storage_url=url)
+    assert second.get("k") == "v"
+    second.invalidate("user:1")
+    assert second.get("k") is None
+
+
+@pytest.mark.parametrize("near_cache_size", [None, 100])
+def test_redis_entries_written_by_another_node_are_revalidated(near_cache_size):
+    writer = Core(storage_url=REDIS_URL, bus_url=REDIS_URL, prefix="stamps")
+    reader = Core(storage_url=REDIS_URL, bus_url=REDIS_URL, prefix="stamps", near_cache_size=near_cache_size)
+    writer.clear()
+
+    for i in range(1000):
+        writer.invalidate(f"other:{i}")
+    writer.set("k", "v", ["user:1"])
+    assert reader.get("k") == "v"
+
+    reader.invalidate("user:1")
+    assert reader.get("k") is None
+    writer.clear()
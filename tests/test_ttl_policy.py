@@ -0,0 +1,55 @@
+import time
+
+import pytest
+
+from zoocache import cacheable, configure, reset
+from zoocache._zoocache import Core
+
+
+def test_capped_policy_bounds_lifetime():
+    reset()
+    configure(default_ttl=60)
+    counter = 0
+
+    @cacheable(namespace="capped", ttl_policy="capped", max_lifetime=1)
+    def get_counted():
+        nonlocal counter
+        counter += 1
+        return counter
+
+    assert get_counted() == 1
+    assert get_counted() == 1
+    # default_ttl would keep it for a minute; the cap expires it after 1s.
+    time.sleep(2.1)
+    assert get_counted() == 2
+
+
+def test_absolute_policy_is_not_extended_by_reads():
+    core = Core(default_ttl=1)
+    core.set("k", "v", [], ttl_policy="absolute")
+    for _ in range(5):
+        core.get("k")
+        time.sleep(0.5)
+    assert core.get("k") is None
+
+
+def test_sliding_and_absolute_reject_max_lifetime():
+    core = Core()
+    with pytest.raises(ValueError, match="max_lifetime only applies"):
+        core.set("k", 1, [], ttl_policy="absolute", max_lifetime=10)
+    with pytest.raises(ValueError, match="needs max_lifetime"):
+        core.set("k", 1, [], ttl_policy="capped")
+    with pytest.raises(ValueError, match="Unknown ttl_policy"):
+        core.set("k", 1, [], ttl_policy="forever")
+
+
+def test_ttl_jitter_is_validated():
+    with pytest.raises(ValueError, match="ttl_jitter must be between"):
+        Core(ttl_jitter=1.5)
+
+
+def test_jittered_ttls_still_expire():
+    core = Core(default_ttl=1, ttl_jitter=0.5)
+    core.set_many([(f"k{i}", i, [], None) for i in range(20)])
+    time.sleep(3.1)
+    assert all(v is None for v in core.get_many([f"k{i}" for i in range(20)]))